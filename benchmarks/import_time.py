@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark for the job commands, measured with `python -X importtime`.
+
+For each command module this runs a fresh interpreter several times, takes
+the median cumulative import time of the module, and checks it against a
+budget. It also fails if an import pulls in a module that should only be
+loaded on first use (see LAZY_MODULES).
+
+Usage:
+    python benchmarks/import_time.py [--runs N] [--scale X] [--report-only]
+
+--scale multiplies every budget (useful on slow or shared runners).
+Exits 1 if any budget is exceeded or a lazy module is imported eagerly;
+with --report-only the timings are only reported and just the eager
+imports fail (they don't depend on how fast the machine is).
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess  # nosec B404 - runs the current interpreter only
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# module -> cumulative import budget in milliseconds (about twice the
+# measured cold start, so only real regressions trip it)
+BUDGETS_MS = {
+    'tibia_ops.__main__': 10,
+    'config': 5,
+    'search_index': 40,
+    'member_index': 50,
+    'tibia_api': 60,
+    'gen_worlds_guilds': 90,
+    'check_online_enemies': 90,
+}
+
+# Modules only needed once a request is actually made (or `--profile` is on)
+LAZY_MODULES = ('urllib.request', 'concurrent.futures', 'email.utils', 'http.client', 'ssl',
+                'cProfile', 'pstats', 'tracemalloc')
+
+_LINE = re.compile(r'^import time:\s+\d+ \|\s+(\d+) \|(\s*)(\S+)$')
+
+
+def measure(module):
+    """
+    Import a module in a fresh interpreter.
+
+    Returns:
+        tuple: (cumulative microseconds for the module, set of modules imported)
+    """
+    code = f"import tibia_ops; import {module}"
+    result = subprocess.run(  # nosec B603 - fixed argv, no shell
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True
+    )
+    cumulative = None
+    imported = set()
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if not match:
+            continue
+        imported.add(match.group(3))
+        if match.group(3) == module and not match.group(2).strip():
+            cumulative = int(match.group(1))
+    # No line of its own if the module was already imported
+    return cumulative or 0, imported
+
+
+def main(argv=None):
+    """Run the benchmark and report regressions."""
+    parser = argparse.ArgumentParser(description="Cold-start import time benchmark")
+    parser.add_argument('--runs', type=int, default=5, help="Interpreter runs per module")
+    parser.add_argument('--scale', type=float, default=1.0, help="Multiply every budget")
+    parser.add_argument('--report-only', action='store_true',
+                        help="Report budget overruns without failing (eager imports still fail)")
+    args = parser.parse_args(argv)
+
+    failures = []
+    slow = []
+    print(f"{'module':<24} {'median':>9} {'budget':>9}")
+    for module, budget in BUDGETS_MS.items():
+        timings = []
+        eager = set()
+        for _ in range(args.runs):
+            micros, imported = measure(module)
+            timings.append(micros / 1000)
+            eager |= imported.intersection(LAZY_MODULES)
+        median = statistics.median(timings)
+        limit = budget * args.scale
+        status = 'ok' if median <= limit else 'SLOW'
+        print(f"{module:<24} {median:>7.1f}ms {limit:>7.1f}ms  {status}")
+        if median > limit:
+            (slow if args.report_only else failures).append(f"{module}: {median:.1f}ms > {limit:.1f}ms budget")
+        if eager:
+            failures.append(f"{module}: imports {', '.join(sorted(eager))} eagerly")
+
+    if slow:
+        print("\nOver budget (report only):")
+        for entry in slow:
+            print(f"  - {entry}")
+    if failures:
+        print("\nRegressions:")
+        for failure in failures:
+            print(f"  - {failure}")
+        return 1
+    print("\nNo eager imports." if slow else "\nAll commands within budget.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
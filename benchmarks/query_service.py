@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Concurrency benchmark for the local query service.
+
+Starts the service in-process on the repo's data and runs a mix of
+queries (whois of random guild members, troll lookups, guild rosters and
+list deltas) from N client threads at once, each on its own keep-alive
+connection that accepts gzip. Clients remember ETags, so repeated queries
+are revalidated (304) the way a caching consumer would.
+
+For each client count it reports throughput, latency percentiles and the
+average bytes per response, next to the size of the full combined config
+a consumer downloads today.
+
+Usage:
+    python benchmarks/query_service.py [--clients N ...] [--requests N] [--max-p99-ms X]
+
+Exits 1 if any request fails, or if the p99 latency exceeds --max-p99-ms.
+"""
+
+import argparse
+import gzip
+import http.client
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from urllib.parse import quote
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import tibia_ops  # noqa: E402,F401 - puts scripts/ on the import path
+from deploy_config import combine_configs  # noqa: E402
+from query_service import make_server  # noqa: E402
+
+
+def request_mix(state, count, seed):
+    """`count` request paths, about half of them repeats of earlier ones."""
+    rng = random.Random(seed)
+    guilds = state['guilds']
+    members = sorted(guilds.members)
+    rosters = sorted((world, guild) for world, world_guilds, _ in guilds.worlds.values() for guild in world_guilds)
+    trolls = state['lists']['trolls']
+    paths = []
+    for _ in range(count):
+        if paths and rng.random() < 0.5:
+            paths.append(rng.choice(paths))
+            continue
+        kind = rng.random()
+        if kind < 0.5:
+            paths.append(f"/whois/{quote(guilds.members[rng.choice(members)][0][0])}")
+        elif kind < 0.75:
+            paths.append(f"/troll/{quote(rng.choice(trolls.names or ('Nobody',)))}")
+        elif kind < 0.95:
+            world, guild = rng.choice(rosters)
+            paths.append(f"/guild/{quote(world)}/{quote(guild)}")
+        else:
+            paths.append(f"/lists/trolls?since={trolls.version}")
+    return paths
+
+
+def client(address, paths, results):
+    """Send `paths` over one keep-alive connection, revalidating with remembered ETags."""
+    connection = http.client.HTTPConnection(*address, timeout=10)
+    etags = {}
+    for path in paths:
+        headers = {'Accept-Encoding': 'gzip'}
+        if path in etags:
+            headers['If-None-Match'] = etags[path]
+        started = time.perf_counter()
+        connection.request('GET', path, headers=headers)
+        response = connection.getresponse()
+        body = response.read()
+        elapsed = time.perf_counter() - started
+        if response.status == 200:
+            etags[path] = response.headers['ETag']
+        results.append((elapsed, response.status, len(body)))
+    connection.close()
+
+
+def run(address, state, clients, requests):
+    """
+    Run `requests` queries per client from `clients` threads at once.
+
+    Returns:
+        dict: clients, seconds, latencies, statuses, bytes
+    """
+    results = []
+    threads = [
+        threading.Thread(target=client, args=(address, request_mix(state, requests, seed), results))
+        for seed in range(clients)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {
+        'clients': clients,
+        'seconds': time.perf_counter() - started,
+        'latencies': sorted(elapsed for elapsed, _, _ in results),
+        'statuses': [status for _, status, _ in results],
+        'bytes': [size for _, _, size in results],
+    }
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main(argv=None):
+    """Run the benchmark and report failures."""
+    parser = argparse.ArgumentParser(description="Query service concurrency benchmark")
+    parser.add_argument('--clients', type=int, nargs='+', default=[1, 4, 16], help="Concurrent clients")
+    parser.add_argument('--requests', type=int, default=500, help="Requests per client")
+    parser.add_argument('--max-p99-ms', type=float, default=None, help="Fail above this p99 latency")
+    args = parser.parse_args(argv)
+
+    os.chdir(REPO_ROOT)
+    started = time.perf_counter()
+    server = make_server('127.0.0.1', 0)
+    load_seconds = time.perf_counter() - started
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    state = server.data.state
+
+    payload, _ = combine_configs()
+    print(f"Loaded {state['guilds'].member_count} members in {load_seconds:.2f}s")
+    print(f"Full combined config: {len(payload)} bytes ({len(gzip.compress(payload))} gzipped)\n")
+
+    failures = []
+    print(f"{'clients':>7} {'requests':>9} {'req/s':>8} {'p50 ms':>7} {'p99 ms':>7} {'avg bytes':>10} {'304s':>5}")
+    try:
+        for clients in args.clients:
+            result = run(server.server_address, state, clients, args.requests)
+            latencies = result['latencies']
+            p50 = percentile(latencies, 0.50) * 1000
+            p99 = percentile(latencies, 0.99) * 1000
+            revalidated = result['statuses'].count(304) / len(latencies)
+            print(f"{clients:>7} {len(latencies):>9} {len(latencies) / result['seconds']:>8.0f} {p50:>7.2f} "
+                  f"{p99:>7.2f} {statistics.mean(result['bytes']):>10.0f} {revalidated:>5.0%}")
+            failed = sum(status not in (200, 304) for status in result['statuses'])
+            if failed:
+                failures.append(f"{clients} clients: {failed} failed requests")
+            if args.max_p99_ms is not None and p99 > args.max_p99_ms:
+                failures.append(f"{clients} clients: p99 {p99:.2f} ms > {args.max_p99_ms} ms")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Full-pipeline benchmark on recorded API traffic.
+
+Replays a fixture archive (recorded with `python -m tibia_ops --record ...`)
+through a job command in each mode, starting every run from a fresh copy of
+the repo's data files:
+
+    sequential  prefetching disabled - one request at a time
+    concurrent  the normal client (MAX_CONCURRENT_REQUESTS in flight)
+    cached      the normal client with every response served instantly,
+                i.e. the pipeline's own processing cost
+
+Every mode replays the same archive with the same random seed, and the data
+files each run writes under .configs/ are compared, so a mode that changes
+the results is reported.
+
+Usage:
+    python benchmarks/replay_run.py ARCHIVE COMMAND [--time-scale X] [--modes M ...]
+
+--time-scale multiplies the recorded latencies (ignored by "cached").
+Exits 1 if the modes produced different data files.
+"""
+
+import argparse
+import contextlib
+import hashlib
+import importlib
+import io
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from tibia_ops.__main__ import COMMANDS  # noqa: E402 - also puts scripts/ on the path
+import config_store  # noqa: E402
+import http_fixtures  # noqa: E402
+import tibia_api  # noqa: E402
+
+MODES = ('sequential', 'concurrent', 'cached')
+
+# Copied into each run's working directory (paths in config.py are relative)
+DATA_DIRS = ('.configs', 'docs/data')
+
+
+def data_digest(directory):
+    """Hash of the data files under .configs/ (sidecar files excluded)."""
+    digest = hashlib.sha256()
+    root = os.path.join(directory, '.configs')
+    for name in sorted(os.listdir(root)):
+        if name.startswith('.'):
+            continue
+        digest.update(name.encode())
+        with open(os.path.join(root, name), 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def run_mode(mode, archive, command, args, time_scale):
+    """
+    Run a command once against the archive in a scratch copy of the data.
+
+    Returns:
+        dict: mode, seconds, requests served, error (or None) and data digest
+    """
+    module = importlib.import_module(COMMANDS[command][0])
+    original_prefetch = tibia_api.prefetch
+    original_cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        for directory in DATA_DIRS:
+            shutil.copytree(os.path.join(REPO_ROOT, directory), os.path.join(workdir, directory))
+        os.chdir(workdir)
+        tibia_api.reset_run_stats()
+        config_store.clear_cache()
+        random.seed(0)
+        if mode == 'sequential':
+            tibia_api.prefetch = lambda urls, fields=None: None
+        scale = 0 if mode == 'cached' else time_scale
+
+        sys.argv = [f"tibia_ops {command}"] + args
+        error = None
+        started = time.perf_counter()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()), \
+                    http_fixtures.replaying(archive, scale) as replayer:
+                module.main()
+        except (RuntimeError, SystemExit) as e:
+            error = str(e) or type(e).__name__
+        finally:
+            seconds = time.perf_counter() - started
+            tibia_api.prefetch = original_prefetch
+            os.chdir(original_cwd)
+        return {
+            'mode': mode,
+            'seconds': seconds,
+            'served': replayer.served,
+            'error': error,
+            'digest': data_digest(workdir),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded API traffic through a job command")
+    parser.add_argument('archive', help="Fixture archive from `python -m tibia_ops --record`")
+    parser.add_argument('command', choices=sorted(COMMANDS), help="Job command to run")
+    parser.add_argument('--time-scale', type=float, default=1.0, help="Recorded latency multiplier")
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES))
+    parser.add_argument('--args', nargs=argparse.REMAINDER, default=[], help="Arguments for the command")
+    args = parser.parse_args()
+
+    header, entries = http_fixtures.load_archive(args.archive)
+    print(f"Archive: {len(entries)} recorded attempt(s), recorded {header['recorded']}")
+
+    results = [run_mode(mode, args.archive, args.command, args.args, args.time_scale) for mode in args.modes]
+    baseline = results[0]['seconds']
+    print(f"\n{'mode':<12} {'seconds':>9} {'speedup':>8} {'requests':>9}  result")
+    for result in results:
+        speedup = baseline / result['seconds'] if result['seconds'] else float('inf')
+        print(f"{result['mode']:<12} {result['seconds']:>9.2f} {speedup:>7.1f}x {result['served']:>9}  "
+              f"{result['error'] or 'ok'}")
+
+    if len({result['digest'] for result in results}) > 1:
+        print("\nData files differ between modes")
+        return 1
+    print("\nAll modes wrote identical data files.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Peak memory of a guild refresh, plain dicts vs GuildSnapshot.
+
+Simulates what gen_worlds_guilds holds during a full refresh of a
+world_guilds_data.json file: the previous data, every world rebuilt from
+freshly parsed strings (as from API responses), and the merged result. Both
+layouts are measured with tracemalloc:
+
+    dicts     the JSON dicts and lists (the previous representation)
+    snapshot  GuildSnapshot / WorldGuilds (rosters interned against the
+              previous snapshot, tuples, copy-on-write merge)
+
+Usage:
+    python benchmarks/snapshot_memory.py [--data PATH]
+
+Exits 1 if the snapshot layout doesn't lower the peak.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tracemalloc
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import tibia_ops  # noqa: E402,F401 - puts scripts/ on the import path
+from config import WORLD_GUILDS_FILE  # noqa: E402
+from guild_snapshot import GuildSnapshot, WorldGuilds  # noqa: E402
+
+
+def fetched(world_data):
+    """The world as the API would return it: equal, but newly allocated strings."""
+    return json.loads(json.dumps(world_data))
+
+
+def refresh_with_dicts(path, worlds):
+    with open(path, 'r') as f:
+        existing = json.load(f)
+    refreshed = {}
+    for world in worlds:
+        refreshed[world] = {guild: list(members) for guild, members in fetched(existing[world]).items()}
+    merged = dict(existing)
+    merged.update(refreshed)
+    return existing, merged
+
+
+def refresh_with_snapshot(path, worlds):
+    existing = GuildSnapshot.load(path)
+    refreshed = {}
+    for world in worlds:
+        refreshed[world] = WorldGuilds(fetched(existing[world].to_json()), previous=existing[world])
+    merged = existing.replace_worlds(refreshed)
+    return existing, merged
+
+
+def measure(refresh, path, worlds):
+    """
+    Returns:
+        tuple: (peak bytes, bytes still held by the result)
+    """
+    tracemalloc.start()
+    result = refresh(path, worlds)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return peak, current
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare refresh peak memory: dicts vs GuildSnapshot")
+    parser.add_argument('--data', default=os.path.join(REPO_ROOT, WORLD_GUILDS_FILE),
+                        help="world_guilds_data.json to simulate a refresh of")
+    args = parser.parse_args()
+
+    with open(args.data, 'r') as f:
+        data = json.load(f)
+    worlds = list(data)
+    members = sum(len(m) for guilds in data.values() for m in guilds.values())
+    del data
+    print(f"{len(worlds)} worlds, {members} members\n")
+
+    results = {
+        'dicts': measure(refresh_with_dicts, args.data, worlds),
+        'snapshot': measure(refresh_with_snapshot, args.data, worlds),
+    }
+    print(f"{'layout':<10} {'peak MiB':>9} {'held MiB':>9}")
+    for layout, (peak, held) in results.items():
+        print(f"{layout:<10} {peak / 2**20:>9.2f} {held / 2**20:>9.2f}")
+
+    before, after = results['dicts'][0], results['snapshot'][0]
+    print(f"\nPeak memory: {100 * (before - after) / before:.0f}% lower with GuildSnapshot")
+    return 0 if after < before else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
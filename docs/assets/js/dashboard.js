@@ -9,6 +9,7 @@
 
 const CONFIG = {
     metricsFile: 'data/metrics.json',
+    timeseriesDir: 'data/timeseries',
     refreshInterval: 300000, // 5 minutes
     chartColors: {
         blue: 'rgba(88, 166, 255, 1)',
@@ -27,8 +28,14 @@ const CONFIG = {
 
 document.addEventListener('DOMContentLoaded', () => {
     initCharts();
+    initTrendCharts();
     loadMetrics();
-    setInterval(loadMetrics, CONFIG.refreshInterval);
+    loadTrends();
+    document.getElementById('trend-resolution').addEventListener('change', loadTrends);
+    setInterval(() => {
+        loadMetrics();
+        loadTrends();
+    }, CONFIG.refreshInterval);
 });
 
 // =============================================================================
@@ -125,6 +132,129 @@ function initCharts() {
     });
 }
 
+// =============================================================================
+// Trend Charts (time-series store)
+// =============================================================================
+// Each scheduled job publishes its own store with one file per resolution
+// (hour / day, completed buckets only), so only the selected resolution is
+// downloaded.
+
+let enemyTrendChart = null;
+let guildTrendChart = null;
+
+function trendChart(canvasId, title, datasets) {
+    const ctx = document.getElementById(canvasId).getContext('2d');
+    return new Chart(ctx, {
+        type: 'line',
+        data: {
+            labels: [],
+            datasets: datasets.map(ds => ({
+                data: [],
+                fill: false,
+                tension: 0.3,
+                pointRadius: 0,
+                spanGaps: true,
+                ...ds
+            }))
+        },
+        options: {
+            responsive: true,
+            maintainAspectRatio: false,
+            plugins: {
+                title: { display: true, text: title, color: '#c9d1d9' },
+                legend: { labels: { color: '#8b949e' } }
+            },
+            scales: {
+                x: {
+                    ticks: { color: '#8b949e', maxTicksLimit: 12 },
+                    grid: { color: '#30363d' }
+                },
+                y: {
+                    ticks: { color: '#8b949e' },
+                    grid: { color: '#30363d' }
+                },
+                y1: {
+                    position: 'right',
+                    ticks: { color: '#8b949e' },
+                    grid: { drawOnChartArea: false }
+                }
+            }
+        }
+    });
+}
+
+function initTrendCharts() {
+    enemyTrendChart = trendChart('enemyTrendChart', 'Trolls & Enemies Online', [
+        { label: 'Trolls', borderColor: CONFIG.chartColors.red, yAxisID: 'y' },
+        { label: 'Enemies Online', borderColor: CONFIG.chartColors.yellow, yAxisID: 'y1' }
+    ]);
+    guildTrendChart = trendChart('guildTrendChart', 'Guild Data & API Health', [
+        { label: 'Members Tracked', borderColor: CONFIG.chartColors.blue, yAxisID: 'y' },
+        { label: 'Avg API Latency (ms)', borderColor: CONFIG.chartColors.purple, yAxisID: 'y1' }
+    ]);
+}
+
+async function loadSeries(store, resolution) {
+    try {
+        const response = await fetch(`${CONFIG.timeseriesDir}/${store}.${resolution}.json`);
+        return response.ok ? await response.json() : null;
+    } catch (error) {
+        console.log(`No ${resolution} data for ${store}:`, error.message);
+        return null;
+    }
+}
+
+function trendLabels(data) {
+    const options = data.step >= 86400
+        ? { month: 'short', day: 'numeric' }
+        : { month: 'short', day: 'numeric', hour: '2-digit', minute: '2-digit' };
+    return data.t.map(t => new Date(t * 1000).toLocaleString('en-US', options));
+}
+
+// Per-point sum of every series whose name starts with prefix (null if none)
+function sumSeries(data, prefix) {
+    const names = Object.keys(data.series).filter(name => name.startsWith(prefix));
+    return data.t.map((_, i) => {
+        let total = null;
+        for (const name of names) {
+            const value = data.series[name][i];
+            if (value !== null) total = (total || 0) + value;
+        }
+        return total;
+    });
+}
+
+function averageLatency(data) {
+    const latency = data.series['api.latency_ms'] || [];
+    const requests = data.series['api.requests'] || [];
+    return data.t.map((_, i) => (requests[i] ? Math.round(latency[i] / requests[i]) : null));
+}
+
+function setTrend(chart, data, series) {
+    chart.data.labels = data ? trendLabels(data) : [];
+    chart.data.datasets.forEach((dataset, i) => {
+        dataset.data = data ? series[i] : [];
+    });
+    chart.update();
+}
+
+async function loadTrends() {
+    const resolution = document.getElementById('trend-resolution').value;
+    const [enemies, guilds] = await Promise.all([
+        loadSeries('enemies', resolution),
+        loadSeries('guilds', resolution)
+    ]);
+
+    setTrend(enemyTrendChart, enemies, enemies && [
+        enemies.series['trolls'] || [],
+        enemies.series['enemies.online'] || []
+    ]);
+    setTrend(guildTrendChart, guilds, guilds && [
+        sumSeries(guilds, 'members.'),
+        averageLatency(guilds)
+    ]);
+}
+
 // =============================================================================
 // Load Metrics Data
 // =============================================================================
@@ -211,34 +341,28 @@ function updateDashboard(data) {
     ];
     securityChart.update();
 
-    // Update application metrics
+    // Update application metrics. A value the last collection didn't
+    // refresh is marked stale rather than shown as current.
+    const updated = (data.updated && data.updated.application) || {};
+    const appMetric = (field, label, format = (value) => value) => {
+        const asOf = updated[field];
+        const stale = data.lastUpdated && asOf !== data.lastUpdated;
+        const title = stale ? (asOf ? `Last updated ${new Date(asOf).toLocaleString()}` : 'Not updated by the collector') : '';
+        return `
+        <div class="app-metric${stale ? ' stale' : ''}" title="${title}">
+            <div class="app-metric-value">${format(data.application[field])}</div>
+            <div class="app-metric-label">${label}${stale ? ' (stale)' : ''}</div>
+        </div>`;
+    };
     const appMetricsContainer = document.getElementById('app-metrics');
-    appMetricsContainer.innerHTML = `
-        <div class="app-metric">
-            <div class="app-metric-value">${data.application.trollsTotal}</div>
-            <div class="app-metric-label">Total Trolls</div>
-        </div>
-        <div class="app-metric">
-            <div class="app-metric-value">${data.application.bastexTotal}</div>
-            <div class="app-metric-label">Bastex Members</div>
-        </div>
-        <div class="app-metric">
-            <div class="app-metric-value">${data.application.enemiesOnline}</div>
-            <div class="app-metric-label">Enemies Online</div>
-        </div>
-        <div class="app-metric">
-            <div class="app-metric-value">${formatNumber(data.application.apiCalls)}</div>
-            <div class="app-metric-label">API Calls</div>
-        </div>
-        <div class="app-metric">
-            <div class="app-metric-value">${data.application.worldsMonitored}</div>
-            <div class="app-metric-label">Worlds Monitored</div>
-        </div>
-        <div class="app-metric">
-            <div class="app-metric-value">${data.application.guildsMonitored}</div>
-            <div class="app-metric-label">Guilds Monitored</div>
-        </div>
-    `;
+    appMetricsContainer.innerHTML = [
+        appMetric('trollsTotal', 'Total Trolls'),
+        appMetric('bastexTotal', 'Bastex Members'),
+        appMetric('enemiesOnline', 'Enemies Online'),
+        appMetric('apiCalls', 'API Calls', formatNumber),
+        appMetric('worldsMonitored', 'Worlds Monitored'),
+        appMetric('guildsMonitored', 'Guilds Monitored'),
+    ].join('');
 }
 
 // =============================================================================
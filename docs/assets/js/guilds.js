@@ -4,10 +4,22 @@
  * Renders a world -> guild -> members drill-down on top of the guild data
  * generated by scripts/gen_worlds_guilds.py.
  *
- * The data file is a minified mirror of .configs/world_guilds_data.json, kept
- * in sync by the update-guild-data job in .github/workflows/scheduled-jobs.yml
- * (Pages serves docs/ from main and cannot read .configs/).
- * Shape: { "<world>": { "<guild>": ["<member>", ...] } }
+ * The page reads the search index built by scripts/search_index.py, kept in
+ * sync by the update-guild-data job in .github/workflows/scheduled-jobs.yml
+ * (Pages serves docs/ from main and cannot read .configs/):
+ *   - data/search/index.json      manifest: world -> shard file and counts
+ *   - data/search/<world>.json    one shard per world, loaded on demand
+ * Shard shape (parallel arrays indexed by row id, rows sorted by `lower`):
+ *   { world, guilds: [...], names: [...], lower: [...], guild: [guildIdx, ...] }
+ *
+ * The "Find a character" box uses the cross-world member index built by
+ * scripts/member_index.py (data/members/, one shard per first letter).
+ *
+ * scripts/publish_data.py also publishes every one of these files under a
+ * content-hashed name, listed in data/latest.json. Only that pointer is
+ * revalidated on each load; the hashed files never change, so they are read
+ * from the browser cache whenever possible. Without a pointer (e.g. a local
+ * checkout that was never published) the plain files are fetched instead.
  */
 
 // =============================================================================
@@ -15,15 +27,33 @@
 // =============================================================================
 
 const CONFIG = {
-    dataFile: 'data/world_guilds_data.json',
+    dataDir: 'data/',
+    pointerFile: 'data/latest.json',
+    indexDir: 'search/',
+    manifestFile: 'search/index.json',
     allGuildsValue: '__all__',
+    pageSize: 200,          // Member cards rendered per batch while scrolling
+    searchDebounceMs: 150,
+    memberIndexDir: 'members/',
+    globalResultLimit: 50,
 };
 
 // =============================================================================
 // State
 // =============================================================================
 
-let worldsData = {};
+let published = null;       // data file -> content-hashed path (from latest.json)
+let manifest = { worlds: {} };
+const shardCache = {};      // world -> prepared shard
+let shard = null;           // shard of the selected world
+let visibleRows = [];       // row ids matching the current selection + query
+let renderedCount = 0;
+let lastQuery = { key: '', rows: null };
+let searchTimer = null;
+let loadToken = 0;
+const memberShards = {};    // first letter -> member index shard (or null if missing)
+let memberManifest = null;  // promise of the member index manifest (shards + fold table)
+let globalTimer = null;
 
 const els = {};
 
@@ -32,34 +62,91 @@ document.addEventListener('DOMContentLoaded', () => {
     els.guild = document.getElementById('guild-select');
     els.search = document.getElementById('member-search');
     els.grid = document.getElementById('member-grid');
+    els.sentinel = document.getElementById('member-grid-sentinel');
     els.status = document.getElementById('results-status');
     els.heading = document.getElementById('results-heading');
     els.statWorlds = document.getElementById('stat-worlds');
     els.statGuilds = document.getElementById('stat-guilds');
     els.statMembers = document.getElementById('stat-members');
     els.timestamp = document.getElementById('data-timestamp');
+    els.globalSearch = document.getElementById('global-search');
+    els.globalStatus = document.getElementById('global-status');
+    els.globalResults = document.getElementById('global-results');
 
     els.world.addEventListener('change', onWorldChange);
     els.guild.addEventListener('change', onGuildChange);
-    els.search.addEventListener('input', renderMembers);
+    els.search.addEventListener('input', onSearchInput);
+    els.globalSearch.addEventListener('input', () => {
+        clearTimeout(globalTimer);
+        globalTimer = setTimeout(runGlobalSearch, CONFIG.searchDebounceMs);
+    });
 
-    loadData();
+    if ('IntersectionObserver' in window) {
+        new IntersectionObserver((entries) => {
+            if (entries.some((entry) => entry.isIntersecting)) {
+                renderNextPage();
+            }
+        }, { rootMargin: '400px' }).observe(els.sentinel);
+    }
+
+    loadManifest();
 });
 
 // =============================================================================
 // Data Loading
 // =============================================================================
 
-async function loadData() {
+/** Read data/latest.json (revalidated every time - it is tiny). */
+async function loadPointer() {
+    try {
+        const response = await fetch(CONFIG.pointerFile, { cache: 'no-cache' });
+        published = response.ok ? await response.json() : null;
+    } catch (error) {
+        published = null;
+    }
+}
+
+/**
+ * Fetch a data file (a path under data/). Returns null if the file is not
+ * published, and throws on other errors.
+ */
+async function fetchJson(name, retried = false) {
+    let response;
+    if (published) {
+        const blob = published.files[name];
+        if (!blob) {
+            return null;
+        }
+        // Content-hashed: a cached copy is always current
+        response = await fetch(CONFIG.dataDir + blob, { cache: 'force-cache' });
+        if (response.status === 404 && !retried) {
+            // Pruned by a publish since the pointer was read
+            await loadPointer();
+            return fetchJson(name, true);
+        }
+    } else {
+        response = await fetch(CONFIG.dataDir + name, { cache: 'no-cache' });
+        if (response.status === 404) {
+            return null;
+        }
+    }
+    if (!response.ok) {
+        throw new Error(`HTTP ${response.status}`);
+    }
+    return { data: await response.json(), response: response };
+}
+
+async function loadManifest() {
     try {
-        const response = await fetch(CONFIG.dataFile, { cache: 'no-cache' });
-        if (!response.ok) {
-            throw new Error(`HTTP ${response.status}`);
+        await loadPointer();
+        const result = await fetchJson(CONFIG.manifestFile);
+        if (!result) {
+            throw new Error('HTTP 404');
         }
-        worldsData = await response.json();
-        showDataTimestamp(response.headers.get('Last-Modified'));
+        manifest = result.data;
+        showDataTimestamp(published ? published.published : result.response.headers.get('Last-Modified'));
         populateWorlds();
-        applyStateFromUrl();
+        await applyStateFromUrl();
     } catch (error) {
         els.world.innerHTML = '';
         addOption(els.world, '', 'Unavailable');
@@ -71,11 +158,39 @@ async function loadData() {
     }
 }
 
-function showDataTimestamp(lastModified) {
-    if (!lastModified) {
+/**
+ * Load (once) and prepare the shard for a world.
+ * Row ids per guild are precomputed so switching guilds never rescans.
+ */
+async function loadShard(world) {
+    if (shardCache[world]) {
+        return shardCache[world];
+    }
+    const entry = manifest.worlds[world];
+    const result = await fetchJson(CONFIG.indexDir + entry.file);
+    if (!result) {
+        throw new Error('HTTP 404');
+    }
+    const data = result.data;
+
+    data.guildRows = data.guilds.map(() => []);
+    data.guild.forEach((guildIdx, rowId) => {
+        data.guildRows[guildIdx].push(rowId);
+    });
+    data.guildIndex = {};
+    data.guilds.forEach((name, idx) => {
+        data.guildIndex[name] = idx;
+    });
+
+    shardCache[world] = data;
+    return data;
+}
+
+function showDataTimestamp(updated) {
+    if (!updated) {
         return;
     }
-    const date = new Date(lastModified);
+    const date = new Date(updated);
     if (isNaN(date.getTime())) {
         return;
     }
@@ -87,14 +202,13 @@ function showDataTimestamp(lastModified) {
 // =============================================================================
 
 function populateWorlds() {
-    const worlds = Object.keys(worldsData).sort();
+    const worlds = Object.keys(manifest.worlds || {}).sort();
 
     els.world.innerHTML = '';
     addOption(els.world, '', worlds.length ? 'Select a world...' : 'No worlds available');
 
     worlds.forEach((world) => {
-        const guildCount = Object.keys(worldsData[world] || {}).length;
-        addOption(els.world, world, `${world} (${guildCount} guilds)`);
+        addOption(els.world, world, `${world} (${manifest.worlds[world].guilds} guilds)`);
     });
 
     els.world.disabled = worlds.length === 0;
@@ -107,20 +221,17 @@ function populateWorlds() {
     }
 }
 
-function populateGuilds(world) {
-    const guilds = worldsData[world] || {};
-    const names = Object.keys(guilds).sort((a, b) => a.localeCompare(b));
-
+function populateGuilds() {
     els.guild.innerHTML = '';
 
-    if (!world) {
+    if (!shard) {
         addOption(els.guild, '', 'Select a world first');
         els.guild.disabled = true;
         els.statGuilds.textContent = '--';
         return;
     }
 
-    if (!names.length) {
+    if (!shard.guilds.length) {
         addOption(els.guild, '', 'No guilds in this world');
         els.guild.disabled = true;
         els.statGuilds.textContent = '0';
@@ -128,13 +239,13 @@ function populateGuilds(world) {
     }
 
     addOption(els.guild, '', 'Select a guild...');
-    addOption(els.guild, CONFIG.allGuildsValue, `All guilds (${names.length})`);
-    names.forEach((name) => {
-        addOption(els.guild, name, `${name} (${guilds[name].length})`);
+    addOption(els.guild, CONFIG.allGuildsValue, `All guilds (${shard.guilds.length})`);
+    shard.guilds.forEach((name, idx) => {
+        addOption(els.guild, name, `${name} (${shard.guildRows[idx].length})`);
     });
 
     els.guild.disabled = false;
-    els.statGuilds.textContent = names.length;
+    els.statGuilds.textContent = shard.guilds.length;
 }
 
 function addOption(select, value, label) {
@@ -148,12 +259,33 @@ function addOption(select, value, label) {
 // Event Handlers
 // =============================================================================
 
-function onWorldChange() {
-    populateGuilds(els.world.value);
+async function onWorldChange() {
+    const world = els.world.value;
+    const token = ++loadToken;
+
+    shard = null;
     els.search.value = '';
     els.search.disabled = true;
-    renderMembers();
+    populateGuilds();
     syncUrl();
+
+    if (!world) {
+        renderMembers();
+        return;
+    }
+
+    setStatus(`Loading ${world}...`);
+    try {
+        const loaded = await loadShard(world);
+        if (token !== loadToken) {
+            return; // A newer world selection won the race
+        }
+        shard = loaded;
+        populateGuilds();
+        renderMembers();
+    } catch (error) {
+        setStatus(`Could not load guild data for ${world} (${error.message}).`, true);
+    }
 }
 
 function onGuildChange() {
@@ -162,47 +294,97 @@ function onGuildChange() {
     syncUrl();
 }
 
+function onSearchInput() {
+    clearTimeout(searchTimer);
+    searchTimer = setTimeout(renderMembers, CONFIG.searchDebounceMs);
+}
+
 // =============================================================================
-// Rendering
+// Querying
 // =============================================================================
 
-/**
- * Collect the selected members as {name, guild} rows.
- * Members are plain name strings in the data file, but tolerate objects
- * carrying a `name` field in case the generator's shape changes.
- */
-function selectedMembers() {
-    const world = els.world.value;
+/** Row ids of the selected guild (or all guilds, grouped by guild). */
+function selectedRows() {
     const guild = els.guild.value;
-    const guilds = worldsData[world] || {};
-
-    if (!world || !guild) {
+    if (!shard || !guild) {
         return [];
     }
+    if (guild === CONFIG.allGuildsValue) {
+        return [].concat(...shard.guildRows);
+    }
+    const idx = shard.guildIndex[guild];
+    return idx === undefined ? [] : shard.guildRows[idx];
+}
 
-    const names = guild === CONFIG.allGuildsValue
-        ? Object.keys(guilds).sort((a, b) => a.localeCompare(b))
-        : [guild];
+/** First row id whose lower-cased name is >= query (rows are sorted by `lower`). */
+function lowerBound(query) {
+    let lo = 0;
+    let hi = shard.lower.length;
+    while (lo < hi) {
+        const mid = (lo + hi) >>> 1;
+        if (shard.lower[mid] < query) {
+            lo = mid + 1;
+        } else {
+            hi = mid;
+        }
+    }
+    return lo;
+}
 
-    const rows = [];
-    names.forEach((guildName) => {
-        (guilds[guildName] || []).forEach((member) => {
-            const name = typeof member === 'string' ? member : (member && member.name);
-            if (name) {
-                rows.push({ name: name, guild: guildName });
-            }
-        });
+/**
+ * Rows of the current selection whose name contains the query, in name
+ * order. Prefix matches (one binary-searched range of the sorted index) come
+ * first, followed by the remaining substring matches. When the query extends
+ * the previous one, only the previous matches are rescanned.
+ */
+function queryRows(query) {
+    const base = selectedRows();
+    if (!query) {
+        lastQuery = { key: '', rows: null };
+        return base;
+    }
+
+    const selectionKey = `${els.world.value}\u0000${els.guild.value}\u0000`;
+    const candidates = lastQuery.rows && lastQuery.key.startsWith(selectionKey) &&
+        query.startsWith(lastQuery.key.slice(selectionKey.length))
+        ? lastQuery.rows
+        : base;
+
+    const start = lowerBound(query);
+    let end = start;
+    while (end < shard.lower.length && shard.lower[end].startsWith(query)) {
+        end++;
+    }
+
+    const prefix = [];
+    const infix = [];
+    candidates.forEach((rowId) => {
+        if (rowId >= start && rowId < end) {
+            prefix.push(rowId);
+        } else if (shard.lower[rowId].includes(query)) {
+            infix.push(rowId);
+        }
     });
+    prefix.sort((a, b) => a - b);
+    infix.sort((a, b) => a - b);
 
+    const rows = prefix.concat(infix);
+    lastQuery = { key: selectionKey + query, rows: rows };
     return rows;
 }
 
+// =============================================================================
+// Rendering
+// =============================================================================
+
 function renderMembers() {
     const world = els.world.value;
     const guild = els.guild.value;
     const query = els.search.value.trim().toLowerCase();
 
     els.grid.innerHTML = '';
+    visibleRows = [];
+    renderedCount = 0;
 
     if (!world) {
         els.heading.textContent = 'Members';
@@ -211,6 +393,12 @@ function renderMembers() {
         return;
     }
 
+    if (!shard) {
+        els.heading.textContent = `Members — ${world}`;
+        els.statMembers.textContent = '--';
+        return;
+    }
+
     if (!guild) {
         els.heading.textContent = `Members — ${world}`;
         els.statMembers.textContent = '--';
@@ -218,43 +406,58 @@ function renderMembers() {
         return;
     }
 
-    const showGuildColumn = guild === CONFIG.allGuildsValue;
-    const rows = selectedMembers().filter(
-        (row) => !query || row.name.toLowerCase().includes(query)
-    );
+    visibleRows = queryRows(query);
 
-    els.heading.textContent = showGuildColumn
+    els.heading.textContent = guild === CONFIG.allGuildsValue
         ? `Members — ${world} (all guilds)`
         : `Members — ${guild} on ${world}`;
-    els.statMembers.textContent = rows.length;
+    els.statMembers.textContent = visibleRows.length;
 
-    if (!rows.length) {
+    if (!visibleRows.length) {
         setStatus(query ? `No members match "${els.search.value.trim()}".` : 'This guild has no members on record.');
         return;
     }
 
-    setStatus(`Showing ${rows.length} member${rows.length === 1 ? '' : 's'}.`);
+    setStatus(`Showing ${visibleRows.length} member${visibleRows.length === 1 ? '' : 's'}.`);
+    renderNextPage();
+}
+
+/**
+ * Append the next batch of member cards. Only the first page is built up
+ * front; the rest are added as the sentinel below the grid scrolls into view.
+ */
+function renderNextPage() {
+    if (!shard || renderedCount >= visibleRows.length) {
+        return;
+    }
+
+    const showGuildColumn = els.guild.value === CONFIG.allGuildsValue;
+    const pageEnd = 'IntersectionObserver' in window
+        ? Math.min(renderedCount + CONFIG.pageSize, visibleRows.length)
+        : visibleRows.length;
 
     const fragment = document.createDocumentFragment();
-    rows.forEach((row) => {
+    for (let i = renderedCount; i < pageEnd; i++) {
+        const rowId = visibleRows[i];
         const card = document.createElement('div');
         card.className = 'member-card';
 
         const name = document.createElement('span');
         name.className = 'member-name';
-        name.textContent = row.name;
+        name.textContent = shard.names[rowId];
         card.appendChild(name);
 
         if (showGuildColumn) {
             const guildLabel = document.createElement('span');
             guildLabel.className = 'member-guild';
-            guildLabel.textContent = row.guild;
+            guildLabel.textContent = shard.guilds[shard.guild[rowId]];
             card.appendChild(guildLabel);
         }
 
         fragment.appendChild(card);
-    });
+    }
     els.grid.appendChild(fragment);
+    renderedCount = pageEnd;
 }
 
 function setStatus(message, isError) {
@@ -262,28 +465,149 @@ function setStatus(message, isError) {
     els.status.classList.toggle('is-error', Boolean(isError));
 }
 
+// =============================================================================
+// Global Search (cross-world member index)
+// =============================================================================
+
+/** Load (once) the member index manifest: its shards and the case-fold table. */
+function loadMemberManifest() {
+    if (!memberManifest) {
+        memberManifest = fetchJson(`${CONFIG.memberIndexDir}index.json`)
+            .then(result => (result ? result.data : { shards: {}, fold: {} }))
+            .catch(error => {
+                memberManifest = null; // Retry on the next search
+                throw error;
+            });
+    }
+    return memberManifest;
+}
+
+/**
+ * Mirror of member_index.fold(): str.casefold() is toLowerCase() plus the
+ * manifest's table for the characters it folds further ('ß' -> 'ss').
+ */
+function memberFold(text, foldTable) {
+    return Array.from(text.toLowerCase(), c => foldTable[c] || c).join('');
+}
+
+/** Mirror of member_index.shard_key(): first letter, or '_' for anything else. */
+function memberShardKey(folded) {
+    const first = folded.charAt(0);
+    return first >= 'a' && first <= 'z' ? first : '_';
+}
+
+async function loadMemberShard(key) {
+    if (!(key in memberShards)) {
+        const result = await fetchJson(`${CONFIG.memberIndexDir}${key}.json`);
+        memberShards[key] = result ? result.data : null;
+    }
+    return memberShards[key];
+}
+
+/** First row id whose folded name is >= value. */
+function memberLowerBound(folded, value) {
+    let lo = 0;
+    let hi = folded.length;
+    while (lo < hi) {
+        const mid = (lo + hi) >>> 1;
+        if (folded[mid] < value) {
+            lo = mid + 1;
+        } else {
+            hi = mid;
+        }
+    }
+    return lo;
+}
+
+async function runGlobalSearch() {
+    const text = els.globalSearch.value.trim();
+    els.globalResults.innerHTML = '';
+
+    if (!text) {
+        els.globalStatus.textContent = "Search every world's guilds at once.";
+        return;
+    }
+
+    let query;
+    let memberShard;
+    try {
+        const index = await loadMemberManifest();
+        query = memberFold(text, index.fold || {});
+        memberShard = await loadMemberShard(memberShardKey(query));
+    } catch (error) {
+        els.globalStatus.textContent = `Could not load the member index (${error.message}).`;
+        return;
+    }
+    if (text !== els.globalSearch.value.trim()) {
+        return; // The query changed while the shard was loading
+    }
+
+    const rows = [];
+    if (memberShard) {
+        for (let row = memberLowerBound(memberShard.folded, query);
+            row < memberShard.folded.length && memberShard.folded[row].startsWith(query) &&
+            rows.length < CONFIG.globalResultLimit;
+            row++) {
+            rows.push(row);
+        }
+    }
+
+    if (!rows.length) {
+        els.globalStatus.textContent = `No guild members found starting with "${els.globalSearch.value.trim()}".`;
+        return;
+    }
+
+    els.globalStatus.textContent = rows.length === CONFIG.globalResultLimit
+        ? `Showing the first ${rows.length} matches - keep typing to narrow down.`
+        : `Found ${rows.length} match${rows.length === 1 ? '' : 'es'}.`;
+
+    const fragment = document.createDocumentFragment();
+    rows.forEach((row) => {
+        const world = memberShard.worlds[memberShard.world[row]];
+        const guild = memberShard.guilds[memberShard.guild[row]];
+        const params = new URLSearchParams({ world: world, guild: guild });
+
+        const card = document.createElement('a');
+        card.className = 'member-card';
+        card.href = `?${params.toString()}`;
+
+        const name = document.createElement('span');
+        name.className = 'member-name';
+        name.textContent = memberShard.names[row];
+        card.appendChild(name);
+
+        const guildLabel = document.createElement('span');
+        guildLabel.className = 'member-guild';
+        guildLabel.textContent = `${guild} · ${world}`;
+        card.appendChild(guildLabel);
+
+        fragment.appendChild(card);
+    });
+    els.globalResults.appendChild(fragment);
+}
+
 // =============================================================================
 // URL State (shareable links)
 // =============================================================================
 
-function applyStateFromUrl() {
+async function applyStateFromUrl() {
     const params = new URLSearchParams(window.location.search);
     const world = params.get('world');
     const guild = params.get('guild');
 
-    if (!world || !(world in worldsData)) {
+    if (!world || !(world in manifest.worlds)) {
         return;
     }
 
     els.world.value = world;
-    populateGuilds(world);
+    await onWorldChange();
 
-    if (guild && (guild === CONFIG.allGuildsValue || guild in (worldsData[world] || {}))) {
+    if (shard && guild && (guild === CONFIG.allGuildsValue || guild in shard.guildIndex)) {
         els.guild.value = guild;
         els.search.disabled = false;
+        renderMembers();
+        syncUrl();
     }
-
-    renderMembers();
 }
 
 function syncUrl() {
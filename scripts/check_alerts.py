@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Evaluate the alerts and block lists against who is online right now.
+
+Each run fetches every configured world's online list (one request per
+world, all worlds concurrently) and matches it against the watched names
+from alerts.json and block.json, then writes an events file saying who is
+online, on which world and in which guild, plus what changed since the
+previous run.
+
+Watched names are case-folded into one dict up front, so matching is a set
+lookup per online player no matter how many names are watched; guilds come
+from the guild snapshot (world_guilds_data.json), not extra API calls.
+
+Events file layout:
+    {
+        "generated": "<ISO time>",
+        "online": [{"name", "lists", "world", "guild"}, ...],
+        "changes": {"online": [...], "offline": [...], "moved": [...]},
+        "unavailable_worlds": ["<world>", ...]
+    }
+
+A world whose online list can't be fetched is reported in
+"unavailable_worlds"; watched players last seen there are carried over
+instead of being reported offline.
+
+Usage:
+    python scripts/check_alerts.py [--output PATH]
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import datetime, timezone
+
+# Add scripts directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import (  # noqa: E402
+    WORLDS,
+    ALERTS_FILE,
+    BLOCK_FILE,
+    WORLD_GUILDS_FILE,
+    ALERT_EVENTS_FILE
+)
+from config_store import read_json  # noqa: E402
+from member_index import fold  # noqa: E402
+from tibia_api import get_online_players, prefetch_worlds, format_run_stats  # noqa: E402
+
+# List name -> file of watched names
+WATCH_LISTS = {
+    'alerts': ALERTS_FILE,
+    'block': BLOCK_FILE,
+}
+
+
+def build_watch_index(lists):
+    """
+    Index watched names by folded name.
+
+    Args:
+        lists: List name -> list of watched character names
+
+    Returns:
+        dict: folded name -> sorted list of the lists it is on
+    """
+    index = {}
+    for list_name, names in lists.items():
+        for name in names:
+            if name:
+                index.setdefault(fold(name), set()).add(list_name)
+    return {folded: sorted(list_names) for folded, list_names in index.items()}
+
+
+def build_guild_lookup(watch, worlds_data):
+    """
+    Find the guild of every watched name in the guild snapshot.
+
+    Returns:
+        dict: folded name -> (world, guild) for watched guild members
+    """
+    lookup = {}
+    for world, guilds in worlds_data.items():
+        for guild, members in guilds.items():
+            for member in members:
+                folded = fold(member)
+                if folded in watch:
+                    lookup[folded] = (world, guild)
+    return lookup
+
+
+def evaluate(watch, online_by_world, guild_lookup):
+    """
+    Match online players against the watched names.
+
+    Args:
+        watch: From build_watch_index
+        online_by_world: World -> online player names
+        guild_lookup: From build_guild_lookup
+
+    Returns:
+        dict: folded name -> {'name', 'lists', 'world', 'guild'}
+    """
+    online = {}
+    for world, names in online_by_world.items():
+        for name in names:
+            folded = fold(name)
+            if folded not in watch:
+                continue
+            guild_world, guild = guild_lookup.get(folded, (None, None))
+            online[folded] = {
+                'name': name,
+                'lists': watch[folded],
+                'world': world,
+                'guild': guild if guild_world == world else None,
+            }
+    return online
+
+
+def diff_online(previous, current):
+    """
+    What changed between two runs' online entries (both keyed by folded name).
+
+    Returns:
+        dict: 'online' (new), 'offline' (gone) and 'moved' (world or guild
+        changed) entries, each sorted by name
+    """
+    def by_name(entries):
+        return sorted(entries, key=lambda entry: fold(entry['name']))
+
+    moved = [
+        dict(entry, previous_world=previous[key]['world'], previous_guild=previous[key]['guild'])
+        for key, entry in current.items()
+        if key in previous and (entry['world'], entry['guild']) != (previous[key]['world'], previous[key]['guild'])
+    ]
+    return {
+        'online': by_name(entry for key, entry in current.items() if key not in previous),
+        'offline': by_name(entry for key, entry in previous.items() if key not in current),
+        'moved': by_name(moved),
+    }
+
+
+def load_previous(path):
+    """Online entries from the previous events file, keyed by folded name."""
+    try:
+        with open(path, 'r') as f:
+            events = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+    return {fold(entry['name']): entry for entry in events.get('online', [])}
+
+
+def load_list(path):
+    """Load a watched-name list (empty if missing or unreadable)."""
+    try:
+        return read_json(path)
+    except FileNotFoundError:
+        print(f"Warning: {path} not found. Using empty list.")
+        return []
+    except ValueError as e:
+        print(f"Error loading {path}: {e}")
+        return []
+
+
+def main(argv=None):
+    """Fetch online lists, evaluate the watch lists and write the events file."""
+    parser = argparse.ArgumentParser(description="Check alerts and block lists against online players")
+    parser.add_argument('--output', default=ALERT_EVENTS_FILE, help="Events file (also the previous-run state)")
+    args = parser.parse_args(argv)
+
+    print("=" * 60)
+    print("Checking Alert Lists Against Online Players")
+    print("=" * 60)
+
+    watch = build_watch_index({name: load_list(path) for name, path in WATCH_LISTS.items()})
+    print(f"Watching {len(watch)} name(s)")
+
+    try:
+        guild_lookup = build_guild_lookup(watch, read_json(WORLD_GUILDS_FILE))
+    except (FileNotFoundError, ValueError) as e:
+        print(f"Warning: no guild snapshot ({e}) - guilds will be unknown")
+        guild_lookup = {}
+
+    # One request per world, all in flight together
+    prefetch_worlds(WORLDS)
+    online_by_world = {}
+    unavailable = []
+    for world in WORLDS:
+        names = get_online_players(world)
+        if names is None:
+            print(f"  [{world}] Failed to fetch online list")
+            unavailable.append(world)
+        else:
+            online_by_world[world] = names
+
+    previous = load_previous(args.output)
+    current = evaluate(watch, online_by_world, guild_lookup)
+    # Don't report players as offline just because their world didn't answer
+    for key, entry in previous.items():
+        if entry['world'] in unavailable and key not in current:
+            current[key] = entry
+    changes = diff_online(previous, current)
+
+    events = {
+        'generated': datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z'),
+        'online': sorted(current.values(), key=lambda entry: fold(entry['name'])),
+        'changes': changes,
+        'unavailable_worlds': unavailable,
+    }
+    directory = os.path.dirname(args.output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(events, f, indent=2)
+
+    # Summary
+    print(f"\n{'=' * 60}")
+    print("Summary")
+    print("=" * 60)
+    print(f"Online now: {len(events['online'])}")
+    for entry in events['online']:
+        guild = f", {entry['guild']}" if entry['guild'] else ""
+        print(f"  - {entry['name']} [{', '.join(entry['lists'])}] ({entry['world']}{guild})")
+    print(f"Came online: {len(changes['online'])}, went offline: {len(changes['offline'])}, "
+          f"moved: {len(changes['moved'])}")
+    if unavailable:
+        print(f"Unavailable worlds: {', '.join(unavailable)}")
+    print(format_run_stats())
+    print(f"\nWrote alert events to {args.output}")
+
+    if len(unavailable) == len(WORLDS):
+        raise RuntimeError("Failed to fetch online lists for all worlds. Check API availability.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,21 +8,71 @@ Features:
 - Automatic name normalization to proper Tibia capitalization
 - Exponential backoff retry logic for API calls
 - Per-run caching so the same killer is only looked up once
+- Killers of a victim are classified as a batch: list checks and the guild
+  snapshot answer most of them, and the rest are looked up concurrently
+- Guild and death checks are drained from a persistent priority queue, so
+  failed lookups are retried later instead of blocking the run
+- Deaths already processed by an earlier run (or for another victim of the
+  same fight earlier in this run) are remembered in a persistent death-event
+  store, so only the killers of new deaths are classified (see death_store.py)
+- War mode: each enemy guild is checked on its own cadence, from every run
+  while it's active to every 30 minutes while it's idle, within a shared
+  API request budget (see enemy_cadence.py; `--all` checks every guild)
+- `--profile [DIR]` writes a cProfile/tracemalloc report of the run's phases
+  (load, fetch, build, diff, save); see profiling.py
 """
 
-import json
+import argparse
 import sys
 import os
+import time
+from collections import namedtuple
 
 # Add scripts directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from config import ENEMY_GUILDS, TROLLS_FILE, BASTEX_FILE  # noqa: E402
+from config import (  # noqa: E402
+    ENEMY_GUILDS,
+    TROLLS_FILE,
+    BASTEX_FILE,
+    WORLD_GUILDS_FILE,
+    ENEMY_QUEUE_FILE,
+    ENEMY_CADENCE_FILE,
+    DEATH_STORE_FILE,
+    PRIORITY_HIGH,
+    QUEUE_RUN_BUDGET,
+    QUEUED_FETCH_ATTEMPTS,
+    PROFILE_DIR,
+    TIMESERIES_ENEMIES
+)
 from tibia_api import (  # noqa: E402
-    get_online_guild_members,
+    fetch_guild,
     fetch_character,
-    get_character_info
+    get_character_info,
+    prefetch_characters,
+    format_run_stats,
+    get_run_stats,
+    GUILD_MEMBER_FIELDS,
+    CHARACTER_DEATH_FIELDS,
+    CHARACTER_INFO_FIELDS
+)
+from config_store import (  # noqa: E402
+    read_json,
+    write_json,
+    compare_and_swap,
+    update,
+    current_version,
+    ConflictError
 )
+from death_store import DeathStore, player_killers  # noqa: E402
+from enemy_cadence import EnemyCadence, count_new_deaths  # noqa: E402
+from timeseries import api_sample, record_run  # noqa: E402
+import profiling  # noqa: E402
+from profiling import phase  # noqa: E402
+from work_queue import WorkQueue, drain  # noqa: E402
+
+TASK_ONLINE_CHECK = 'online_check'
+TASK_DEATH_CHECK = 'death_check'
 
 
 def extract_player_killers(deaths):
@@ -48,8 +98,7 @@ def extract_player_killers(deaths):
 def load_json_list(filepath):
     """Load a JSON array from file."""
     try:
-        with open(filepath, 'r') as f:
-            return json.load(f)
+        return list(read_json(filepath))
     except FileNotFoundError:
         print(f"Warning: {filepath} not found. Using empty list.")
         return []
@@ -58,11 +107,24 @@ def load_json_list(filepath):
         return []
 
 
-def save_trolls(trolls):
-    """Save trolls list to file."""
+def save_trolls(trolls, expected_version=None, added=(), normalized=()):
+    """
+    Save trolls list to file.
+
+    With expected_version, the list is only written if nobody else saved the
+    file since it was loaded; otherwise this run's additions and name fixes
+    are re-applied on top of the current file instead of overwriting it.
+    """
     try:
-        with open(TROLLS_FILE, 'w') as f:
-            json.dump(trolls, f, indent=4)
+        if expected_version is None:
+            write_json(TROLLS_FILE, trolls)
+        else:
+            try:
+                compare_and_swap(TROLLS_FILE, expected_version, trolls)
+            except ConflictError:
+                print(f"{TROLLS_FILE} changed during this run - merging changes into it")
+                trolls, _ = update(TROLLS_FILE, lambda current: merge_troll_changes(current, added, normalized),
+                                   default=[])
         print(f"Successfully saved {len(trolls)} entries to {TROLLS_FILE}")
         return True
     except Exception as e:
@@ -70,6 +132,32 @@ def save_trolls(trolls):
         return False
 
 
+def merge_troll_changes(current, added, normalized):
+    """
+    Apply a run's changes to a trolls list another writer has since updated.
+
+    Args:
+        current: The trolls list as currently saved
+        added: (name, world, killed_by) tuples of trolls added this run
+        normalized: (old_name, new_name) case corrections made this run
+
+    Returns:
+        list: A new list (current is left untouched)
+    """
+    merged = list(current)
+    lookup = build_case_insensitive_map(merged)
+    for old_name, new_name in normalized:
+        if old_name.lower() in lookup:
+            idx, _ = lookup[old_name.lower()]
+            merged[idx] = new_name
+            lookup[new_name.lower()] = (idx, new_name)
+    for name, _, _ in added:
+        if name.lower() not in lookup:
+            merged.append(name)
+            lookup[name.lower()] = (len(merged) - 1, name)
+    return merged
+
+
 def build_case_insensitive_map(names):
     """
     Build a case-insensitive lookup map.
@@ -80,29 +168,214 @@ def build_case_insensitive_map(names):
     return {name.lower(): (idx, name) for idx, name in enumerate(names)}
 
 
-def main():
+# Killer verdicts
+BASTEX = 'bastex'                    # In bastex list - skip
+ALREADY_CHECKED = 'already_checked'  # Rejected earlier this run for this world
+KNOWN = 'known'                      # Already in trolls list with this exact name
+NORMALIZE = 'normalize'              # In trolls list with a different case - fix it
+KEEP_EXISTING = 'keep_existing'      # In trolls list with a different case - keep it
+NOT_FOUND = 'not_found'              # No such character (the API said so)
+LOOKUP_FAILED = 'lookup_failed'      # Character lookup failed - no verdict yet
+DIFFERENT_WORLD = 'different_world'  # Character plays on another world
+GUILDED = 'guilded'                  # Character is in a guild
+ADD = 'add'                          # Unguilded on this world - add to trolls
+
+# Verdicts that are remembered in skipped_killers for the rest of the run
+REJECTED = frozenset({NOT_FOUND, DIFFERENT_WORLD, GUILDED})
+
+Verdict = namedtuple('Verdict', ['action', 'name', 'detail'])
+Verdict.__doc__ = """
+Verdict for one candidate killer.
+
+name is the name to use (the correct name for ADD/NORMALIZE, the existing
+entry for KNOWN/KEEP_EXISTING); detail is the other world, the guild, or the
+old name being normalized.
+"""
+
+
+def build_guild_snapshot_index(worlds_data):
+    """
+    Index guild data by lower-cased member name.
+
+    Returns:
+        dict: lowercase_name -> (world, guild)
+    """
+    return {
+        member.lower(): (world, guild)
+        for world, guilds in worlds_data.items()
+        for guild, members in guilds.items()
+        for member in members
+    }
+
+
+def classify_killers(killers, world, bastex_set, trolls_lookup, skipped_killers,
+                     character_info, guild_index=None):
+    """
+    Decide what to do with every candidate killer of one victim in one pass.
+
+    Everything that can be answered locally is: the bastex and troll lists,
+    this run's earlier rejections and, when given, the guild snapshot (a
+    member of a known guild is either guilded or on another world). Only the
+    remaining names are looked up, in a single character_info call.
+
+    Args:
+        killers: Candidate killer names
+        world: World the victim plays on
+        bastex_set: Lower-cased bastex names
+        trolls_lookup: lowercase_name -> (index, name) of the trolls list
+        skipped_killers: (lowercase_name, world) pairs rejected earlier this run
+        character_info: Function taking a list of names and returning
+            name -> (correct_name, world, guild_name), (None, None, None) for
+            a character that doesn't exist, or None if the lookup failed
+        guild_index: Optional snapshot index from build_guild_snapshot_index
+
+    Returns:
+        dict: killer name -> Verdict
+    """
+    verdicts = {}
+    unresolved = []
+    world_lower = world.lower()
+
+    for killer in killers:
+        lower = killer.lower()
+        if lower in bastex_set:
+            verdicts[killer] = Verdict(BASTEX, killer, None)
+        elif (lower, world) in skipped_killers:
+            verdicts[killer] = Verdict(ALREADY_CHECKED, killer, None)
+        elif lower in trolls_lookup:
+            existing = trolls_lookup[lower][1]
+            if existing == killer:
+                verdicts[killer] = Verdict(KNOWN, existing, None)
+            else:
+                unresolved.append(killer)  # need the correct capitalization
+        elif guild_index and lower in guild_index:
+            member_world, guild = guild_index[lower]
+            if member_world.lower() != world_lower:
+                verdicts[killer] = Verdict(DIFFERENT_WORLD, killer, member_world)
+            else:
+                verdicts[killer] = Verdict(GUILDED, killer, guild)
+        else:
+            unresolved.append(killer)
+
+    info = character_info(unresolved) if unresolved else {}
+    for killer in unresolved:
+        lower = killer.lower()
+        if info[killer] is None and lower not in trolls_lookup:
+            verdicts[killer] = Verdict(LOOKUP_FAILED, killer, None)
+            continue
+        correct_name, char_world, char_guild = info[killer] or (None, None, None)
+        if lower in trolls_lookup:
+            existing = trolls_lookup[lower][1]
+            if correct_name and correct_name != existing:
+                verdicts[killer] = Verdict(NORMALIZE, correct_name, existing)
+            else:
+                verdicts[killer] = Verdict(KEEP_EXISTING, existing, None)
+        elif correct_name is None:
+            verdicts[killer] = Verdict(NOT_FOUND, killer, None)
+        elif char_world and char_world.lower() != world_lower:
+            verdicts[killer] = Verdict(DIFFERENT_WORLD, killer, char_world)
+        elif char_guild:
+            verdicts[killer] = Verdict(GUILDED, killer, char_guild)
+        else:
+            verdicts[killer] = Verdict(ADD, correct_name, None)
+
+    return verdicts
+
+
+def record_processed_deaths(death_store, victim, deaths, not_found, failed):
+    """
+    Record the deaths whose killers all have a verdict.
+
+    A death with a killer whose lookup failed is left unrecorded, so the
+    next run classifies it again; killers the API said don't exist are a
+    verdict and are recorded with the death.
+
+    Args:
+        death_store: The DeathStore
+        victim: The character that died
+        deaths: Its new death records
+        not_found: Lower-cased names of killers that don't exist
+        failed: Lower-cased names of killers whose lookup failed
+
+    Returns:
+        int: Number of deaths recorded
+    """
+    recorded = 0
+    for death in deaths:
+        killers = player_killers(death)
+        if any(name.lower() in failed for name in killers):
+            continue
+        death_store.record(victim, death, [name for name in killers if name.lower() in not_found])
+        recorded += 1
+    return recorded
+
+
+def main(argv=None):
     """Main function to check online enemies and update trolls list."""
+    parser = argparse.ArgumentParser(description="Check online enemies' deaths and update trolls.json")
+    parser.add_argument('--profile', nargs='?', const=PROFILE_DIR, metavar='DIR',
+                        help=f"Profile the run's phases and write a report to DIR (default {PROFILE_DIR})")
+    parser.add_argument('--all', action='store_true',
+                        help="Check every enemy guild now, whether or not its cadence says it's due")
+    args = parser.parse_args(argv)
+    if args.profile:
+        profiling.start('enemies', args.profile)
+        try:
+            return run(args.all)
+        finally:
+            profiling.finish()
+    return run(args.all)
+
+
+def run(check_all=False):
+    """Check the enemy guilds that are due, and save new trolls."""
     print("=" * 60)
     print("Checking Online Enemies - Death List Analysis")
     print("(with case-insensitive duplicate detection & normalization)")
     print("=" * 60)
 
-    # Load existing trolls
-    trolls = load_json_list(TROLLS_FILE)
-    initial_count = len(trolls)
-
-    # Load bastex list so we don't add people who are already tracked there
-    bastex = load_json_list(BASTEX_FILE)
-    bastex_set = {name.lower() for name in bastex}
-    print(f"Loaded {len(trolls)} trolls and {len(bastex)} bastex entries")
-
-    # Build case-insensitive lookup map for trolls
-    trolls_lookup = build_case_insensitive_map(trolls)
+    # Load existing trolls (remembering the version, so saving can detect a
+    # concurrent writer)
+    with phase('load'):
+        trolls_version = current_version(TROLLS_FILE)
+        trolls = load_json_list(TROLLS_FILE)
+        initial_count = len(trolls)
+
+        # Load bastex list so we don't add people who are already tracked there
+        bastex = load_json_list(BASTEX_FILE)
+        bastex_set = {name.lower() for name in bastex}
+        print(f"Loaded {len(trolls)} trolls and {len(bastex)} bastex entries")
+
+        # Build case-insensitive lookup map for trolls
+        trolls_lookup = build_case_insensitive_map(trolls)
+
+        # Guild snapshot from the guild data job (refreshed every few minutes):
+        # a killer listed in a guild is rejected without a character lookup
+        try:
+            guild_index = build_guild_snapshot_index(read_json(WORLD_GUILDS_FILE))
+        except (FileNotFoundError, ValueError) as e:
+            print(f"Warning: no guild snapshot ({e}) - every killer will be looked up")
+            guild_index = {}
+
+        cadence = EnemyCadence.load(ENEMY_CADENCE_FILE)
+        death_store = DeathStore.load(DEATH_STORE_FILE)
+        print(f"Loaded {len(death_store.events)} processed death events")
+    if check_all:
+        due, skipped = list(ENEMY_GUILDS), []
+    else:
+        due, skipped = cadence.plan(ENEMY_GUILDS)
+    print(f"\nChecking {len(due)}/{len(ENEMY_GUILDS)} enemy guild(s) "
+          f"(request budget: {cadence.tokens:.0f})")
+    for guild_name in due:
+        print(f"  - {guild_name}: {cadence.mode(guild_name)}, heat {cadence.heat(guild_name):.1f}")
+    for guild_name, reason in skipped:
+        print(f"  - {guild_name}: not checked ({reason})")
 
     # Track changes
     new_trolls_added = []
     names_normalized = []
     list_modified = False
+    enemies_online = 0
 
     # Per-run caches: a killer often appears in several deaths (and across
     # members/guilds), so remember lookups and verdicts to avoid duplicate
@@ -110,120 +383,212 @@ def main():
     # a "different world" rejection only applies to that guild's world.
     char_info_cache = {}
     skipped_killers = set()
-
-    def get_character_info_cached(name):
-        key = name.lower()
-        if key not in char_info_cache:
-            char_info_cache[key] = get_character_info(name)
-        return char_info_cache[key]
-
-    for guild_name, world in ENEMY_GUILDS.items():
+    # Killers the API said don't exist (recorded with the deaths they took
+    # part in), and killers whose lookup failed (their deaths are left for
+    # the next run, since a failed request is no verdict)
+    killers_not_found = set()
+    killers_failed = set()
+    deaths_new = 0
+    deaths_seen = 0
+    deaths_deferred = 0
+
+    # What each checked guild showed this run, for its cadence
+    activity = {}
+    checked_guilds = set()
+
+    def guild_activity(guild_name):
+        return activity.setdefault(guild_name, {'online': 0, 'deaths': 0, 'trolls': 0, 'requests': 0})
+
+    def counting_requests(handler, guild_of):
+        # Requests made while handling a task count toward its guild's check cost
+        def run_task(task):
+            before = get_run_stats()['requests']
+            try:
+                return handler(task)
+            finally:
+                guild_activity(guild_of(task))['requests'] += get_run_stats()['requests'] - before
+        return run_task
+
+    def lookup_characters(names):
+        # One concurrent batch for the names not looked up yet this run
+        missing = [name for name in names if name.lower() not in char_info_cache]
+        if missing:
+            with phase('fetch'):
+                prefetch_characters(missing, fields=CHARACTER_INFO_FIELDS)
+                for name in missing:
+                    char_info_cache[name.lower()] = get_character_info(name)
+        return {name: char_info_cache[name.lower()] for name in names}
+
+    def check_online(task):
+        nonlocal enemies_online
+        guild_name = task.key
+        world = task.payload['world']
         print(f"\n[{guild_name}] ({world})")
         print("-" * 40)
 
         # Get online members
-        online_members = get_online_guild_members(guild_name)
+        with phase('fetch'):
+            guild_data = fetch_guild(guild_name, fields=GUILD_MEMBER_FIELDS, max_retries=QUEUED_FETCH_ATTEMPTS)
+        if guild_data is None:
+            print("  Failed to fetch guild data.")
+            return False
+        checked_guilds.add(guild_name)
+
+        online_members = [m.get('name') for m in guild_data.get('members', [])
+                          if m.get('status') == 'online']
+        guild_activity(guild_name)['online'] = len(online_members)
         if not online_members:
-            print("  No online members found or failed to fetch guild data.")
-            continue
+            print("  No online members found.")
+            return True
 
         print(f"  Found {len(online_members)} online member(s)")
-
+        enemies_online += len(online_members)
+        with phase('fetch'):
+            prefetch_characters(online_members, fields=CHARACTER_DEATH_FIELDS)
         for member_name in online_members:
-            print(f"\n  Checking deaths for: {member_name}")
-
-            # Fetch character data to get deaths
-            char_data = fetch_character(member_name)
-            if char_data is None:
-                print("    Failed to fetch character data")
-                continue
-
-            deaths = char_data.get('deaths', [])
-            if not deaths:
-                print("    No deaths recorded")
-                continue
-
-            print(f"    Found {len(deaths)} death(s)")
-
-            # Extract player killers from deaths
-            killers = extract_player_killers(deaths)
-            if not killers:
-                print("    No player killers found in deaths")
-                continue
-
-            print(f"    Found {len(killers)} unique player killer(s)")
-
-            # Check each killer
-            for killer_name in killers:
-                killer_lower = killer_name.lower()
-
-                # Skip if already in bastex list (no API call needed)
-                if killer_lower in bastex_set:
-                    print(f"      [{killer_name}] Already in bastex list - skipping")
-                    continue
-
-                # Skip if already evaluated and rejected earlier this run
-                if (killer_lower, world) in skipped_killers:
-                    print(f"      [{killer_name}] Already checked this run - skipping")
-                    continue
-
-                # Case-insensitive check if already in trolls list
-                if killer_lower in trolls_lookup:
-                    idx, existing_name = trolls_lookup[killer_lower]
-
-                    # Check if the case matches
-                    if existing_name == killer_name:
-                        print(f"      [{killer_name}] Already in trolls list")
-                    else:
-                        # Name exists but with different case - need to normalize
-                        print(f"      [{killer_name}] Found with different case: '{existing_name}'")
-
-                        # Fetch correct name from TibiaData
-                        correct_name, char_world, char_guild = get_character_info_cached(killer_name)
-
-                        if correct_name and correct_name != existing_name:
-                            print(f"        [NORMALIZED] '{existing_name}' -> '{correct_name}'")
-                            trolls[idx] = correct_name
-                            trolls_lookup[killer_lower] = (idx, correct_name)
-                            names_normalized.append((existing_name, correct_name))
-                            list_modified = True
-                        else:
-                            print(f"        Keeping existing: '{existing_name}'")
-                    continue
-
-                print(f"      Checking [{killer_name}]...", end=" ")
-
-                # Get character info to check world and guild
-                correct_name, char_world, char_guild = get_character_info_cached(killer_name)
-
-                if correct_name is None:
-                    print("Skipped (character not found)")
-                    skipped_killers.add((killer_lower, world))
-                    continue
-
-                # Check if on different world
-                if char_world and char_world.lower() != world.lower():
-                    print(f"Skipped (different world: {char_world})")
-                    skipped_killers.add((killer_lower, world))
-                    continue
-
-                # Check if has guild
-                if char_guild:
-                    print(f"Skipped (has guild: {char_guild})")
-                    skipped_killers.add((killer_lower, world))
-                    continue
+            queue.enqueue(TASK_DEATH_CHECK, member_name, PRIORITY_HIGH,
+                          payload={'guild': guild_name, 'world': world})
+        return True
 
-                # Valid troll - add with correct name
-                name_to_add = correct_name
-                print(f"ADDING (unguilded on {world})")
+    def check_deaths(task):
+        nonlocal deaths_new, deaths_seen
+        member_name = task.key
+        world = task.payload['world']
+        print(f"\n  Checking deaths for: {member_name} ({task.payload['guild']})")
+
+        # Fetch character data to get deaths
+        with phase('fetch'):
+            char_data = fetch_character(member_name, fields=CHARACTER_DEATH_FIELDS,
+                                        max_retries=QUEUED_FETCH_ATTEMPTS)
+        if char_data is None:
+            print("    Failed to fetch character data")
+            return False
+
+        deaths = char_data.get('deaths', [])
+        if not deaths:
+            print("    No deaths recorded")
+            return True
+
+        guild_name = task.payload['guild']
+        since = cadence.last_checked(guild_name)
+        if since is not None:
+            guild_activity(guild_name)['deaths'] += count_new_deaths(deaths, since)
+
+        # Only deaths no earlier check has processed
+        with phase('build'):
+            new_deaths = death_store.new_deaths(member_name, deaths)
+        deaths_new += len(new_deaths)
+        deaths_seen += len(deaths) - len(new_deaths)
+        print(f"    Found {len(deaths)} death(s), {len(new_deaths)} not processed before")
+
+        # Extract player killers from deaths
+        with phase('build'):
+            killers = extract_player_killers(new_deaths)
+        if not killers:
+            if new_deaths:
+                print("    No player killers found in new deaths")
+            record_deaths(member_name, new_deaths)
+            return True
+
+        print(f"    Found {len(killers)} unique player killer(s)")
+
+        # Character lookups inside count as 'fetch', not 'build'
+        with phase('build'):
+            verdicts = classify_killers(killers, world, bastex_set, trolls_lookup, skipped_killers,
+                                        lookup_characters, guild_index)
+
+        with phase('diff'):
+            added = apply_verdicts(killers, verdicts, world, member_name)
+        guild_activity(guild_name)['trolls'] += added
+        record_deaths(member_name, new_deaths)
+        return True
 
-                if correct_name != killer_name:
-                    print(f"        [NORMALIZED] Using correct name: '{correct_name}'")
+    def record_deaths(member_name, new_deaths):
+        nonlocal deaths_deferred
+        deaths_deferred += len(new_deaths) - record_processed_deaths(
+            death_store, member_name, new_deaths, killers_not_found, killers_failed)
+
+    def apply_verdicts(killers, verdicts, world, member_name):
+        """Apply a victim's killer verdicts to the trolls list; returns the number of trolls added."""
+        nonlocal list_modified
+        added = 0
+        for killer_name in killers:
+            verdict = verdicts[killer_name]
+            killer_lower = killer_name.lower()
+
+            if verdict.action in REJECTED:
+                skipped_killers.add((killer_lower, world))
+            if verdict.action == NOT_FOUND:
+                killers_not_found.add(killer_lower)
+            elif verdict.action == LOOKUP_FAILED:
+                killers_failed.add(killer_lower)
+
+            if verdict.action == BASTEX:
+                print(f"      [{killer_name}] Already in bastex list - skipping")
+            elif verdict.action == ALREADY_CHECKED:
+                print(f"      [{killer_name}] Already checked this run - skipping")
+            elif verdict.action == KNOWN:
+                print(f"      [{killer_name}] Already in trolls list")
+            elif verdict.action == NORMALIZE:
+                existing_name = verdict.detail
+                print(f"      [{killer_name}] Found with different case: '{existing_name}'")
+                print(f"        [NORMALIZED] '{existing_name}' -> '{verdict.name}'")
+                idx, _ = trolls_lookup[killer_lower]
+                trolls[idx] = verdict.name
+                trolls_lookup[killer_lower] = (idx, verdict.name)
+                names_normalized.append((existing_name, verdict.name))
+                list_modified = True
+            elif verdict.action == KEEP_EXISTING:
+                print(f"      [{killer_name}] Found with different case: '{verdict.name}'")
+                print(f"        Keeping existing: '{verdict.name}'")
+            elif verdict.action == NOT_FOUND:
+                print(f"      Checking [{killer_name}]... Skipped (character not found)")
+            elif verdict.action == LOOKUP_FAILED:
+                print(f"      Checking [{killer_name}]... Lookup failed - death left for the next run")
+            elif verdict.action == DIFFERENT_WORLD:
+                print(f"      Checking [{killer_name}]... Skipped (different world: {verdict.detail})")
+            elif verdict.action == GUILDED:
+                print(f"      Checking [{killer_name}]... Skipped (has guild: {verdict.detail})")
+            elif verdict.name.lower() in trolls_lookup:
+                # Another spelling of the same name was added earlier in this batch
+                print(f"      [{killer_name}] Already in trolls list")
+            else:
+                # Valid troll - add with correct name
+                name_to_add = verdict.name
+                print(f"      Checking [{killer_name}]... ADDING (unguilded on {world})")
+                if name_to_add != killer_name:
+                    print(f"        [NORMALIZED] Using correct name: '{name_to_add}'")
 
                 trolls.append(name_to_add)
                 trolls_lookup[name_to_add.lower()] = (len(trolls) - 1, name_to_add)
                 new_trolls_added.append((name_to_add, world, member_name))
                 list_modified = True
+                added += 1
+        return added
+
+    # Online checks enqueue a death check per online member; both kinds are
+    # drained from the persistent queue so failures are retried with backoff
+    # (or carried over to the next run) without blocking the other guilds
+    with WorkQueue(ENEMY_QUEUE_FILE) as queue:
+        for guild_name in due:
+            queue.enqueue(TASK_ONLINE_CHECK, guild_name, PRIORITY_HIGH, payload={'world': ENEMY_GUILDS[guild_name]})
+
+        queue_stats = drain(
+            queue,
+            {
+                TASK_ONLINE_CHECK: counting_requests(check_online, lambda task: task.key),
+                TASK_DEATH_CHECK: counting_requests(check_deaths, lambda task: task.payload['guild']),
+            },
+            deadline=time.time() + QUEUE_RUN_BUDGET
+        )
+
+    # Guilds whose online list was fetched count as checked (a failed check
+    # stays queued and due); the whole run's requests are charged to the budget
+    for guild_name, seen in activity.items():
+        if guild_name in checked_guilds:
+            cadence.record(guild_name, **seen)
+    cadence.charge(get_run_stats()['requests'])
+    cadence.save(ENEMY_CADENCE_FILE)
 
     # Summary
     print("\n" + "=" * 60)
@@ -233,6 +598,11 @@ def main():
     print(f"New trolls added: {len(new_trolls_added)}")
     print(f"Names normalized: {len(names_normalized)}")
     print(f"Final trolls count: {len(trolls)}")
+    print(f"Death events: {deaths_new} new, {deaths_seen} skipped (processed earlier or past retention), "
+          f"{deaths_deferred} left for the next run (killer lookup failed)")
+    print(f"Queue: {queue_stats['completed']} completed, {queue_stats['retried']} retried, "
+          f"{queue_stats['dropped']} dropped")
+    print(format_run_stats())
 
     if new_trolls_added:
         print("\nNew entries added:")
@@ -245,10 +615,24 @@ def main():
             print(f"  - '{old_name}' -> '{new_name}'")
 
     # Save if there were any changes
-    if list_modified:
-        save_trolls(trolls)
-    else:
-        print("\nNo changes to save.")
+    with phase('save'):
+        if list_modified:
+            saved = save_trolls(trolls, trolls_version, new_trolls_added, names_normalized)
+        else:
+            saved = True
+            print("\nNo changes to save.")
+        # Deaths only count as processed once the trolls they produced are saved
+        if saved:
+            death_store.save(DEATH_STORE_FILE)
+            print(f"Saved {len(death_store.events)} processed death events to {DEATH_STORE_FILE}")
+
+        sample = api_sample(get_run_stats())
+        sample.update({
+            'trolls': len(trolls),
+            'trolls.added': len(new_trolls_added),
+            'enemies.online': enemies_online,
+        })
+        record_run(TIMESERIES_ENEMIES, sample)
 
     print("\nDone!")
 
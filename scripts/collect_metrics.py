@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Collect dashboard metrics and update docs/data/metrics.json in place.
+
+Workflow runs are fetched once per workflow (paginated, newest first) and
+merged into a local cache keyed by run id, so each collection only pages
+back to the first run it has already seen. All rolling windows (daily
+counts, success rates, average build time) are computed in a single pass
+over the cached runs. Fields this collector does not own (e.g. security
+results) are left untouched.
+
+Run sources are pluggable: GitHubRunSource talks to the GitHub API and
+FixtureRunSource replays recorded runs from a JSON file for offline use.
+
+Usage:
+    python scripts/collect_metrics.py --repo owner/name        (GH_TOKEN from env)
+    python scripts/collect_metrics.py --fixtures runs.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import urllib.parse
+import urllib.request
+from datetime import datetime, timedelta, timezone
+
+# Add scripts directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import (  # noqa: E402
+    GITHUB_API_URL,
+    METRICS_FILE,
+    METRICS_WINDOW_DAYS,
+    METRICS_WORKFLOWS,
+    WORKFLOW_RUNS_CACHE,
+    REQUEST_TIMEOUT,
+    TROLLS_FILE,
+    BASTEX_FILE,
+    WORLDS,
+    ENEMY_GUILDS
+)
+from config_store import read_json  # noqa: E402
+from utils import parse_time  # noqa: E402
+
+# Run fields kept in the cache
+RUN_FIELDS = ('id', 'status', 'conclusion', 'created_at', 'run_started_at', 'updated_at')
+
+
+class GitHubRunSource:
+    """Fetch workflow runs from the GitHub Actions API."""
+
+    def __init__(self, repo, token=None, per_page=100):
+        self.repo = repo
+        self.token = token
+        self.per_page = per_page
+
+    def _get(self, path, params=None):
+        url = f"{GITHUB_API_URL}/repos/{self.repo}/{path}"
+        if params:
+            url += '?' + urllib.parse.urlencode(params)
+        headers = {
+            'Accept': 'application/vnd.github+json',
+            'User-Agent': 'TibiaOpsConfig/1.0',
+        }
+        if self.token:
+            headers['Authorization'] = f"Bearer {self.token}"
+        request = urllib.request.Request(url, headers=headers)
+        with urllib.request.urlopen(request, timeout=REQUEST_TIMEOUT) as response:
+            return json.loads(response.read())
+
+    def runs(self, workflow, since):
+        """
+        Yield runs of a workflow created at or after `since`, newest first.
+
+        Callers may stop iterating early; pages are only fetched on demand.
+        """
+        page = 1
+        while True:
+            data = self._get(f"actions/workflows/{workflow}/runs", {
+                'per_page': self.per_page,
+                'page': page,
+                'created': f">={since.strftime('%Y-%m-%d')}",
+            })
+            runs = data.get('workflow_runs', [])
+            yield from runs
+            if len(runs) < self.per_page:
+                return
+            page += 1
+
+    def run(self, run_id):
+        """Fetch a single run (used to refresh runs that were still in progress)."""
+        return self._get(f"actions/runs/{run_id}")
+
+
+class FixtureRunSource:
+    """Replay recorded runs: a JSON file of {workflow file: [run, ...]}."""
+
+    def __init__(self, path):
+        with open(path, 'r') as f:
+            self._runs = json.load(f)
+
+    def runs(self, workflow, since):
+        runs = sorted(self._runs.get(workflow, []), key=lambda r: r['created_at'], reverse=True)
+        for run in runs:
+            if parse_time(run['created_at']) >= since.timestamp():
+                yield run
+
+    def run(self, run_id):
+        for runs in self._runs.values():
+            for run in runs:
+                if run['id'] == run_id:
+                    return run
+        return None
+
+
+def load_cache(path=WORKFLOW_RUNS_CACHE):
+    """Load the run cache: {workflow: {run id (str): run}}."""
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        print(f"Warning: could not load run cache ({e}) - starting fresh")
+        return {}
+
+
+def save_cache(cache, path=WORKFLOW_RUNS_CACHE):
+    """Write the run cache."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(cache, f, separators=(',', ':'))
+
+
+def update_cache(cache, source, workflow, since):
+    """
+    Merge new and updated runs of a workflow into the cache.
+
+    Pages back only until the first completed run that is already cached
+    (runs come newest first), refreshes cached runs that were still in
+    progress, and prunes runs older than the window.
+
+    Returns:
+        int: Number of runs fetched or refreshed
+    """
+    runs = cache.setdefault(workflow, {})
+    fetched = 0
+
+    for run in source.runs(workflow, since):
+        cached = runs.get(str(run['id']))
+        if cached is not None and cached.get('status') == 'completed':
+            break
+        runs[str(run['id'])] = {field: run.get(field) for field in RUN_FIELDS}
+        fetched += 1
+
+    for run_id, cached in list(runs.items()):
+        if cached.get('status') != 'completed':
+            refreshed = source.run(int(run_id))
+            if refreshed:
+                runs[run_id] = {field: refreshed.get(field) for field in RUN_FIELDS}
+                fetched += 1
+
+    for run_id, cached in list(runs.items()):
+        if parse_time(cached['created_at']) < since.timestamp():
+            del runs[run_id]
+
+    return fetched
+
+
+def format_duration(seconds):
+    """Format seconds as '2m 34s'."""
+    seconds = int(round(seconds))
+    return f"{seconds // 60}m {seconds % 60:02d}s"
+
+
+def compute_pipeline_metrics(cache, now, window_days=METRICS_WINDOW_DAYS):
+    """
+    Compute every pipeline window in one pass over the cached runs.
+
+    Returns:
+        dict: The 'pipeline' section of metrics.json
+    """
+    start_day = (now - timedelta(days=window_days - 1)).date()
+    days = [start_day + timedelta(days=i) for i in range(window_days)]
+    day_index = {day: idx for idx, day in enumerate(days)}
+
+    series = {}
+    totals = {}
+    successes = {}
+    build_seconds = []
+
+    for name, workflow in METRICS_WORKFLOWS.items():
+        daily = [0] * window_days
+        total = success = 0
+        for run in cache.get(workflow, {}).values():
+            created = datetime.fromtimestamp(parse_time(run['created_at']), timezone.utc)
+            idx = day_index.get(created.date())
+            if idx is None:
+                continue
+            daily[idx] += 1
+            total += 1
+            if run.get('conclusion') == 'success':
+                success += 1
+                if name == 'ci' and run.get('run_started_at') and run.get('updated_at'):
+                    build_seconds.append(parse_time(run['updated_at']) - parse_time(run['run_started_at']))
+        series[name] = daily
+        totals[name] = total
+        successes[name] = success
+
+    def rate(name):
+        return f"{successes[name] * 100 // totals[name] if totals[name] else 0}%"
+
+    return {
+        'labels': [day.strftime('%b %d') for day in days],
+        'ci': series['ci'],
+        'cd': series['cd'],
+        'ciSuccessRate': rate('ci'),
+        'cdSuccessRate': rate('cd'),
+        'avgBuildTime': format_duration(sum(build_seconds) / len(build_seconds)) if build_seconds else '--',
+        'totalDeployments': totals['cd'],
+    }
+
+
+def count_entries(path):
+    """Number of entries in a JSON list file (0 if missing or unreadable)."""
+    try:
+        return len(read_json(path))
+    except Exception:
+        return 0
+
+
+def compute_application_metrics():
+    """Counts for the 'application' section that come from the repo itself."""
+    return {
+        'trollsTotal': count_entries(TROLLS_FILE),
+        'bastexTotal': count_entries(BASTEX_FILE),
+        'worldsMonitored': len(WORLDS),
+        'guildsMonitored': len(ENEMY_GUILDS),
+    }
+
+
+def update_metrics_file(pipeline, application, now, path=METRICS_FILE):
+    """
+    Merge the computed sections into metrics.json, keeping fields we don't own.
+
+    `updated` records when each value was last written: the pipeline section
+    as a whole, and each application field on its own (null if it predates
+    the timestamps), so the dashboard can mark values a run didn't refresh
+    as stale instead of showing them as current.
+    """
+    try:
+        with open(path, 'r') as f:
+            metrics = json.load(f)
+    except (FileNotFoundError, ValueError):
+        metrics = {}
+
+    stamp = now.isoformat().replace('+00:00', 'Z')
+    metrics.setdefault('pipeline', {}).update(pipeline)
+    metrics.setdefault('application', {}).update(application)
+    updated = metrics.get('updated')
+    previous = updated.get('application') if isinstance(updated, dict) else None
+    if not isinstance(previous, dict):
+        previous = {}
+    metrics['updated'] = {
+        'pipeline': stamp,
+        'application': {name: stamp if name in application else previous.get(name)
+                        for name in metrics['application']},
+    }
+    metrics['lastUpdated'] = stamp
+
+    with open(path, 'w') as f:
+        json.dump(metrics, f, indent=2)
+    return metrics
+
+
+def collect(source, now=None, cache_path=WORKFLOW_RUNS_CACHE, metrics_path=METRICS_FILE):
+    """Refresh the run cache from a source and rewrite the metrics file."""
+    now = now or datetime.now(timezone.utc)
+    since = datetime.combine(
+        (now - timedelta(days=METRICS_WINDOW_DAYS - 1)).date(), datetime.min.time(), timezone.utc
+    )
+
+    cache = load_cache(cache_path)
+    for workflow in METRICS_WORKFLOWS.values():
+        fetched = update_cache(cache, source, workflow, since)
+        print(f"  {workflow}: {fetched} run(s) fetched, {len(cache[workflow])} in window")
+    save_cache(cache, cache_path)
+
+    pipeline = compute_pipeline_metrics(cache, now)
+    metrics = update_metrics_file(pipeline, compute_application_metrics(), now, metrics_path)
+    print(f"CI: {pipeline['ciSuccessRate']} success, CD: {pipeline['cdSuccessRate']} success, "
+          f"avg build {pipeline['avgBuildTime']}")
+    return metrics
+
+
+def main(argv=None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Update docs/data/metrics.json")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument('--repo', help="GitHub repository (owner/name); token from GH_TOKEN")
+    group.add_argument('--fixtures', help="JSON file of recorded runs to use instead of the API")
+    parser.add_argument('--cache', default=WORKFLOW_RUNS_CACHE, help="Run cache file")
+    parser.add_argument('--output', default=METRICS_FILE, help="Metrics file to update")
+    args = parser.parse_args(argv)
+
+    if args.fixtures:
+        source = FixtureRunSource(args.fixtures)
+    else:
+        source = GitHubRunSource(args.repo, os.environ.get('GH_TOKEN'))
+
+    print("=== Collecting Dashboard Metrics ===")
+    collect(source, cache_path=args.cache, metrics_path=args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -13,6 +13,22 @@ MAX_RETRIES = 4
 INITIAL_BACKOFF = 2  # seconds
 TRANSIENT_ERROR_CODES = [429, 502, 503, 504]  # Rate limit, Bad Gateway, Service Unavailable, Gateway Timeout
 REQUEST_TIMEOUT = 30  # seconds
+MAX_RETRY_AFTER = 60  # seconds - cap on a server-supplied Retry-After delay
+
+# Requests in flight at once when fetching a batch of URLs
+MAX_CONCURRENT_REQUESTS = 4
+
+# Stop calling an endpoint class (guild, character, ...) for the rest of the
+# run after this many consecutive failed requests (5xx or 429 responses,
+# network errors or timeouts)
+CIRCUIT_BREAKER_THRESHOLD = 5
+
+# Attempts per request made by a work-queue task. The queue reschedules a
+# failed task itself (MAX_RETRIES times, without blocking other tasks), so
+# those requests are not retried inline too: a task costs at most one
+# attempt per queue run, plus the retries of the batch prefetch it may get
+# its response from.
+QUEUED_FETCH_ATTEMPTS = 1
 
 # =============================================================================
 # World Configuration
@@ -43,3 +59,141 @@ BASTEX_FILE = f'{CONFIGS_DIR}/bastex.json'
 BLOCK_FILE = f'{CONFIGS_DIR}/block.json'
 ALERTS_FILE = f'{CONFIGS_DIR}/alerts.json'
 WORLD_GUILDS_FILE = f'{CONFIGS_DIR}/world_guilds_data.json'
+
+# =============================================================================
+# Work Queue Configuration
+# =============================================================================
+# Pending fetch tasks are persisted between runs so unfinished work carries
+# over (the scheduled workflow restores CACHE_DIR with actions/cache)
+CACHE_DIR = '.cache'
+GUILD_QUEUE_FILE = f'{CACHE_DIR}/guild_queue.sqlite3'
+ENEMY_QUEUE_FILE = f'{CACHE_DIR}/enemy_queue.sqlite3'
+
+# Alert evaluator state: who was online last run, to report what changed
+ALERT_EVENTS_FILE = f'{CACHE_DIR}/alert_events.json'
+
+# Deaths check-enemies already processed, keyed by (victim, time), so later
+# runs only classify the killers of new deaths (see death_store.py). Kept a
+# little longer than the 30 days of deaths a character page lists.
+DEATH_STORE_FILE = f'{CACHE_DIR}/death_events.json.gz'
+DEATH_STORE_RETENTION = 31 * 86400  # seconds
+
+# Partial snapshots written by `gen_worlds_guilds.py --shard i/n`, combined by
+# `--merge` (the scheduled workflow passes them between matrix jobs)
+GUILD_SHARD_DIR = f'{CACHE_DIR}/shards'
+
+# `--profile` output (pstats file + text summary per job), uploaded by the
+# scheduled workflow as an artifact when a run is dispatched with profiling
+PROFILE_DIR = f'{CACHE_DIR}/profile'
+PROFILE_TOP_N = 25  # hotspots and allocation sites listed in the summary
+PROFILE_ALLOC_SAMPLES = 3  # calls per phase whose allocations are snapshotted (snapshots are slow)
+
+# Lower values are drained first
+PRIORITY_HIGH = 0     # Enemy-related work
+PRIORITY_NORMAL = 10  # Everything else
+
+# Stop draining after this many seconds and leave deferred tasks for the next
+# run (the guild and alert jobs run every 10 minutes, check-enemies every 5)
+QUEUE_RUN_BUDGET = 480  # seconds
+
+# =============================================================================
+# Enemy Check Cadence ("war mode")
+# =============================================================================
+# check-enemies runs every 5 minutes but only checks the enemy guilds that
+# are due. Each guild's heat is a decaying average of its recent activity per
+# check (members online, new deaths, trolls added): hot guilds are checked
+# every run, warm ones at the old 10-minute cadence, idle ones every 30
+# minutes. Checks are paid from a request budget that refills at
+# CADENCE_REQUESTS_PER_HOUR, so a fight moves API calls to the hot guilds
+# instead of adding to the total; a guild is never left unchecked for longer
+# than CADENCE_IDLE_INTERVAL, whatever the budget.
+ENEMY_CADENCE_FILE = f'{CACHE_DIR}/enemy_cadence.json'
+CADENCE_HOT_INTERVAL = 300      # seconds between checks of a hot guild
+CADENCE_WARM_INTERVAL = 600
+CADENCE_IDLE_INTERVAL = 1800
+CADENCE_HOT_HEAT = 5.0          # heat at or above which a guild is hot
+CADENCE_IDLE_HEAT = 0.5         # heat below which a guild is idle
+CADENCE_HEAT_HALF_LIFE = 1800   # seconds for past activity to weigh half
+CADENCE_WEIGHTS = {'online': 1.0, 'deaths': 2.0, 'trolls': 3.0}  # heat per unit of activity
+CADENCE_REQUESTS_PER_HOUR = 360  # budget refill rate; the bucket holds one hour's worth
+
+# =============================================================================
+# Guild Snapshot Guard
+# =============================================================================
+# A truncated API response looks like a guild (or a whole world) losing most
+# of its members at once. Refreshes that drop more than these fractions keep
+# the previous data and are reported as anomalies instead; smaller guilds and
+# worlds are exempt since they legitimately swing by large fractions.
+SNAPSHOT_MAX_MEMBER_DROP = 0.5   # fraction of a guild's members
+SNAPSHOT_MIN_GUILD_SIZE = 10     # members before the member check applies
+SNAPSHOT_MAX_GUILD_DROP = 0.5    # fraction of a world's guilds
+SNAPSHOT_MIN_WORLD_GUILDS = 4    # guilds before the world check applies
+
+# A drop seen with the same new size on this many consecutive runs is real,
+# not a truncated response, and is accepted. The runs seen so far are kept
+# in GUILD_QUARANTINE_FILE (one file per shard, restored from the cache).
+SNAPSHOT_QUARANTINE_RUNS = 3
+GUILD_QUARANTINE_FILE = f'{CACHE_DIR}/guild_quarantine.json'
+
+# =============================================================================
+# GitHub Pages Data
+# =============================================================================
+# Pages publishes docs/ from main, so everything the site reads lives here
+PAGES_DATA_DIR = 'docs/data'
+SEARCH_INDEX_DIR = f'{PAGES_DATA_DIR}/search'
+MEMBER_INDEX_DIR = f'{PAGES_DATA_DIR}/members'
+METRICS_FILE = f'{PAGES_DATA_DIR}/metrics.json'
+TIMESERIES_DIR = f'{PAGES_DATA_DIR}/timeseries'
+
+# Guild Explorer data is also published under content-hashed names (see
+# publish_data.py): immutable files browsers keep, and a small pointer to
+# the current ones that is the only thing they revalidate
+GUILDS_MIRROR_FILE = f'{PAGES_DATA_DIR}/world_guilds_data.json'
+PUBLISH_BLOB_DIR = f'{PAGES_DATA_DIR}/blobs'
+PUBLISH_POINTER_FILE = f'{PAGES_DATA_DIR}/latest.json'
+
+# Per-run app metrics, one store per scheduled job. Every resolution lives
+# in the Actions cache; only completed buckets of the published resolutions
+# are written to Pages (and committed), so a run that doesn't close a bucket
+# changes nothing in the repo.
+TIMESERIES_GUILDS = 'guilds'
+TIMESERIES_ENEMIES = 'enemies'
+TIMESERIES_STATE_DIR = f'{CACHE_DIR}/timeseries'
+TIMESERIES_PUBLISHED = ('hour', 'day')
+
+# Resolution -> (bucket seconds, retention seconds). Raw keeps one point per
+# run; coarser resolutions are rolled up as samples arrive.
+TIMESERIES_RESOLUTIONS = {
+    'raw': (0, 2 * 86400),           # 48 hours
+    'hour': (3600, 14 * 86400),      # 14 days
+    'day': (86400, 365 * 86400),     # 1 year
+}
+
+# =============================================================================
+# Local Query Service
+# =============================================================================
+# Read-only HTTP API over the lists and guild data (see query_service.py)
+QUERY_SERVICE_HOST = '127.0.0.1'
+QUERY_SERVICE_PORT = 8765
+QUERY_RELOAD_INTERVAL = 1.0       # seconds between checks for changed files
+QUERY_LIST_HISTORY = 16           # list versions kept for ?since= deltas
+QUERY_GZIP_MIN_BYTES = 1024       # smaller responses aren't worth compressing
+QUERY_RESPONSE_CACHE_SIZE = 4096  # encoded responses kept per data generation
+
+# =============================================================================
+# Config Deployment (S3)
+# =============================================================================
+# The CD pipeline packages .configs/*.json into one artifact and uploads it
+# gzipped, with its sha256 as object metadata (see deploy_config.py)
+DEPLOY_KEY = 'configs/combined.json'
+DEPLOY_ARTIFACT_FILE = 'combined_config.json'
+DEPLOY_MANIFEST_FILE = f'{CACHE_DIR}/deploy_manifest.json'
+DEPLOY_REQUIRED_KEYS = ['alerts', 'bastex', 'block', 'trolls']
+
+# =============================================================================
+# Dashboard Metrics Configuration
+# =============================================================================
+GITHUB_API_URL = "https://api.github.com"
+METRICS_WINDOW_DAYS = 30
+METRICS_WORKFLOWS = {'ci': 'ci.yml', 'cd': 'cd.yml'}  # dashboard series -> workflow file
+WORKFLOW_RUNS_CACHE = f'{CACHE_DIR}/workflow_runs.json'
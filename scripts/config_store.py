@@ -0,0 +1,271 @@
+"""
+Access to the JSON data files under .configs/.
+
+Reads: parsed files are cached per process and only re-read when the file
+changes on disk (inode, size or modification time), so long-running
+processes and test runs don't re-parse the same lists on every call.
+
+Writes: every write holds an advisory lock on a sidecar lock file, goes to a
+temporary file that is fsynced and renamed over the original (readers see
+the old or the new file, never a partial one). A file's version is a digest
+of its content, so any change - through the store or behind its back, e.g.
+by git - gives it a new version, however many writes happened. Workers on
+the same host can therefore either read-modify-write under the lock with
+update(), or read without it and publish with compare_and_swap(), which
+fails if the content changed in between.
+
+The lock lives next to the data file as a hidden file (.<name>.lock) and is
+not committed.
+
+A caller that serializes a file itself (e.g. in a canonical, diff-stable
+layout) can write the text with write_text() and compare it against
+file_digest() first to skip writes that wouldn't change anything.
+"""
+
+import contextlib
+import hashlib
+import json
+import os
+import tempfile
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not POSIX; writes are still atomic
+    fcntl = None
+
+# path -> ([inode, mtime_ns, size], parsed data). Writes replace the file, so
+# the inode changes even when size and (coarse) mtime don't.
+_cache = {}
+
+# path -> ([inode, mtime_ns, size], version), so an unchanged file isn't
+# hashed again
+_versions = {}
+
+VERSION_LENGTH = 16  # hex characters of the content sha256 used as the version
+MISSING_VERSION = ''  # version of a file that doesn't exist
+
+
+class ConflictError(Exception):
+    """Raised by compare_and_swap when the file changed since it was read."""
+
+
+def _sidecar(path, suffix):
+    directory, name = os.path.split(path)
+    return os.path.join(directory, f".{name}.{suffix}")
+
+
+def _stat_key(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return [stat.st_ino, stat.st_mtime_ns, stat.st_size]
+
+
+def read_json(path):
+    """
+    Load a JSON file, reusing the parsed data while the file is unchanged.
+
+    The returned object is shared between callers - copy it before
+    modifying it.
+
+    Raises:
+        FileNotFoundError: If the file does not exist
+        ValueError: If the file is not valid JSON
+    """
+    key = _stat_key(path)
+    if key is None:
+        raise FileNotFoundError(path)
+    cached = _cache.get(path)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    with open(path, 'r') as f:
+        data = json.load(f)
+    _cache[path] = (key, data)
+    return data
+
+
+def clear_cache():
+    """Forget all cached files."""
+    _cache.clear()
+    _versions.clear()
+
+
+@contextlib.contextmanager
+def locked(path):
+    """Hold the advisory write lock for a data file."""
+    lock_path = _sidecar(path, 'lock')
+    os.makedirs(os.path.dirname(lock_path) or '.', exist_ok=True)
+    with open(lock_path, 'a') as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def current_version(path):
+    """
+    The data file's version: a digest of its content (MISSING_VERSION if the
+    file doesn't exist).
+
+    Versions are equal exactly when the content is, so a compare_and_swap
+    based on an older read fails after any number of changes, including ones
+    made behind the store's back.
+    """
+    key = _stat_key(path)
+    if key is None:
+        return MISSING_VERSION
+    cached = _versions.get(path)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    version = file_digest(path)
+    if version is None:
+        return MISSING_VERSION
+    version = version[:VERSION_LENGTH]
+    _versions[path] = (key, version)
+    return version
+
+
+def read_versioned(path, default=None):
+    """
+    Load a data file together with its version.
+
+    Returns:
+        tuple: (data, version) - data is `default` if the file doesn't exist
+    """
+    version = current_version(path)
+    try:
+        return read_json(path), version
+    except FileNotFoundError:
+        return default, version
+
+
+def text_digest(text):
+    """sha256 hex digest of a serialized data file."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def file_digest(path):
+    """
+    sha256 hex digest of a data file's bytes (the file is not parsed).
+
+    Returns:
+        str or None: The digest, or None if the file doesn't exist
+    """
+    digest = hashlib.sha256()
+    try:
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 16), b''):
+                digest.update(block)
+    except FileNotFoundError:
+        return None
+    return digest.hexdigest()
+
+
+def _write(path, data, indent, text=None):
+    """
+    Atomically replace the file. Caller holds the lock.
+
+    `text`, if given, is written as is instead of serializing `data`.
+
+    Returns:
+        str: The file's new version
+    """
+    if text is None:
+        text = json.dumps(data, indent=indent)
+    directory = os.path.dirname(path) or '.'
+    with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=directory,
+                                     prefix=f".{os.path.basename(path)}.", suffix='.tmp',
+                                     delete=False) as tmp:
+        try:
+            tmp.write(text)
+            tmp.flush()
+            os.fsync(tmp.fileno())
+        except BaseException:
+            os.unlink(tmp.name)
+            raise
+    os.replace(tmp.name, path)
+    version = text_digest(text)[:VERSION_LENGTH]
+    _versions[path] = (_stat_key(path), version)
+
+    # Make the rename durable
+    if hasattr(os, 'O_DIRECTORY'):
+        fd = os.open(directory, os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+    return version
+
+
+def compact_json(data):
+    """Minified JSON with sorted keys, as write_json(compact=True) writes it."""
+    return json.dumps(data, separators=(',', ':'), sort_keys=True)
+
+
+def write_json(path, data, indent=4, compact=False):
+    """
+    Replace a data file (locked, atomic).
+
+    With compact, the JSON is minified with sorted keys (for files that are
+    only read programmatically, e.g. the Pages indexes) and indent is ignored.
+
+    Returns:
+        str: The file's new version
+    """
+    with locked(path):
+        if compact:
+            return _write(path, None, None, compact_json(data))
+        return _write(path, data, indent)
+
+
+def write_text(path, text):
+    """
+    Replace a data file with already-serialized JSON (locked, atomic).
+
+    Returns:
+        str: The file's new version
+    """
+    with locked(path):
+        return _write(path, None, None, text)
+
+
+def compare_and_swap(path, expected_version, data, indent=4):
+    """
+    Replace a data file only if it is still at expected_version.
+
+    Returns:
+        str: The file's new version
+
+    Raises:
+        ConflictError: If the file changed since expected_version was read
+    """
+    with locked(path):
+        version = current_version(path)
+        if version != expected_version:
+            raise ConflictError(f"{path} is at version {version}, expected {expected_version}")
+        return _write(path, data, indent)
+
+
+def update(path, modify, default=None, indent=4):
+    """
+    Read-modify-write a data file under its lock.
+
+    modify receives the current data (`default` if the file doesn't exist)
+    and returns the new data; it must not mutate its argument, which may be
+    shared with other readers. Returning the argument unchanged skips the
+    write.
+
+    Returns:
+        tuple: (data, version) after the update
+    """
+    with locked(path):
+        current, version = read_versioned(path, default)
+        new = modify(current)
+        if new is current:
+            return current, version
+        return new, _write(path, new, indent)
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Persistent store of the enemy deaths check-enemies has already processed.
+
+The same fight shows up in the death list of every enemy that died in it,
+and a character page lists 30 days of deaths, so most deaths a run fetches
+were already handled by an earlier run. Each processed death is kept as an
+event keyed by (victim, time), with its player killers and the ones whose
+character lookup came back not found:
+
+    DeathEvent(victim='Enemy Knight', time=1736937000, killers=('Troll A', 'Troll B'),
+               not_found=('Troll B',))
+
+A death is recorded once every killer has a verdict. A killer the API
+reported as nonexistent (usually a deleted or renamed character) counts, so
+it isn't looked up again on every run, and its verdict stays in the event
+for `killer` queries. A death with a killer whose lookup failed is not
+recorded, so the next run tries again.
+
+A run only classifies the killers of deaths not in the store. An index
+from case-folded killer name to events answers "which deaths involved
+killer X" without scanning every event.
+
+Events older than DEATH_STORE_RETENTION are dropped when the store is
+saved. The retention is longer than the 30 days a character page lists,
+and deaths older than it are never treated as new, so a dropped event
+can't come back as an unprocessed one. The file is gzipped JSON with
+every name stored once in a string table:
+
+    {
+        "format": 2,
+        "names": ["Enemy Knight", "Troll A", ...],
+        "events": [[<victim>, <time>, [<killer>, ...], [<not found>, ...]], ...]
+    }
+
+(indexes into names; format 1 events have no not-found list)
+
+so it stays small enough for the Actions cache (.cache/).
+
+Usage:
+    python scripts/death_store.py killer "Character Name"
+    python scripts/death_store.py stats
+"""
+
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+from collections import namedtuple
+from datetime import datetime, timezone
+
+# Add scripts directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import DEATH_STORE_FILE, DEATH_STORE_RETENTION  # noqa: E402
+from utils import parse_time  # noqa: E402
+
+STORE_FORMAT = 2
+
+DeathEvent = namedtuple('DeathEvent', ['victim', 'time', 'killers', 'not_found'], defaults=((),))
+DeathEvent.__doc__ = """
+One death: the victim, when (epoch seconds), the player killers' names and
+those of them the API reported as nonexistent (a 404).
+"""
+
+
+def player_killers(death):
+    """Player killer names of one death record, in order, without duplicates."""
+    names = []
+    for killer in death.get('killers', []):
+        name = killer.get('name', '')
+        if killer.get('player', False) and name and name not in names:
+            names.append(name)
+    return tuple(names)
+
+
+class DeathStore:
+    """Death events keyed by (victim, time), with a killer index."""
+
+    def __init__(self, events=(), now=None, retention=DEATH_STORE_RETENTION):
+        """
+        Args:
+            events: DeathEvents to start with
+            now: Current time (epoch seconds); defaults to time.time()
+            retention: Seconds events are kept
+        """
+        self.now = time.time() if now is None else now
+        self.cutoff = self.now - retention
+        self.events = {}     # (folded victim, time) -> DeathEvent
+        self.by_killer = {}  # folded killer -> set of event keys
+        for event in events:
+            self._add(event)
+
+    @classmethod
+    def load(cls, path, now=None, retention=DEATH_STORE_RETENTION):
+        """Load a saved store (a missing or unreadable file starts empty)."""
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                state = json.load(f)
+            names = state['names']
+            events = [DeathEvent(names[victim], when, tuple(names[k] for k in killers),
+                                 tuple(names[k] for k in (not_found[0] if not_found else ())))
+                      for victim, when, killers, *not_found in state['events']]
+        except (FileNotFoundError, OSError, ValueError, KeyError, TypeError, IndexError):
+            events = []
+        return cls(events, now, retention)
+
+    def save(self, path):
+        """Drop expired events and write the store."""
+        self.prune()
+        _write_bytes(path, gzip.compress(self.to_json().encode('utf-8'), compresslevel=9, mtime=0))
+
+    def to_json(self):
+        """The store serialized with a string table, events in time order."""
+        names = {}
+        events = []
+        for event in sorted(self.events.values(), key=lambda event: (event.time, event.victim)):
+            victim = names.setdefault(event.victim, len(names))
+            killers = [names.setdefault(name, len(names)) for name in event.killers]
+            events.append([victim, event.time, killers, [names[name] for name in event.not_found]])
+        return json.dumps({'format': STORE_FORMAT, 'names': list(names), 'events': events},
+                          separators=(',', ':'))
+
+    @staticmethod
+    def key(victim, when):
+        return (victim.casefold(), when)
+
+    def _add(self, event):
+        key = self.key(event.victim, event.time)
+        self.events[key] = event
+        for name in event.killers:
+            self.by_killer.setdefault(name.casefold(), set()).add(key)
+
+    def is_new(self, victim, death):
+        """
+        Whether a death still has to be processed: it isn't in the store and
+        is recent enough to be kept (deaths without a valid time always are).
+        """
+        when = parse_time(death.get('time'))
+        if when is None:
+            return True
+        when = int(when)
+        return when >= self.cutoff and self.key(victim, when) not in self.events
+
+    def new_deaths(self, victim, deaths):
+        """The deaths of a victim's death list that still have to be processed."""
+        return [death for death in deaths if self.is_new(victim, death)]
+
+    def record(self, victim, death, not_found=()):
+        """
+        Remember a processed death.
+
+        Args:
+            victim: The character that died
+            death: The death record
+            not_found: Killers of the death the API reported as nonexistent
+
+        Returns:
+            bool: False if the death has no valid time (it can't be keyed)
+        """
+        when = parse_time(death.get('time'))
+        if when is None:
+            return False
+        killers = player_killers(death)
+        self._add(DeathEvent(victim, int(when), killers, tuple(name for name in killers if name in not_found)))
+        return True
+
+    def events_by(self, killer):
+        """Events a killer took part in, oldest first."""
+        keys = self.by_killer.get(killer.casefold(), ())
+        return sorted((self.events[key] for key in keys), key=lambda event: (event.time, event.victim))
+
+    def prune(self):
+        """
+        Drop events older than the retention.
+
+        Returns:
+            int: Number of events dropped
+        """
+        expired = [key for key, event in self.events.items() if event.time < self.cutoff]
+        for key in expired:
+            for name in self.events.pop(key).killers:
+                keys = self.by_killer[name.casefold()]
+                keys.discard(key)
+                if not keys:
+                    del self.by_killer[name.casefold()]
+        return len(expired)
+
+
+def _write_bytes(path, data):
+    """Write a file via a temporary file, so a cut-off run never leaves half a store."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def format_time(when):
+    return datetime.fromtimestamp(when, timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def main(argv=None):
+    """Command-line entry point: query the store."""
+    parser = argparse.ArgumentParser(description="Processed enemy death events")
+    parser.add_argument('--file', default=DEATH_STORE_FILE, help="Store file")
+    sub = parser.add_subparsers(dest='command', required=True)
+    killer = sub.add_parser('killer', help="List the deaths a character took part in as a killer")
+    killer.add_argument('name')
+    sub.add_parser('stats', help="Show what the store holds")
+    args = parser.parse_args(argv)
+
+    store = DeathStore.load(args.file)
+    if args.command == 'stats':
+        times = [event.time for event in store.events.values()]
+        not_found = {name.casefold() for event in store.events.values() for name in event.not_found}
+        print(f"{len(store.events)} death events, {len(store.by_killer)} killers "
+              f"({len(not_found)} not found)")
+        if times:
+            print(f"From {format_time(min(times))} to {format_time(max(times))}")
+        return 0
+
+    events = store.events_by(args.name)
+    if not events:
+        print(f"No deaths with killer '{args.name}' in {args.file}")
+        return 1
+    for event in events:
+        others = [name for name in event.killers if name.casefold() != args.name.casefold()]
+        missing = any(name.casefold() == args.name.casefold() for name in event.not_found)
+        print(f"{format_time(event.time)}  {event.victim}" + (f"  (with {', '.join(others)})" if others else "")
+              + ("  [character not found]" if missing else ""))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
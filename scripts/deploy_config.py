@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+"""
+Package .configs/ into the deploy artifact and deploy it to S3.
+
+`package` validates .configs/ (see validate_configs.py), combines every
+.configs/*.json into one minified JSON document (keyed by file name
+without .json), and writes it with its sha256 and a gzip-compressed copy.
+Each file is parsed once, for both:
+
+    combined_config.json       the artifact
+    combined_config.json.gz    what is uploaded (deterministic gzip, mtime 0)
+    artifact.sha256            sha256 of the uncompressed artifact
+
+`deploy` uploads the compressed body with `Content-Encoding: gzip` and the
+artifact's sha256 as object metadata (`x-amz-meta-sha256`), so change
+detection never downloads the deployed object: a HEAD request returns the
+deployed sha256, and the upload is skipped when it matches. With
+`--manifest`, the sha256 last deployed to each target is also kept in a
+local file, and a match there skips even the HEAD request.
+
+`verify` downloads the deployed object, decodes it and checks it against
+its sha256 metadata and the required keys (the CD smoke test).
+
+`--root DIR` instead of `--bucket` deploys into a local directory (object
+bytes plus a `.meta.json` file of its headers), for testing without AWS.
+
+Usage:
+    python scripts/deploy_config.py package [--report PATH]
+    python scripts/deploy_config.py deploy --bucket BUCKET [--manifest PATH]
+    python scripts/deploy_config.py verify --bucket BUCKET
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import subprocess  # nosec B404 - runs the aws CLI only
+import sys
+import tempfile
+
+# Add scripts directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import (  # noqa: E402
+    CONFIGS_DIR,
+    DEPLOY_ARTIFACT_FILE,
+    DEPLOY_KEY,
+    DEPLOY_MANIFEST_FILE,
+    DEPLOY_REQUIRED_KEYS
+)
+from validate_configs import validate, write_report  # noqa: E402
+
+
+class DeployError(Exception):
+    """A storage backend request failed."""
+
+
+def validated_configs(configs_dir=CONFIGS_DIR, report_path=None):
+    """
+    Validate the config files (parsing each once) and return their data.
+
+    Args:
+        configs_dir: Directory with the *.json files
+        report_path: Also write the validation report here
+
+    Returns:
+        tuple: (validation report, name without .json -> parsed data)
+
+    Raises:
+        ValueError: If there are no config files or validation fails
+    """
+    report, data = validate(configs_dir)
+    if report_path:
+        write_report(report_path, report)
+    if not report['files']:
+        raise ValueError(f"No JSON files found in {configs_dir}")
+    if not report['ok']:
+        problems = [f"{name} is missing" for name in report['missing']]
+        problems += [f"{name}: {message}" for name, entry in report['files'].items() for message in entry['errors']]
+        raise ValueError(f"Config validation failed: {'; '.join(problems[:5])}"
+                         + (f" (and {len(problems) - 5} more)" if len(problems) > 5 else ""))
+    return report, data
+
+
+def combine(data):
+    """The deploy payload: the configs as one minified JSON document."""
+    return json.dumps(data, sort_keys=True, separators=(',', ':')).encode('utf-8')
+
+
+def combine_configs(configs_dir=CONFIGS_DIR):
+    """
+    Validate and combine the config files into the deploy payload.
+
+    Returns:
+        tuple: (payload bytes, sorted list of keys)
+
+    Raises:
+        ValueError: If there are no config files or validation fails
+    """
+    _, data = validated_configs(configs_dir)
+    return combine(data), sorted(data)
+
+
+def sha256_hex(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def package(configs_dir=CONFIGS_DIR, artifact=DEPLOY_ARTIFACT_FILE, report_path=None):
+    """
+    Validate the configs, then write the deploy artifact, its .gz copy and
+    its sha256 file.
+
+    Args:
+        report_path: Also write the validation report here
+
+    Returns:
+        dict: {'sha256', 'size', 'compressed_size', 'keys', 'warnings'}
+
+    Raises:
+        ValueError: If validation fails (nothing is written but the report)
+    """
+    report, data = validated_configs(configs_dir, report_path)
+    payload = combine(data)
+    compressed = gzip.compress(payload, compresslevel=9, mtime=0)
+    sha = sha256_hex(payload)
+    with open(artifact, 'wb') as f:
+        f.write(payload)
+    with open(f"{artifact}.gz", 'wb') as f:
+        f.write(compressed)
+    with open(os.path.join(os.path.dirname(artifact), 'artifact.sha256'), 'w') as f:
+        f.write(sha)
+    warnings = [f"{name}: {message}" for name, entry in report['files'].items() for message in entry['warnings']]
+    return {'sha256': sha, 'size': len(payload), 'compressed_size': len(compressed), 'keys': sorted(data),
+            'warnings': warnings}
+
+
+class S3Backend:
+    """Objects in an S3 bucket, through the aws CLI (credentials come from its environment)."""
+
+    def __init__(self, bucket, sse=None, kms_key_id=None):
+        self.bucket = bucket
+        self.sse = sse
+        self.kms_key_id = kms_key_id
+
+    def target(self, key):
+        return f"s3://{self.bucket}/{key}"
+
+    def _aws(self, *args):
+        return subprocess.run(  # nosec B603 B607 - fixed argv, no shell
+            ['aws', 's3api', *args, '--bucket', self.bucket, '--output', 'json'],
+            capture_output=True, text=True)
+
+    @staticmethod
+    def _info(response):
+        return {
+            'metadata': response.get('Metadata', {}),
+            'content_encoding': response.get('ContentEncoding'),
+            'size': response.get('ContentLength'),
+        }
+
+    def head(self, key):
+        """The object's headers ({'metadata', 'content_encoding', 'size'}), or None if it doesn't exist."""
+        result = self._aws('head-object', '--key', key)
+        if result.returncode != 0:
+            if '(404)' in result.stderr or 'Not Found' in result.stderr:
+                return None
+            raise DeployError(f"HEAD {self.target(key)} failed: {result.stderr.strip()}")
+        return self._info(json.loads(result.stdout))
+
+    def put(self, key, body_path, metadata, content_type, content_encoding=None):
+        args = ['put-object', '--key', key, '--body', body_path, '--content-type', content_type,
+                '--metadata', ','.join(f"{name}={value}" for name, value in sorted(metadata.items()))]
+        if content_encoding:
+            args += ['--content-encoding', content_encoding]
+        if self.sse:
+            args += ['--server-side-encryption', self.sse]
+        if self.kms_key_id:
+            args += ['--ssekms-key-id', self.kms_key_id]
+        result = self._aws(*args)
+        if result.returncode != 0:
+            raise DeployError(f"PUT {self.target(key)} failed: {result.stderr.strip()}")
+
+    def get(self, key, path):
+        """Download the object's (still encoded) body to path and return its headers."""
+        result = self._aws('get-object', '--key', key, path)
+        if result.returncode != 0:
+            raise DeployError(f"GET {self.target(key)} failed: {result.stderr.strip()}")
+        return self._info(json.loads(result.stdout))
+
+
+class FilesystemBackend:
+    """Objects as files under a local directory, each with a `.meta.json` file of its headers."""
+
+    def __init__(self, root):
+        self.root = root
+
+    def target(self, key):
+        return os.path.join(self.root, key)
+
+    def head(self, key):
+        try:
+            with open(f"{self.target(key)}.meta.json", 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def put(self, key, body_path, metadata, content_type, content_encoding=None):
+        path = self.target(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        shutil.copyfile(body_path, path)
+        info = {
+            'metadata': dict(metadata),
+            'content_type': content_type,
+            'content_encoding': content_encoding,
+            'size': os.path.getsize(path),
+        }
+        with open(f"{path}.meta.json", 'w') as f:
+            json.dump(info, f, indent=2, sort_keys=True)
+
+    def get(self, key, path):
+        info = self.head(key)
+        if info is None:
+            raise DeployError(f"GET {self.target(key)} failed: no such object")
+        shutil.copyfile(self.target(key), path)
+        return info
+
+
+def load_manifest(path):
+    """Last deployed sha256 per target (empty if there is no manifest)."""
+    try:
+        with open(path, 'r') as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+    return manifest if isinstance(manifest, dict) else {}
+
+
+def save_manifest(path, manifest):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+
+def deploy(backend, key=DEPLOY_KEY, artifact=DEPLOY_ARTIFACT_FILE, metadata=None, manifest_path=None):
+    """
+    Upload the packaged artifact unless the target already has it.
+
+    Args:
+        backend: S3Backend or FilesystemBackend
+        key: Object key
+        artifact: Path of the packaged artifact (its .gz copy is uploaded)
+        metadata: Extra object metadata (e.g. commit, deployed_at)
+        manifest_path: Local last-deployed manifest to check first and update
+
+    Returns:
+        dict: {'status': 'uploaded' | 'unchanged', 'checked': 'manifest' | 'head',
+               'sha256', 'previous': deployed sha256 before this deploy (or None)}
+    """
+    with open(artifact, 'rb') as f:
+        sha = sha256_hex(f.read())
+    target = backend.target(key)
+    manifest = load_manifest(manifest_path) if manifest_path else {}
+    if manifest.get(target) == sha:
+        return {'status': 'unchanged', 'checked': 'manifest', 'sha256': sha, 'previous': sha}
+
+    existing = backend.head(key)
+    previous = existing['metadata'].get('sha256') if existing else None
+    if previous == sha:
+        status = 'unchanged'
+    else:
+        backend.put(key, f"{artifact}.gz", {**(metadata or {}), 'sha256': sha},
+                    content_type='application/json', content_encoding='gzip')
+        status = 'uploaded'
+
+    if manifest_path:
+        manifest[target] = sha
+        save_manifest(manifest_path, manifest)
+    return {'status': status, 'checked': 'head', 'sha256': sha, 'previous': previous}
+
+
+def verify(backend, key=DEPLOY_KEY, required_keys=DEPLOY_REQUIRED_KEYS):
+    """
+    Download the deployed object and check it.
+
+    Returns:
+        dict: The deployed configs
+
+    Raises:
+        ValueError: If the body doesn't match its sha256 metadata or a required key is missing
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'deployed.json')
+        info = backend.get(key, path)
+        with open(path, 'rb') as f:
+            body = f.read()
+    if info.get('content_encoding') == 'gzip':
+        body = gzip.decompress(body)
+    expected = info['metadata'].get('sha256')
+    if expected != sha256_hex(body):
+        raise ValueError(f"{backend.target(key)}: body sha256 {sha256_hex(body)} != metadata {expected}")
+    data = json.loads(body)
+    missing = [name for name in required_keys if name not in data]
+    if missing:
+        raise ValueError(f"{backend.target(key)}: missing required keys {', '.join(missing)}")
+    return data
+
+
+def make_backend(args):
+    if args.root:
+        return FilesystemBackend(args.root)
+    return S3Backend(args.bucket, sse=os.environ.get('S3_SSE') or None,
+                     kms_key_id=os.environ.get('S3_KMS_KEY_ID') or None)
+
+
+def main(argv=None):
+    """Package, deploy or verify the combined config."""
+    parser = argparse.ArgumentParser(description="Package and deploy the combined config to S3")
+    commands = parser.add_subparsers(dest='command', required=True)
+    package_parser = commands.add_parser(
+        'package', help=f"Validate and combine {CONFIGS_DIR}/*.json into {DEPLOY_ARTIFACT_FILE}")
+    package_parser.add_argument('--report', help="Write the validation report to this file")
+    for name, description in (('deploy', "Upload the artifact unless the target already has it"),
+                              ('verify', "Check the deployed object")):
+        sub = commands.add_parser(name, help=description)
+        where = sub.add_mutually_exclusive_group(required=True)
+        where.add_argument('--bucket', help="S3 bucket")
+        where.add_argument('--root', help="Local directory to deploy into instead of S3")
+        sub.add_argument('--key', default=DEPLOY_KEY, help=f"Object key (default {DEPLOY_KEY})")
+    deploy_parser = commands.choices['deploy']
+    deploy_parser.add_argument('--manifest', nargs='?', const=DEPLOY_MANIFEST_FILE, default=None,
+                               help=f"Check and update a local last-deployed manifest "
+                                    f"(default {DEPLOY_MANIFEST_FILE})")
+    deploy_parser.add_argument('--metadata', action='append', default=[], metavar='NAME=VALUE',
+                               help="Extra object metadata (repeatable)")
+    args = parser.parse_args(argv)
+
+    if args.command == 'package':
+        try:
+            result = package(report_path=args.report)
+        except ValueError as e:
+            print(f"ERROR: {e}")
+            return 1
+        for warning in result['warnings']:
+            print(f"  warning: {warning}")
+        print(f"  Artifact: {DEPLOY_ARTIFACT_FILE}")
+        print(f"  SHA256:   {result['sha256']}")
+        print(f"  Size:     {result['size']} bytes ({result['compressed_size']} gzipped)")
+        print(f"  Keys:     {', '.join(result['keys'])}")
+        return 0
+
+    backend = make_backend(args)
+    try:
+        if args.command == 'deploy':
+            metadata = dict(item.split('=', 1) for item in args.metadata)
+            result = deploy(backend, args.key, metadata=metadata, manifest_path=args.manifest)
+            print(f"  Target:       {backend.target(args.key)}")
+            print(f"  Deployed SHA: {result['previous'] or '(none)'}")
+            print(f"  New SHA:      {result['sha256']}")
+            if result['status'] == 'unchanged':
+                print(f"No changes detected ({result['checked']}). Skipping upload.")
+            else:
+                print("Uploaded (Content-Encoding: gzip).")
+            return 0
+
+        data = verify(backend, args.key)
+    except (DeployError, ValueError) as e:
+        print(f"ERROR: {e}")
+        return 1
+    for name in DEPLOY_REQUIRED_KEYS:
+        print(f"  {name}: {len(data[name])} entries - OK")
+    print(f"Verified {backend.target(args.key)} ({len(data)} keys)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+"""
+Adaptive check cadence for the enemy guilds ("war mode").
+
+check-enemies runs every 5 minutes, and each run only checks the guilds
+that are due. After a check, a guild's heat is updated from what the check
+found:
+
+    activity = w_online * members online
+             + w_deaths * deaths since the previous check
+             + w_trolls * trolls added
+
+    heat = max(activity, heat * decay + activity * (1 - decay))
+    decay = 0.5 ** (seconds since the previous check / half-life)
+
+so heat is a time-weighted average of recent activity per check (not a sum,
+which would grow with the check rate itself), except that it jumps straight
+up to a burst of activity: a fight makes the guild hot on the first check
+that sees it, and it cools off over the following hour. A guild at
+CADENCE_HOT_HEAT or above is checked every CADENCE_HOT_INTERVAL, one below
+CADENCE_IDLE_HEAT every CADENCE_IDLE_INTERVAL, and anything in between at
+CADENCE_WARM_INTERVAL.
+
+Checks are paid from a token bucket of API requests that refills at
+CADENCE_REQUESTS_PER_HOUR and is charged with the requests each run
+actually made. Due guilds are taken hottest first while the bucket covers
+their expected cost (a running average of what their checks used); a guild
+that hasn't been checked for CADENCE_IDLE_INTERVAL is checked regardless,
+so an exhausted budget delays checks but never stops them.
+
+State (per-guild heat, last check and cost, plus the bucket) is a small
+JSON file under .cache/, carried between runs like the work queues.
+"""
+
+import json
+import os
+import time
+
+from config import (
+    CADENCE_HEAT_HALF_LIFE,
+    CADENCE_HOT_HEAT,
+    CADENCE_HOT_INTERVAL,
+    CADENCE_IDLE_HEAT,
+    CADENCE_IDLE_INTERVAL,
+    CADENCE_REQUESTS_PER_HOUR,
+    CADENCE_WARM_INTERVAL,
+    CADENCE_WEIGHTS
+)
+from utils import parse_time
+
+# Expected requests of a guild never checked before: the guild itself plus a
+# few death checks
+DEFAULT_CHECK_COST = 5.0
+
+# Heat a guild starts from (mid-warm), so one quiet first check doesn't
+# make it idle straight away
+INITIAL_HEAT = (CADENCE_IDLE_HEAT + CADENCE_HOT_HEAT) / 2
+
+
+def count_new_deaths(deaths, since):
+    """Number of deaths in a death list that happened after `since` (epoch seconds)."""
+    count = 0
+    for death in deaths:
+        when = parse_time(death.get('time'))
+        if when is not None and when > since:
+            count += 1
+    return count
+
+
+class EnemyCadence:
+    """Per-guild check intervals and the shared request budget."""
+
+    def __init__(self, state=None, now=None):
+        """
+        Args:
+            state: Saved state (see to_json), or None to start fresh
+            now: Current time (epoch seconds); defaults to time.time()
+        """
+        now = time.time() if now is None else now
+        state = state or {}
+        self.guilds = state.get('guilds', {})
+        budget = state.get('budget', {})
+        capacity = float(CADENCE_REQUESTS_PER_HOUR)
+        tokens = budget.get('tokens', capacity)
+        refilled = (now - budget.get('updated', now)) * CADENCE_REQUESTS_PER_HOUR / 3600
+        self.tokens = min(capacity, tokens + max(0.0, refilled))
+        self.now = now
+
+    @classmethod
+    def load(cls, path, now=None):
+        """Load the saved state (a missing or unreadable file starts fresh)."""
+        try:
+            with open(path, 'r') as f:
+                state = json.load(f)
+        except (FileNotFoundError, ValueError):
+            state = None
+        return cls(state if isinstance(state, dict) else None, now)
+
+    def save(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(self.to_json(), f, indent=2, sort_keys=True)
+
+    def to_json(self):
+        return {
+            'guilds': self.guilds,
+            'budget': {'tokens': round(self.tokens, 2), 'updated': self.now},
+        }
+
+    def heat(self, guild):
+        return self.guilds.get(guild, {}).get('heat', 0.0)
+
+    def interval(self, guild):
+        """Seconds between checks of a guild, from its heat."""
+        heat = self.heat(guild)
+        if heat >= CADENCE_HOT_HEAT:
+            return CADENCE_HOT_INTERVAL
+        if heat < CADENCE_IDLE_HEAT and guild in self.guilds:
+            return CADENCE_IDLE_INTERVAL
+        return CADENCE_WARM_INTERVAL
+
+    def mode(self, guild):
+        """'hot', 'warm' or 'idle' (for the run log)."""
+        return {CADENCE_HOT_INTERVAL: 'hot', CADENCE_IDLE_INTERVAL: 'idle'}.get(self.interval(guild), 'warm')
+
+    def last_checked(self, guild):
+        """When a guild was last checked (None if never)."""
+        return self.guilds.get(guild, {}).get('checked')
+
+    def plan(self, guilds):
+        """
+        Decide which guilds to check this run.
+
+        Args:
+            guilds: Guild names to consider
+
+        Returns:
+            tuple: (guilds to check, guilds skipped) - the skipped ones are
+                (guild, reason) pairs
+        """
+        due = []
+        skipped = []
+        for guild in guilds:
+            checked = self.last_checked(guild)
+            # A run may start a little early; 30s of slack keeps a guild on its cadence
+            if checked is not None and self.now - checked < self.interval(guild) - 30:
+                skipped.append((guild, f"{self.mode(guild)}, next check in "
+                                       f"{int(checked + self.interval(guild) - self.now)}s"))
+            else:
+                due.append(guild)
+
+        selected = []
+        tokens = self.tokens
+        for guild in sorted(due, key=lambda name: -self.heat(name)):
+            checked = self.last_checked(guild)
+            overdue = checked is None or self.now - checked >= CADENCE_IDLE_INTERVAL
+            cost = self.guilds.get(guild, {}).get('cost', DEFAULT_CHECK_COST)
+            if overdue or cost <= tokens:
+                selected.append(guild)
+                tokens -= cost
+            else:
+                skipped.append((guild, f"request budget ({tokens:.0f} left, check costs ~{cost:.0f})"))
+        return selected, skipped
+
+    def record(self, guild, online=0, deaths=0, trolls=0, requests=0):
+        """Update a guild's heat and expected cost after checking it."""
+        entry = self.guilds.setdefault(guild, {})
+        activity = (CADENCE_WEIGHTS['online'] * online + CADENCE_WEIGHTS['deaths'] * deaths
+                    + CADENCE_WEIGHTS['trolls'] * trolls)
+        decay = 0.5 ** ((self.now - entry.get('checked', self.now - CADENCE_WARM_INTERVAL))
+                        / CADENCE_HEAT_HALF_LIFE)
+        heat = entry.get('heat', INITIAL_HEAT)
+        entry['heat'] = round(max(activity, heat * decay + activity * (1 - decay)), 3)
+        entry['cost'] = round(0.5 * entry['cost'] + 0.5 * requests, 2) if 'cost' in entry else float(requests)
+        entry['checked'] = self.now
+
+    def charge(self, requests):
+        """Take a run's API requests out of the budget (it may go negative)."""
+        self.tokens -= requests
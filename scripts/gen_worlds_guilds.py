@@ -6,41 +6,98 @@ Processes all configured worlds and saves the data to world_guilds_data.json.
 Features:
 - Preserves old data if API fetches fail
 - Removes guilds that no longer exist in the world's active guild list
-- Exponential backoff retry logic for transient errors
+- Concurrent guild fetches with scheduled (non-blocking) retries
 - Continues processing even if individual requests fail
+- Worlds are drained from a persistent priority queue (enemy worlds first);
+  failed worlds are retried later in the run or carried over to the next one
+- Snapshot guard: a guild or world that lost an implausible share of its
+  members/guilds at once (usually a truncated API response) keeps its old
+  data and is reported as an anomaly; `--accept-drops` disables the guard
+- Guild data is held as a GuildSnapshot (interned names, copy-on-write per
+  world), so old and refreshed worlds share their member strings
+- `--profile [DIR]` writes a cProfile/tracemalloc report of the run's phases
+  (load, fetch, build, diff, save); see profiling.py
+- Sharded mode: `--shard i/n` refreshes every n-th world and writes a partial
+  snapshot, `--merge` combines the partials into the data file, and
+  `--processes N` does both locally with N worker processes
 """
 
+import argparse
+import functools
+import glob
 import json
 import sys
 import os
+import time
 
 # Add scripts directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from config import WORLDS, WORLD_GUILDS_FILE  # noqa: E402
-from tibia_api import fetch_world_guilds, fetch_guild  # noqa: E402
+from config import (  # noqa: E402
+    WORLDS,
+    WORLD_GUILDS_FILE,
+    ENEMY_GUILDS,
+    GUILD_QUEUE_FILE,
+    GUILD_QUARANTINE_FILE,
+    GUILD_SHARD_DIR,
+    PRIORITY_HIGH,
+    PRIORITY_NORMAL,
+    QUEUE_RUN_BUDGET,
+    QUEUED_FETCH_ATTEMPTS,
+    PROFILE_DIR,
+    SNAPSHOT_MAX_MEMBER_DROP,
+    SNAPSHOT_MIN_GUILD_SIZE,
+    SNAPSHOT_MAX_GUILD_DROP,
+    SNAPSHOT_MIN_WORLD_GUILDS,
+    SNAPSHOT_QUARANTINE_RUNS,
+    TIMESERIES_GUILDS
+)
+from tibia_api import (  # noqa: E402
+    fetch_world_guilds,
+    fetch_guild,
+    prefetch_guilds,
+    format_run_stats,
+    get_run_stats,
+    GUILD_MEMBER_FIELDS
+)
+from config_store import file_digest, text_digest, write_text  # noqa: E402
+from guild_snapshot import GuildSnapshot, WorldGuilds  # noqa: E402
+import profiling  # noqa: E402
+from profiling import phase  # noqa: E402
+from timeseries import api_sample, record_run  # noqa: E402
+from work_queue import WorkQueue, drain  # noqa: E402
+
+TASK_GUILD_REFRESH = 'guild_refresh'
 
 
 def load_existing_data():
-    """Load existing world guilds data from file."""
+    """Load existing world guilds data from file (as a GuildSnapshot)."""
     try:
-        with open(WORLD_GUILDS_FILE, 'r') as f:
-            data = json.load(f)
+        data = GuildSnapshot.load(WORLD_GUILDS_FILE)
         print(f"Loaded existing data with {len(data)} worlds")
         return data
     except FileNotFoundError:
         print("No existing data file found - starting fresh")
-        return {}
+        return GuildSnapshot()
     except Exception as e:
         print(f"Warning: Could not load existing data: {e}")
-        return {}
+        return GuildSnapshot()
 
 
 def save_data(data):
-    """Save world guilds data to file."""
+    """
+    Save world guilds data (a GuildSnapshot) to file in canonical form.
+
+    The file is left alone if its bytes already hash to the same content, so
+    a refresh that changed nothing doesn't touch it (and leaves nothing to
+    commit).
+    """
     try:
-        with open(WORLD_GUILDS_FILE, 'w') as f:
-            json.dump(data, f, indent=4)
+        text = data.canonical_json()
+        if text_digest(text) == file_digest(WORLD_GUILDS_FILE):
+            print(f"\nGuild data unchanged - {WORLD_GUILDS_FILE} not rewritten")
+            return True
+        write_text(WORLD_GUILDS_FILE, text)
         print(f"\nSuccessfully wrote data to {WORLD_GUILDS_FILE}")
         return True
     except Exception as e:
@@ -48,7 +105,83 @@ def save_data(data):
         return False
 
 
-def build_world_data(guilds, old_world_data):
+def member_drop_anomaly(old_count, new_count):
+    """
+    Check a guild's refreshed member count against its previous one.
+
+    Returns:
+        str or None: Why the new roster is implausible, or None if it's fine
+    """
+    if old_count >= SNAPSHOT_MIN_GUILD_SIZE and new_count < old_count * (1 - SNAPSHOT_MAX_MEMBER_DROP):
+        return f"members dropped from {old_count} to {new_count}"
+    return None
+
+
+def guild_drop_anomaly(old_count, new_count):
+    """
+    Check a world's refreshed guild count against its previous one.
+
+    Returns:
+        str or None: Why the new guild list is implausible, or None if it's fine
+    """
+    if old_count >= SNAPSHOT_MIN_WORLD_GUILDS and new_count < old_count * (1 - SNAPSHOT_MAX_GUILD_DROP):
+        return f"guilds dropped from {old_count} to {new_count}"
+    return None
+
+
+class DropQuarantine:
+    """
+    Consecutive runs on which each quarantined world or guild showed the
+    same drop, so a drop that keeps coming back is eventually accepted.
+
+    Only drops seen again on this run are kept when saving: a run that
+    shows a different size, or no drop, starts the count over.
+    """
+
+    def __init__(self, seen=None, runs=SNAPSHOT_QUARANTINE_RUNS):
+        self.seen = seen or {}   # key -> {'count': new size, 'runs': consecutive runs}
+        self.runs = runs
+        self.observed = {}
+
+    @classmethod
+    def load(cls, path):
+        """Load the saved counts (a missing or unreadable file starts fresh)."""
+        try:
+            with open(path, 'r') as f:
+                seen = json.load(f)
+        except (FileNotFoundError, ValueError):
+            seen = None
+        return cls(seen if isinstance(seen, dict) else None)
+
+    def save(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(self.observed, f, indent=2, sort_keys=True)
+
+    def confirm(self, key, count):
+        """
+        Record a drop to `count` for a world ('World') or guild ('World/Guild').
+
+        Returns:
+            bool: True if it has now been seen on enough consecutive runs to
+            be accepted
+        """
+        previous = self.seen.get(key)
+        runs = previous['runs'] + 1 if isinstance(previous, dict) and previous.get('count') == count else 1
+        if runs >= self.runs:
+            return True
+        self.observed[key] = {'count': count, 'runs': runs}
+        return False
+
+
+def confirm_guild_drop(quarantine, world, guild_name, count):
+    """build_world_data's confirm for one world's guilds."""
+    return quarantine.confirm(f"{world}/{guild_name}", count)
+
+
+def build_world_data(guilds, old_world_data, anomalies=None, confirm=None):
     """
     Build the guild -> members mapping for a world from its current guild list.
 
@@ -57,9 +190,18 @@ def build_world_data(guilds, old_world_data):
     individual guild's member list fails, the old data for that guild is kept
     (the guild still exists, we just couldn't refresh it).
 
+    With `anomalies` (a list), each roster is also checked against the old
+    one as it comes in: an implausible drop keeps the old roster, counts as
+    failed and appends (guild_name, reason) to the list - unless
+    confirm(guild_name, new_count) says the drop has persisted long enough
+    to be accepted.
+
     Args:
         guilds: List of guild dicts from fetch_world_guilds
         old_world_data: Previous guild -> members mapping for this world
+        anomalies: List to collect quarantined guilds in, or None to accept
+            every roster
+        confirm: Called for each implausible drop; True accepts it
 
     Returns:
         tuple: (world_data, processed_count, failed_count)
@@ -74,10 +216,22 @@ def build_world_data(guilds, old_world_data):
             continue
 
         print(f"  - {guild_name}...", end=" ")
-        guild_data = fetch_guild(guild_name)
+        guild_data = fetch_guild(guild_name, fields=GUILD_MEMBER_FIELDS)
 
         members = guild_data.get('members') if guild_data else None
-        if members:
+        old_members = old_world_data.get(guild_name)
+        reason = None
+        if members and old_members and anomalies is not None:
+            reason = member_drop_anomaly(len(old_members), len(members))
+            if reason and confirm is not None and confirm(guild_name, len(members)):
+                print(f"Accepted ({reason}, seen on {SNAPSHOT_QUARANTINE_RUNS} consecutive runs)...", end=" ")
+                reason = None
+        if reason:
+            world_data[guild_name] = old_members
+            anomalies.append((guild_name, reason))
+            print(f"Suspicious ({reason}) - keeping old data")
+            failed += 1
+        elif members:
             member_names = [m['name'] for m in members]
             world_data[guild_name] = member_names
             print(f"OK ({len(member_names)} members)")
@@ -94,72 +248,375 @@ def build_world_data(guilds, old_world_data):
     return world_data, processed, failed
 
 
-def main():
-    """Main handler that fetches guild data for all worlds."""
-    print("=" * 60)
-    print("Generating World Guilds Data")
-    print("=" * 60)
-    print("\nStarting data fetch...")
+def parse_shard(value):
+    """
+    Parse a shard spec 'i/n' (1-based) into (i, n).
+
+    Raises:
+        ValueError: If the spec is malformed or out of range
+    """
+    try:
+        index, count = (int(part) for part in value.split('/'))
+    except ValueError:
+        raise ValueError(f"Invalid shard '{value}' - expected i/n, e.g. 2/4")
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"Invalid shard '{value}' - need 1 <= i <= n")
+    return index, count
+
+
+def shard_worlds(worlds, index, count):
+    """The worlds handled by shard index/count (round-robin over the config order)."""
+    return list(worlds)[index - 1::count]
+
+
+def shard_queue_file(index, count):
+    """Work queue file for a shard (each shard keeps its own pending tasks)."""
+    return GUILD_QUEUE_FILE.replace('.sqlite3', f'.{index}-of-{count}.sqlite3')
+
+
+def shard_quarantine_file(index, count):
+    """Drop quarantine counts for a shard (each shard sees only its own worlds)."""
+    return GUILD_QUARANTINE_FILE.replace('.json', f'.{index}-of-{count}.json')
+
+
+def partial_snapshot_file(index, count, shard_dir=GUILD_SHARD_DIR):
+    """Partial snapshot written by a shard."""
+    return os.path.join(shard_dir, f"world_guilds.{index}-of-{count}.json")
+
+
+def refresh_worlds(worlds, existing_data, queue_file, guard=True, quarantine=None):
+    """
+    Refresh the guild data of the given worlds.
 
-    # Load existing data to preserve it if fetches fail
-    existing_data = load_existing_data()
-    worlds_data = existing_data.copy()
+    Worlds are drained from a persistent queue, so a world whose guild list
+    can't be fetched is retried later in the run or carried over to the next.
 
-    # Statistics
-    total_worlds = len(WORLDS)
-    successful_worlds = 0
-    failed_worlds = 0
-    total_guilds_processed = 0
-    total_guilds_failed = 0
+    Args:
+        worlds: Worlds to refresh
+        existing_data: Previous world -> guild -> members data
+        queue_file: Work queue file for these worlds
+        guard: Quarantine implausible drops (see build_world_data)
+        quarantine: DropQuarantine accepting drops that persist across runs
+            (None quarantines them for as long as they are seen)
+
+    Returns:
+        tuple: (refreshed world -> WorldGuilds, stats dict). Quarantined
+        worlds and guilds are listed in stats['anomalies'].
+    """
+    worlds = set(worlds)
+    refreshed = {}
+    stats = {'guilds_processed': 0, 'guilds_failed': 0, 'anomalies': []}
+
+    def refresh_world(task):
+        world = task.key
+        if world not in worlds:
+            print(f"\n[{world}] Not configured for this run - dropping queued refresh")
+            return True
 
-    for world in WORLDS:
         print(f"\n[{world}]")
 
-        guilds = fetch_world_guilds(world)
+        with phase('fetch'):
+            guilds = fetch_world_guilds(world, max_retries=QUEUED_FETCH_ATTEMPTS)
         if guilds is None:
-            print(f"  Failed to fetch guild list for {world}. Keeping old data.")
-            failed_worlds += 1
-            continue
+            print(f"  Failed to fetch guild list for {world}. Keeping old data for now.")
+            return False
 
         # Rebuild this world's data from the current guild list so that
         # guilds that no longer exist are removed
         old_world_data = existing_data.get(world, {})
 
-        successful_worlds += 1
         print(f"  Found {len(guilds)} guilds")
 
-        world_data, processed, failed = build_world_data(guilds, old_world_data)
-        worlds_data[world] = world_data
-        total_guilds_processed += processed
-        total_guilds_failed += failed
-
-        removed_guilds = sorted(set(old_world_data) - set(world_data))
+        reason = guild_drop_anomaly(len(old_world_data), len(guilds)) if guard else None
+        if reason and quarantine is not None and quarantine.confirm(world, len(guilds)):
+            print(f"  Accepted ({reason}, seen on {quarantine.runs} consecutive runs)")
+            reason = None
+        if reason:
+            # Leave the world out of this run's refresh; the merge keeps its old data
+            print(f"  Suspicious ({reason}) - keeping old data for {world}")
+            stats['anomalies'].append({'world': world, 'guild': None, 'reason': reason})
+            return True
+
+        # Fetch member lists concurrently; a guild that needs a retry waits
+        # on its own timer instead of holding up the rest of the world
+        with phase('fetch'):
+            prefetch_guilds([g['name'] for g in guilds if g.get('name')], fields=GUILD_MEMBER_FIELDS)
+
+        with phase('build'):
+            guild_anomalies = [] if guard else None
+            confirm = None
+            if quarantine is not None:
+                confirm = functools.partial(confirm_guild_drop, quarantine, world)
+            world_data, processed, failed = build_world_data(guilds, old_world_data, guild_anomalies, confirm)
+            for guild_name, guild_reason in guild_anomalies or ():
+                stats['anomalies'].append({'world': world, 'guild': guild_name, 'reason': guild_reason})
+            # Interning shares each unchanged member name with the old snapshot
+            refreshed[world] = WorldGuilds(world_data, previous=old_world_data)
+        stats['guilds_processed'] += processed
+        stats['guilds_failed'] += failed
+
+        with phase('diff'):
+            removed_guilds = sorted(old_world_data.keys() - world_data.keys())
         if removed_guilds:
             print(f"  Removed {len(removed_guilds)} guild(s) no longer active: "
                   f"{', '.join(removed_guilds)}")
+        return True
+
+    # Enemy worlds go first so a slow world elsewhere can't delay them
+    enemy_worlds = set(ENEMY_GUILDS.values())
+    with WorkQueue(queue_file) as queue:
+        for world in WORLDS:
+            if world in worlds:
+                priority = PRIORITY_HIGH if world in enemy_worlds else PRIORITY_NORMAL
+                queue.enqueue(TASK_GUILD_REFRESH, world, priority)
+
+        stats['queue'] = drain(
+            queue,
+            {TASK_GUILD_REFRESH: refresh_world},
+            deadline=time.time() + QUEUE_RUN_BUDGET
+        )
+
+    stats['api'] = api_sample(get_run_stats())
+    return refreshed, stats
+
+
+def merge_snapshots(base, snapshots):
+    """
+    Combine refreshed worlds into the full data set.
+
+    Worlds missing from every snapshot keep their data from base (shared,
+    not copied); worlds that are no longer configured are dropped.
+
+    Args:
+        base: Previous data (GuildSnapshot or world -> guild -> members)
+        snapshots: Iterable of refreshed world -> guild -> members mappings
+
+    Returns:
+        GuildSnapshot: The merged data
+    """
+    merged = base if isinstance(base, GuildSnapshot) else GuildSnapshot(base)
+    for worlds in snapshots:
+        merged = merged.replace_worlds(worlds)
 
     # Drop worlds that are no longer configured so their data doesn't linger
-    stale_worlds = [w for w in worlds_data if w not in WORLDS]
-    for world in stale_worlds:
-        del worlds_data[world]
+    for world in [w for w in merged if w not in WORLDS]:
         print(f"\nRemoved unconfigured world from data: {world}")
+    return merged.only_worlds(WORLDS)
+
+
+def quarantined_worlds(anomalies):
+    """Worlds whose whole refresh was quarantined (fetched, but old data kept)."""
+    return {a['world'] for a in anomalies if not a['guild']}
+
 
-    # Summary
+def report_anomalies(anomalies):
+    """
+    Print the quarantined worlds and guilds, and list them in the GitHub
+    Actions job summary when running there.
+    """
+    if not anomalies:
+        return
+    lines = [
+        f"{a['world']}/{a['guild']}: {a['reason']}" if a['guild'] else f"{a['world']}: {a['reason']}"
+        for a in anomalies
+    ]
+    print(f"Anomalies: {len(anomalies)} quarantined (old data kept)")
+    for line in lines:
+        print(f"  - {line}")
+
+    summary_file = os.environ.get('GITHUB_STEP_SUMMARY')
+    if summary_file:
+        with open(summary_file, 'a') as f:
+            f.write("### Guild snapshot anomalies (old data kept)\n\n")
+            f.write("".join(f"- {line}\n" for line in lines) + "\n")
+
+
+def print_summary(worlds_total, refreshed_total, stats):
+    """Print the end-of-run summary."""
+    queue_stats = stats['queue']
+    quarantined = len(quarantined_worlds(stats['anomalies']))
     print(f"\n{'=' * 60}")
     print("Summary")
     print("=" * 60)
-    print(f"Worlds: {successful_worlds}/{total_worlds} successful, {failed_worlds} failed")
-    print(f"Guilds: {total_guilds_processed} processed, {total_guilds_failed} failed/skipped")
+    print(f"Worlds: {refreshed_total}/{worlds_total} successful, {quarantined} quarantined, "
+          f"{worlds_total - refreshed_total - quarantined} failed")
+    print(f"Guilds: {stats['guilds_processed']} processed, {stats['guilds_failed']} failed/skipped")
+    print(f"Queue: {queue_stats['completed']} completed, {queue_stats['retried']} retried, "
+          f"{queue_stats['dropped']} dropped")
+    report_anomalies(stats['anomalies'])
+
 
-    # Save data
+def save_and_record(worlds_data, api):
+    """Write the merged data file and record this run's metrics."""
     if not save_data(worlds_data):
         raise RuntimeError("Failed to save data file")
 
-    # Only fail the entire job if we got zero successful worlds
-    if successful_worlds == 0:
+    sample = dict(api)
+    for world, guilds in worlds_data.items():
+        sample[f'guilds.{world}'] = len(guilds)
+        sample[f'members.{world}'] = sum(len(members) for members in guilds.values())
+    record_run(TIMESERIES_GUILDS, sample)
+
+
+def run_all(guard=True):
+    """Refresh every world in this process and write the data file."""
+    with phase('load'):
+        existing_data = load_existing_data()
+    quarantine = DropQuarantine.load(GUILD_QUARANTINE_FILE) if guard else None
+    refreshed, stats = refresh_worlds(WORLDS, existing_data, GUILD_QUEUE_FILE, guard, quarantine)
+    if quarantine is not None:
+        quarantine.save(GUILD_QUARANTINE_FILE)
+    with phase('diff'):
+        worlds_data = merge_snapshots(existing_data, [refreshed])
+
+    print_summary(len(WORLDS), len(refreshed), stats)
+    print(format_run_stats())
+    with phase('save'):
+        save_and_record(worlds_data, stats['api'])
+
+    # Only fail the entire job if no world could be fetched; a quarantined
+    # world was fetched fine, its old data was kept on purpose
+    quarantined = quarantined_worlds(stats['anomalies'])
+    if not refreshed and not quarantined:
+        raise RuntimeError("Failed to fetch data for all worlds. Check API availability.")
+
+    print(f"\nJob completed with {len(refreshed)}/{len(WORLDS)} worlds processed, "
+          f"{len(quarantined)} quarantined")
+
+
+def run_shard(index, count, shard_dir=GUILD_SHARD_DIR, guard=True):
+    """
+    Refresh one shard's worlds and write them as a partial snapshot.
+
+    Returns:
+        str: Path of the partial snapshot
+    """
+    worlds = shard_worlds(WORLDS, index, count)
+    print(f"Shard {index}/{count}: {', '.join(worlds) or '(no worlds)'}")
+
+    with phase('load'):
+        existing_data = load_existing_data()
+    quarantine_file = shard_quarantine_file(index, count)
+    quarantine = DropQuarantine.load(quarantine_file) if guard else None
+    refreshed, stats = refresh_worlds(worlds, existing_data, shard_queue_file(index, count), guard, quarantine)
+    if quarantine is not None:
+        quarantine.save(quarantine_file)
+    print_summary(len(worlds), len(refreshed), stats)
+    print(format_run_stats())
+
+    path = partial_snapshot_file(index, count, shard_dir)
+    os.makedirs(shard_dir, exist_ok=True)
+    with phase('save'), open(path, 'w') as f:
+        json.dump({'shard': f"{index}/{count}", 'worlds': GuildSnapshot(refreshed).to_json(), 'stats': stats},
+                  f, separators=(',', ':'))
+    print(f"\nWrote partial snapshot for {len(refreshed)} world(s) to {path}")
+
+    if worlds and not refreshed and not quarantined_worlds(stats['anomalies']):
+        raise RuntimeError(f"Shard {index}/{count} failed to fetch data for all its worlds.")
+    return path
+
+
+def merge_partials(shard_dir=GUILD_SHARD_DIR):
+    """
+    Merge every partial snapshot in shard_dir into the data file, then
+    remove the partials.
+    """
+    paths = sorted(glob.glob(os.path.join(shard_dir, 'world_guilds.*-of-*.json')))
+    if not paths:
+        raise RuntimeError(f"No partial snapshots found in {shard_dir}")
+
+    snapshots = []
+    api = {}
+    anomalies = []
+    for path in paths:
+        with phase('load'), open(path, 'r') as f:
+            partial = json.load(f)
+        print(f"Shard {partial['shard']}: {len(partial['worlds'])} world(s) refreshed")
+        snapshots.append(partial['worlds'])
+        anomalies.extend(partial['stats'].get('anomalies', []))
+        for name, value in partial['stats']['api'].items():
+            api[name] = api.get(name, 0) + value
+
+    with phase('load'):
+        existing_data = load_existing_data()
+    with phase('diff'):
+        worlds_data = merge_snapshots(existing_data, snapshots)
+    refreshed_total = sum(len(worlds) for worlds in snapshots)
+    quarantined_total = len(quarantined_worlds(anomalies))
+    print(f"\nMerged {len(paths)} partial snapshot(s): "
+          f"{refreshed_total}/{len(WORLDS)} worlds refreshed, {quarantined_total} quarantined")
+    report_anomalies(anomalies)
+    with phase('save'):
+        save_and_record(worlds_data, api)
+
+    for path in paths:
+        os.remove(path)
+
+    if refreshed_total == 0 and quarantined_total == 0:
         raise RuntimeError("Failed to fetch data for all worlds. Check API availability.")
 
-    print(f"\nJob completed with {successful_worlds}/{total_worlds} worlds processed")
+
+def run_processes(processes, guard=True):
+    """Run `processes` shards in parallel worker processes, then merge them."""
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        futures = [pool.submit(run_shard, index, processes, GUILD_SHARD_DIR, guard)
+                   for index in range(1, processes + 1)]
+        for future in futures:
+            try:
+                future.result()
+            except RuntimeError as e:
+                # The merge keeps the old data for that shard's worlds
+                print(f"Warning: {e}")
+    merge_partials()
+
+
+def main(argv=None):
+    """Main handler that fetches guild data for all worlds."""
+    parser = argparse.ArgumentParser(description="Refresh guild member lists for all worlds")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--shard', metavar='I/N',
+                      help="Only refresh shard I of N and write a partial snapshot")
+    mode.add_argument('--merge', action='store_true',
+                      help="Merge partial snapshots into the data file")
+    mode.add_argument('--processes', type=int, default=1, metavar='N',
+                      help="Split worlds across N worker processes, then merge")
+    parser.add_argument('--accept-drops', action='store_true',
+                        help="Accept large member/guild drops instead of keeping the old data "
+                             f"(otherwise accepted after {SNAPSHOT_QUARANTINE_RUNS} consecutive runs)")
+    parser.add_argument('--profile', nargs='?', const=PROFILE_DIR, metavar='DIR',
+                        help=f"Profile this process's phases and write a report to DIR (default {PROFILE_DIR}); "
+                             "with --processes, the worker processes are not profiled")
+    args = parser.parse_args(argv)
+    if args.profile:
+        profiling.start('guilds', args.profile)
+        try:
+            return run(args, parser)
+        finally:
+            profiling.finish()
+    return run(args, parser)
+
+
+def run(args, parser):
+    """Run the mode selected on the command line."""
+    print("=" * 60)
+    print("Generating World Guilds Data")
+    print("=" * 60)
+
+    if args.merge:
+        merge_partials()
+    elif args.shard:
+        try:
+            index, count = parse_shard(args.shard)
+        except ValueError as e:
+            parser.error(str(e))
+        run_shard(index, count, guard=not args.accept_drops)
+    elif args.processes > 1:
+        run_processes(args.processes, guard=not args.accept_drops)
+    else:
+        print("\nStarting data fetch...")
+        run_all(guard=not args.accept_drops)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,191 @@
+"""
+Compact in-memory form of world_guilds_data.json.
+
+The guild refresh holds the previous snapshot and the freshly fetched worlds
+at the same time, and nearly every member name appears in both. Here a
+refreshed roster is interned against the previous one: an unchanged roster
+reuses the old tuple outright, and a changed one reuses the old string for
+every member that stayed. Rosters are tuples (one fixed array of references
+each, no list over-allocation), guild and world names go through
+sys.intern, and loading keeps parsed objects as bare pair lists and drops
+each world's lists as soon as the world is converted. Snapshots are immutable:
+replacing a world makes a new top-level mapping that shares every other
+world with the old snapshot instead of copying the data.
+
+Rosters are kept in canonical order (by case-folded name), not in the
+API's rank order, so a promotion or a reshuffled response is not a change:
+the roster compares equal and keeps the old tuple. canonical_json() writes
+the file diff-stably - worlds and guilds sorted, one member per line - so a
+refresh's commit only touches the lines of members who actually joined or
+left, and an unchanged refresh serializes to the same bytes as the file.
+
+Both classes are read-only Mappings (world -> guilds, guild -> members), so
+code written against the plain JSON dicts reads them unchanged; to_json()
+gives the structure json.dump expects.
+"""
+
+import json
+import sys
+from collections.abc import Mapping
+
+
+def member_order(name):
+    """Sort key of the canonical roster order (case-folded, ties by exact name)."""
+    return name.casefold(), name
+
+
+class WorldGuilds(Mapping):
+    """One world's guild -> members roster (members as tuples of names, in canonical order)."""
+
+    __slots__ = ('_guilds',)
+
+    def __init__(self, guilds=(), previous=None):
+        """
+        Args:
+            guilds: Guild -> member names (mapping or (guild, members) pairs)
+            previous: The world's previous roster; members that are still
+                there share its strings
+        """
+        self._guilds = {}
+        for guild, members in (guilds.items() if isinstance(guilds, Mapping) else guilds):
+            old = previous.get(guild) if previous else None
+            members = tuple(sorted(members, key=member_order))
+            if old:
+                if isinstance(old, tuple) and members == old:
+                    members = old
+                else:
+                    same = {name: name for name in old}
+                    members = tuple([same.get(name, name) for name in members])
+            self._guilds[sys.intern(guild)] = members
+
+    def __getitem__(self, guild):
+        return self._guilds[guild]
+
+    def __iter__(self):
+        return iter(self._guilds)
+
+    def __len__(self):
+        return len(self._guilds)
+
+    def __repr__(self):
+        return f"WorldGuilds({len(self._guilds)} guilds)"
+
+    def keys(self):
+        """Guild names, as a set-like view (so `old.keys() - new.keys()` is cheap)."""
+        return self._guilds.keys()
+
+    def member_count(self):
+        """Total members across the world's guilds."""
+        return sum(map(len, self._guilds.values()))
+
+    def to_json(self):
+        """Guild -> members, ready for json.dump (tuples serialize as lists)."""
+        return self._guilds
+
+
+_EMPTY_WORLD = WorldGuilds()
+
+
+class GuildSnapshot(Mapping):
+    """Immutable world -> WorldGuilds snapshot; replacing worlds is copy-on-write."""
+
+    __slots__ = ('_worlds',)
+
+    def __init__(self, worlds=()):
+        self._worlds = {
+            sys.intern(world): guilds if isinstance(guilds, WorldGuilds) else WorldGuilds(guilds)
+            for world, guilds in (worlds.items() if isinstance(worlds, Mapping) else worlds)
+        }
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load a snapshot from a world_guilds_data.json file.
+
+        The parsed JSON is dropped once converted (it is not kept in
+        config_store's read cache).
+
+        Raises:
+            FileNotFoundError: If the file does not exist
+            ValueError: If the file is not valid JSON or not shaped
+                world -> guild -> members
+        """
+        with open(path, 'r') as f:
+            return _from_pairs(json.load(f, object_pairs_hook=_Pairs))
+
+    def __getitem__(self, world):
+        return self._worlds[world]
+
+    def __iter__(self):
+        return iter(self._worlds)
+
+    def __len__(self):
+        return len(self._worlds)
+
+    def __repr__(self):
+        return f"GuildSnapshot({len(self._worlds)} worlds)"
+
+    def world(self, world):
+        """A world's guilds (empty if the world isn't in the snapshot)."""
+        return self._worlds.get(world, _EMPTY_WORLD)
+
+    def replace_worlds(self, worlds):
+        """
+        A new snapshot with the given worlds replaced; all other worlds are
+        shared with this one.
+
+        Args:
+            worlds: World -> guild -> members mapping (plain dicts or WorldGuilds)
+        """
+        replaced = GuildSnapshot.__new__(GuildSnapshot)
+        replaced._worlds = dict(self._worlds)
+        for world, guilds in worlds.items():
+            if not isinstance(guilds, WorldGuilds):
+                guilds = WorldGuilds(guilds, previous=self._worlds.get(world))
+            replaced._worlds[sys.intern(world)] = guilds
+        return replaced
+
+    def only_worlds(self, worlds):
+        """A new snapshot with just the given worlds (the others are dropped)."""
+        kept = GuildSnapshot.__new__(GuildSnapshot)
+        kept._worlds = {world: guilds for world, guilds in self._worlds.items() if world in worlds}
+        return kept
+
+    def to_json(self):
+        """World -> guild -> members, ready for json.dump."""
+        return {world: guilds.to_json() for world, guilds in self._worlds.items()}
+
+    def canonical_json(self):
+        """
+        The snapshot serialized diff-stably: worlds and guilds sorted, members
+        in canonical order, one per line. Equal snapshots give equal text.
+        """
+        return json.dumps(self.to_json(), indent=4, sort_keys=True)
+
+
+class _Pairs(list):
+    """A parsed JSON object, as its (key, value) pairs."""
+
+    __slots__ = ()
+
+
+def _from_pairs(worlds):
+    """
+    Build a snapshot from parsed world -> guild -> members pairs, level by
+    level: the top-level object is the snapshot and each of its values is a
+    world (empty ones included). Each world's parsed lists are dropped as
+    soon as it is converted.
+
+    Raises:
+        ValueError: If the data isn't shaped world -> guild -> members
+    """
+    if not isinstance(worlds, _Pairs):
+        raise ValueError("Guild data must be a world -> guild -> members object")
+    snapshot = GuildSnapshot.__new__(GuildSnapshot)
+    snapshot._worlds = {}
+    for world, guilds in worlds:
+        if not isinstance(guilds, _Pairs):
+            raise ValueError(f"Guild data for {world} must be a guild -> members object")
+        snapshot._worlds[sys.intern(world)] = WorldGuilds(guilds)
+        guilds.clear()
+    return snapshot
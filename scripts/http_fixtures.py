@@ -0,0 +1,145 @@
+"""
+Record a run's TibiaData traffic into a fixture archive and replay it.
+
+Recording wraps every request attempt made through tibia_api (after
+decompression and field projection) and writes it to a gzipped JSON-lines
+archive: a header line, then one line per attempt in completion order with
+the URL, outcome, data and the attempt's latency. Transient failures and
+Retry-After values are recorded too, so a replay goes through the same
+retries and circuit breakers as the original run.
+
+Replaying serves each URL's recorded attempts in order (the last one is
+repeated if a run asks more often than the recording did) and sleeps for
+the recorded latency times `time_scale` - 1.0 reproduces the original
+timings, 0 serves everything instantly. URLs that were never recorded fail
+permanently, like a 404.
+
+Usage (any command):
+    python -m tibia_ops --record run.jsonl.gz enemies
+    python -m tibia_ops --replay run.jsonl.gz --time-scale 0.1 enemies
+"""
+
+import contextlib
+import gzip
+import json
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+import tibia_api
+
+FORMAT_VERSION = 1
+
+
+class Recorder:
+    """Transport that makes real attempts and keeps a copy of each one."""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.entries = []
+        self._lock = threading.Lock()
+
+    def __call__(self, url, fields=None):
+        # Looked up per call so tests that patch tibia_api._attempt still apply
+        outcome, data, reason, http_code, retry_after, elapsed = tibia_api._attempt(url, fields)
+        entry = {
+            'url': url,
+            'fields': sorted(fields) if fields is not None else None,
+            'outcome': outcome,
+            'data': data,
+            'reason': reason,
+            'http_code': http_code,
+            'retry_after': retry_after,
+            'elapsed': round(elapsed, 4),
+            'offset': round(time.monotonic() - self.started, 4),
+        }
+        with self._lock:
+            self.entries.append(entry)
+        return outcome, data, reason, http_code, retry_after, elapsed
+
+    def save(self, path):
+        """Write the recorded attempts to a gzipped JSON-lines archive."""
+        header = {
+            'format': FORMAT_VERSION,
+            'recorded': datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z'),
+            'attempts': len(self.entries),
+        }
+        with gzip.open(path, 'wt', encoding='utf-8') as f:
+            for record in [header] + self.entries:
+                f.write(json.dumps(record, separators=(',', ':')) + '\n')
+
+
+def load_archive(path):
+    """
+    Read a fixture archive.
+
+    Returns:
+        tuple: (header dict, list of attempt dicts)
+
+    Raises:
+        ValueError: If the archive has an unknown format
+    """
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        lines = [json.loads(line) for line in f if line.strip()]
+    if not lines or lines[0].get('format') != FORMAT_VERSION:
+        raise ValueError(f"{path} is not a version {FORMAT_VERSION} fixture archive")
+    return lines[0], lines[1:]
+
+
+class Replayer:
+    """Transport that answers attempts from a fixture archive."""
+
+    def __init__(self, entries, time_scale=1.0, sleep=time.sleep):
+        self.time_scale = time_scale
+        self.sleep = sleep
+        self.served = 0
+        self.missing = []
+        self._by_url = {}
+        for entry in entries:
+            self._by_url.setdefault(entry['url'], deque()).append(entry)
+        self._lock = threading.Lock()
+
+    def __call__(self, url, fields=None):
+        with self._lock:
+            attempts = self._by_url.get(url)
+            if not attempts:
+                self.missing.append(url)
+                return tibia_api._PERMANENT, None, "No recorded response", 404, None, 0.0
+            entry = attempts.popleft() if len(attempts) > 1 else attempts[0]
+            self.served += 1
+
+        elapsed = entry['elapsed'] * self.time_scale
+        if elapsed > 0:
+            self.sleep(elapsed)
+        retry_after = entry['retry_after']
+        if retry_after is not None:
+            retry_after *= self.time_scale
+        return entry['outcome'], entry['data'], entry['reason'], entry['http_code'], retry_after, elapsed
+
+
+@contextlib.contextmanager
+def recording(path):
+    """Record every request attempt made inside the block into `path`."""
+    recorder = Recorder()
+    previous = tibia_api.set_transport(recorder)
+    try:
+        yield recorder
+    finally:
+        tibia_api.set_transport(previous)
+        recorder.save(path)
+        print(f"Recorded {len(recorder.entries)} request attempt(s) to {path}")
+
+
+@contextlib.contextmanager
+def replaying(path, time_scale=1.0, sleep=time.sleep):
+    """Answer every request attempt made inside the block from `path`."""
+    _, entries = load_archive(path)
+    replayer = Replayer(entries, time_scale, sleep)
+    previous = tibia_api.set_transport(replayer)
+    try:
+        yield replayer
+    finally:
+        tibia_api.set_transport(previous)
+        if replayer.missing:
+            print(f"Replay: {len(replayer.missing)} request(s) had no recorded response")
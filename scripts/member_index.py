@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Global, cross-world member index: which world and guild is a character in?
+
+Built from world_guilds_data.json into docs/data/members/, sharded by the
+first letter of the case-folded name so a lookup reads one small file
+instead of scanning every world. Each shard is sorted by folded name, which
+makes exact and prefix lookups a binary search.
+
+The manifest (index.json) lists the shards and ships the case-fold table
+the page needs: JavaScript has no casefold(), and toLowerCase() alone
+leaves e.g. 'ß' or 'ſ' unfolded, which would send a lookup to the wrong
+shard. Lowercasing a name and mapping each character through the table
+gives exactly name.casefold().
+
+Shard layout (parallel arrays indexed by row id):
+    {
+        "folded": ["<name case-folded>", ...],   # sorted
+        "names":  ["<name>", ...],
+        "world":  [<index into worlds>, ...],
+        "guild":  [<index into guilds>, ...],
+        "worlds": ["<world>", ...],
+        "guilds": ["<guild>", ...]
+    }
+
+Usage:
+    python scripts/member_index.py build
+    python scripts/member_index.py whois "Character Name"
+    python scripts/member_index.py search "prefix" [--limit N]
+"""
+
+import argparse
+import bisect
+import functools
+import json
+import os
+import sys
+
+# Add scripts directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import WORLD_GUILDS_FILE, MEMBER_INDEX_DIR  # noqa: E402
+from config_store import read_json, write_json  # noqa: E402
+
+MANIFEST_NAME = 'index.json'
+OTHER_SHARD = '_'
+
+
+def fold(name):
+    """Case-fold a character name for comparisons."""
+    return name.casefold()
+
+
+@functools.lru_cache(maxsize=None)
+def fold_table():
+    """
+    Lowercase characters whose case fold differs, mapped to their fold
+    (e.g. 'ß' -> 'ss'). name.lower() mapped through it is name.casefold().
+    """
+    return {c: c.casefold() for c in map(chr, range(sys.maxunicode + 1))
+            if c.casefold() != c and c.lower() == c}
+
+
+def shard_key(folded_name):
+    """Shard a folded name belongs to: its first letter, or '_' for anything else."""
+    first = folded_name[:1]
+    return first if 'a' <= first <= 'z' else OTHER_SHARD
+
+
+def build_shards(worlds_data):
+    """
+    Build all member index shards from guild data.
+
+    Args:
+        worlds_data: World -> guild -> members mapping
+
+    Returns:
+        dict: Shard key -> shard (see module docstring for the layout)
+    """
+    rows_by_shard = {}
+    for world, guilds in worlds_data.items():
+        for guild, members in guilds.items():
+            for member in members:
+                if not member:
+                    continue
+                folded = fold(member)
+                rows_by_shard.setdefault(shard_key(folded), []).append((folded, member, world, guild))
+
+    shards = {}
+    for key, rows in rows_by_shard.items():
+        rows.sort()
+        worlds = sorted({row[2] for row in rows})
+        guilds = sorted({row[3] for row in rows})
+        world_index = {name: idx for idx, name in enumerate(worlds)}
+        guild_index = {name: idx for idx, name in enumerate(guilds)}
+        shards[key] = {
+            'folded': [row[0] for row in rows],
+            'names': [row[1] for row in rows],
+            'world': [world_index[row[2]] for row in rows],
+            'guild': [guild_index[row[3]] for row in rows],
+            'worlds': worlds,
+            'guilds': guilds,
+        }
+    return shards
+
+
+def write_member_index(worlds_data, out_dir=MEMBER_INDEX_DIR):
+    """
+    Write the member index shards and manifest, removing stale shards.
+
+    Returns:
+        dict: The manifest that was written
+    """
+    os.makedirs(out_dir, exist_ok=True)
+
+    manifest = {'shards': {}, 'fold': fold_table()}
+    for key, shard in sorted(build_shards(worlds_data).items()):
+        filename = f"{key}.json"
+        write_json(os.path.join(out_dir, filename), shard, compact=True)
+        manifest['shards'][key] = {'file': filename, 'members': len(shard['names'])}
+
+    expected = {entry['file'] for entry in manifest['shards'].values()} | {MANIFEST_NAME}
+    for filename in os.listdir(out_dir):
+        if filename.endswith('.json') and filename not in expected:
+            os.remove(os.path.join(out_dir, filename))
+
+    write_json(os.path.join(out_dir, MANIFEST_NAME), manifest, compact=True)
+    return manifest
+
+
+class MemberIndex:
+    """
+    Read-side of the member index. Loads at most one shard per first letter,
+    on first use.
+    """
+
+    def __init__(self, directory=MEMBER_INDEX_DIR):
+        self.directory = directory
+        self._shards = {}
+
+    def _shard(self, key):
+        if key not in self._shards:
+            path = os.path.join(self.directory, f"{key}.json")
+            try:
+                with open(path, 'r') as f:
+                    self._shards[key] = json.load(f)
+            except FileNotFoundError:
+                self._shards[key] = None
+        return self._shards[key]
+
+    def _rows(self, shard, start, end, limit=None):
+        rows = []
+        for row in range(start, end):
+            if limit is not None and len(rows) >= limit:
+                break
+            rows.append((
+                shard['names'][row],
+                shard['worlds'][shard['world'][row]],
+                shard['guilds'][shard['guild'][row]],
+            ))
+        return rows
+
+    def whois(self, name):
+        """
+        Find a character by exact (case-insensitive) name.
+
+        Returns:
+            list: (name, world, guild) tuples - normally zero or one
+        """
+        folded = fold(name.strip())
+        shard = self._shard(shard_key(folded))
+        if not folded or shard is None:
+            return []
+        start = bisect.bisect_left(shard['folded'], folded)
+        end = bisect.bisect_right(shard['folded'], folded, lo=start)
+        return self._rows(shard, start, end)
+
+    def search(self, prefix, limit=20):
+        """
+        Find characters whose name starts with prefix (case-insensitive).
+
+        Returns:
+            list: Up to `limit` (name, world, guild) tuples in name order
+        """
+        folded = fold(prefix.strip())
+        shard = self._shard(shard_key(folded))
+        if not folded or shard is None:
+            return []
+        start = bisect.bisect_left(shard['folded'], folded)
+        # Every name with this prefix sorts before prefix + U+10FFFF
+        end = bisect.bisect_left(shard['folded'], folded + '\U0010ffff', lo=start)
+        return self._rows(shard, start, end, limit=limit)
+
+
+def main(argv=None):
+    """Command-line entry point: build the index or query it."""
+    parser = argparse.ArgumentParser(description="Cross-world guild member index")
+    parser.add_argument('--dir', default=MEMBER_INDEX_DIR, help="Index directory")
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('build', help="Build the index from the guild data file")
+    whois = sub.add_parser('whois', help="Find a character by exact name")
+    whois.add_argument('name')
+    search = sub.add_parser('search', help="Find characters by name prefix")
+    search.add_argument('prefix')
+    search.add_argument('--limit', type=int, default=20)
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        manifest = write_member_index(read_json(WORLD_GUILDS_FILE), args.dir)
+        total = sum(entry['members'] for entry in manifest['shards'].values())
+        print(f"Wrote member index with {total} members in "
+              f"{len(manifest['shards'])} shards to {args.dir}")
+        return 0
+
+    index = MemberIndex(args.dir)
+    if args.command == 'whois':
+        rows = index.whois(args.name)
+    else:
+        rows = index.search(args.prefix, limit=args.limit)
+
+    if not rows:
+        print("No matching characters found.")
+        return 1
+    for name, world, guild in rows:
+        print(f"{name} - {guild} ({world})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,196 @@
+"""
+Opt-in profiling for the scheduled jobs (`--profile`).
+
+Jobs mark their phases (load, fetch, build, diff, save) with
+`with phase('fetch'):`. While profiling is off, phase() returns a shared
+no-op context manager and nothing else here is imported or run, so the
+marks cost a function call.
+
+With profiling on (start() ... finish()):
+- one cProfile profiler runs for the whole session (Python 3.12+ allows
+  only one active profiler; it sees every thread there, while on 3.11 it
+  sees the main thread only), and every request attempt, in any thread, is
+  timed with perf_counter through a tibia_api transport, so time spent in
+  the API client's workers shows up even where they aren't profiled
+- each phase is timed (exclusive of phases nested in it) and its peak traced
+  memory recorded; tracemalloc snapshots taken around the first few calls
+  of each outermost phase (PROFILE_ALLOC_SAMPLES - a snapshot walks every
+  live allocation, so one per call would dominate a per-world phase)
+  attribute allocations to the source lines that made them
+- finish() writes <job>.pstats (load with `python -m pstats`) and a
+  <job>-profile.txt summary: phase table, top-N hotspots and top-N
+  allocation sites per phase
+"""
+
+import contextlib
+import os
+import sys
+import time
+
+from config import PROFILE_ALLOC_SAMPLES, PROFILE_DIR, PROFILE_TOP_N
+
+_NULL_PHASE = contextlib.nullcontext()
+_session = None
+
+
+def phase(name):
+    """Context manager marking a phase of the run (a no-op unless profiling)."""
+    if _session is None:
+        return _NULL_PHASE
+    return _session.phase(name)
+
+
+def start(job, directory=PROFILE_DIR, top=PROFILE_TOP_N):
+    """Start profiling this process as `job`."""
+    global _session
+    if _session is not None:
+        raise RuntimeError("Profiling is already running")
+    _session = _Session(job, directory, top)
+
+
+def finish():
+    """
+    Stop profiling and write the report.
+
+    Returns:
+        tuple or None: (pstats path, summary path), or None if not profiling
+    """
+    global _session
+    if _session is None:
+        return None
+    session, _session = _session, None
+    return session.finish()
+
+
+class _Session:
+    """One profiled run."""
+
+    def __init__(self, job, directory, top):
+        import cProfile
+        import threading
+        import tracemalloc
+        import tibia_api
+
+        self.job = job
+        self.directory = directory
+        self.top = top
+        self.phases = {}        # name -> {'calls', 'seconds', 'peak', 'allocations'}
+        self.stack = []         # [name, started, nested seconds] per open phase
+        self.attempts = 0
+        self.attempt_seconds = 0.0
+        self._lock = threading.Lock()
+        self._tracemalloc = tracemalloc
+        self._api = tibia_api
+        self._ignored_files = (tracemalloc.__file__, __file__, '<frozen importlib._bootstrap')
+
+        tracemalloc.start()
+        self._previous_transport = tibia_api.set_transport(self._timed_attempt)
+        self.profile = cProfile.Profile()
+        self.started = time.perf_counter()
+        self.profile.enable()
+
+    def _timed_attempt(self, url, fields=None):
+        """Run a request attempt, adding its wall time to the attempt totals."""
+        attempt = self._previous_transport or self._api._attempt
+        started = time.perf_counter()
+        try:
+            return attempt(url, fields)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.attempts += 1
+                self.attempt_seconds += elapsed
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        tracemalloc = self._tracemalloc
+        outermost = not self.stack
+        stats = self.phases.setdefault(name, {'calls': 0, 'seconds': 0.0, 'peak': 0, 'allocations': {}})
+        sampled = outermost and stats['calls'] < PROFILE_ALLOC_SAMPLES
+        if outermost:
+            tracemalloc.reset_peak()
+        if sampled:
+            before = self._snapshot()
+        self.stack.append([name, time.perf_counter(), 0.0])
+        try:
+            yield
+        finally:
+            _, started, nested = self.stack.pop()
+            elapsed = time.perf_counter() - started
+            if self.stack:
+                self.stack[-1][2] += elapsed
+            stats['calls'] += 1
+            stats['seconds'] += elapsed - nested
+            if outermost:
+                stats['peak'] = max(stats['peak'], tracemalloc.get_traced_memory()[1])
+            if sampled:
+                self._add_allocations(stats['allocations'], before)
+
+    # Snapshots are taken and compared with the profiler paused, so they show
+    # up in neither the phase times nor the hotspots
+
+    def _snapshot(self):
+        self.profile.disable()
+        try:
+            return self._tracemalloc.take_snapshot()
+        finally:
+            self.profile.enable()
+
+    def _add_allocations(self, allocations, before):
+        """Add the net bytes allocated per source line since `before`."""
+        self.profile.disable()
+        try:
+            for diff in self._tracemalloc.take_snapshot().compare_to(before, 'lineno'):
+                frame = diff.traceback[0]
+                if diff.size_diff > 0 and not frame.filename.startswith(self._ignored_files):
+                    key = f"{frame.filename}:{frame.lineno}"
+                    allocations[key] = allocations.get(key, 0) + diff.size_diff
+        finally:
+            self.profile.enable()
+
+    def finish(self):
+        import io
+        import pstats
+
+        self.profile.disable()
+        wall = time.perf_counter() - self.started
+        peak = self._tracemalloc.get_traced_memory()[1]
+        self._tracemalloc.stop()
+        self._api.set_transport(self._previous_transport)
+
+        os.makedirs(self.directory, exist_ok=True)
+        pstats_path = os.path.join(self.directory, f"{self.job}.pstats")
+        self.profile.dump_stats(pstats_path)
+        threads = "all threads" if sys.version_info >= (3, 12) else "the main thread only"
+
+        lines = [
+            f"Profile: {self.job}",
+            f"Wall time: {wall:.2f}s, peak traced memory: {peak / 2**20:.1f} MiB",
+            f"Request attempts: {self.attempts}, {self.attempt_seconds:.2f}s "
+            f"(summed across threads; the function profile covers {threads})",
+            "",
+            f"{'phase':<10} {'calls':>6} {'seconds':>9} {'share':>6} {'peak MiB':>9}",
+        ]
+        for name, phase_stats in self.phases.items():
+            share = 100 * phase_stats['seconds'] / wall if wall else 0
+            lines.append(f"{name:<10} {phase_stats['calls']:>6} {phase_stats['seconds']:>9.2f} "
+                         f"{share:>5.0f}% {phase_stats['peak'] / 2**20:>9.1f}")
+
+        for sort in ('cumulative', 'tottime'):
+            out = io.StringIO()
+            pstats.Stats(pstats_path, stream=out).sort_stats(sort).print_stats(self.top)
+            lines += ["", f"Top {self.top} functions by {sort} time ({threads})", out.getvalue().strip()]
+
+        for name, phase_stats in self.phases.items():
+            allocations = sorted(phase_stats['allocations'].items(), key=lambda item: -item[1])[:self.top]
+            if not allocations:
+                continue
+            lines += ["", f"Top allocation sites in '{name}' "
+                          f"(net bytes, first {PROFILE_ALLOC_SAMPLES} outermost calls)"]
+            lines += [f"  {size / 1024:>10.1f} KiB  {site}" for site, size in allocations]
+
+        summary_path = os.path.join(self.directory, f"{self.job}-profile.txt")
+        with open(summary_path, 'w') as f:
+            f.write("\n".join(lines) + "\n")
+        print(f"\nProfile written to {pstats_path} and {summary_path}")
+        return pstats_path, summary_path
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Publish the Guild Explorer data to GitHub Pages under content-hashed names.
+
+The search index, member index and guild data mirror in docs/data/ keep
+their plain names (scripts and external readers use those), and each is
+also copied to docs/data/blobs/ as `<name>.<sha256 prefix>.json`. A blob's
+content never changes, so the page can keep it in the browser cache
+indefinitely. No precompressed variants are written: Pages compresses
+responses itself and never serves `.gz` files. docs/data/latest.json maps each
+plain name to its current blob:
+
+    {
+        "format": 1,
+        "published": "<ISO-8601 time the file set last changed>",
+        "files": {"search/index.json": "blobs/search/index.<hash>.json", ...}
+    }
+
+The pointer is the only file the page revalidates on every load; a repeat
+visit with unchanged data moves no data bodies at all. Publishing is
+idempotent: unchanged files keep their blob, so a run with no data changes
+changes nothing. Every file under docs/data/blobs/ that the new pointer
+doesn't reference is removed (including `.gz` files from older publishes),
+so the committed tree holds exactly latest.json and the blobs it lists and
+history only grows by the blobs that actually changed. A page that read
+the previous pointer just before a publish re-reads it when a blob is gone.
+
+Usage:
+    python scripts/publish_data.py
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import sys
+from datetime import datetime, timezone
+
+# Add scripts directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import (  # noqa: E402
+    GUILDS_MIRROR_FILE,
+    PAGES_DATA_DIR,
+    PUBLISH_BLOB_DIR,
+    PUBLISH_POINTER_FILE,
+    WORLD_GUILDS_FILE
+)
+from config_store import read_json  # noqa: E402
+
+POINTER_FORMAT = 1
+DIGEST_LENGTH = 16  # hex characters of the sha256 kept in blob names
+
+# Files published under hashed names, relative to the Pages data directory
+PUBLISHED_FILES = ('world_guilds_data.json', 'search/*.json', 'members/*.json')
+
+# Blob directory and pointer, relative to the Pages data directory
+BLOB_DIR_NAME = os.path.relpath(PUBLISH_BLOB_DIR, PAGES_DATA_DIR)
+POINTER_NAME = os.path.relpath(PUBLISH_POINTER_FILE, PAGES_DATA_DIR)
+
+
+def write_mirror(worlds_data, path=GUILDS_MIRROR_FILE):
+    """Write the minified mirror of the guild data (Pages cannot read .configs/)."""
+    with open(path, 'w') as f:
+        json.dump(worlds_data, f, separators=(',', ':'))
+
+
+def content_digest(data):
+    """Hex digest identifying a file's content."""
+    return hashlib.sha256(data).hexdigest()[:DIGEST_LENGTH]
+
+
+def blob_name(name, digest):
+    """Blob path of a file, relative to the data directory ('search/a.json' -> 'blobs/search/a.<digest>.json')."""
+    stem, ext = os.path.splitext(name)
+    return f"{BLOB_DIR_NAME}/{stem}.{digest}{ext}"
+
+
+def published_names(data_dir, patterns=PUBLISHED_FILES):
+    """Data files to publish, as sorted '/'-separated paths relative to data_dir."""
+    names = set()
+    for pattern in patterns:
+        for path in glob.glob(os.path.join(data_dir, pattern)):
+            names.add(os.path.relpath(path, data_dir).replace(os.sep, '/'))
+    return sorted(names)
+
+
+def load_pointer(path):
+    """The current pointer, or None if there is none (or it is unreadable)."""
+    try:
+        with open(path, 'r') as f:
+            pointer = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    return pointer if isinstance(pointer, dict) and isinstance(pointer.get('files'), dict) else None
+
+
+def _write_bytes(path, data):
+    """Write a file via a temporary file, so a blob is never seen half-written."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def write_blob(data_dir, blob, data):
+    """
+    Write a blob unless it already exists.
+
+    Returns:
+        bool: True if the blob was written, False if it was already there
+    """
+    path = os.path.join(data_dir, blob)
+    if os.path.exists(path):
+        return False
+    _write_bytes(path, data)
+    return True
+
+
+def prune_blobs(data_dir, keep):
+    """
+    Remove every file in the blob directory that isn't in `keep`, then any
+    directories left empty.
+
+    Returns:
+        int: Number of files removed
+    """
+    removed = 0
+    for root, _, filenames in os.walk(os.path.join(data_dir, BLOB_DIR_NAME), topdown=False):
+        for filename in filenames:
+            path = os.path.join(root, filename)
+            if os.path.relpath(path, data_dir).replace(os.sep, '/') not in keep:
+                os.remove(path)
+                removed += 1
+        if not os.listdir(root):
+            os.rmdir(root)
+    return removed
+
+
+def publish(data_dir=PAGES_DATA_DIR, patterns=PUBLISHED_FILES, now=None):
+    """
+    Publish the data files under content-hashed names and update the pointer.
+
+    Args:
+        data_dir: Pages data directory (contains the plain files)
+        patterns: Globs of files to publish, relative to data_dir
+        now: Publish time (defaults to the current UTC time)
+
+    Returns:
+        dict: {'pointer': the pointer, 'written': blobs written,
+               'unchanged': blobs reused, 'removed': blobs removed}
+    """
+    pointer_path = os.path.join(data_dir, POINTER_NAME)
+    previous = load_pointer(pointer_path)
+
+    files = {}
+    written = 0
+    for name in published_names(data_dir, patterns):
+        with open(os.path.join(data_dir, name), 'rb') as f:
+            data = f.read()
+        blob = blob_name(name, content_digest(data))
+        written += write_blob(data_dir, blob, data)
+        files[name] = blob
+
+    if previous is not None and previous['files'] == files:
+        pointer = previous
+    else:
+        now = now or datetime.now(timezone.utc)
+        pointer = {
+            'format': POINTER_FORMAT,
+            'published': now.strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'files': files,
+        }
+        _write_bytes(pointer_path, json.dumps(pointer, separators=(',', ':'), sort_keys=True).encode())
+
+    return {
+        'pointer': pointer,
+        'written': written,
+        'unchanged': len(files) - written,
+        'removed': prune_blobs(data_dir, set(files.values())),
+    }
+
+
+def main(argv=None):
+    """Write the guild data mirror, then publish the Pages data."""
+    parser = argparse.ArgumentParser(description="Publish Guild Explorer data under content-hashed names")
+    parser.add_argument('--skip-mirror', action='store_true',
+                        help=f"Don't rewrite {GUILDS_MIRROR_FILE} from {WORLD_GUILDS_FILE} first")
+    args = parser.parse_args(argv)
+
+    if not args.skip_mirror:
+        worlds_data = read_json(WORLD_GUILDS_FILE)
+        write_mirror(worlds_data)
+        print(f"Mirrored {len(worlds_data)} worlds, "
+              f"{sum(len(guilds) for guilds in worlds_data.values())} guilds to {GUILDS_MIRROR_FILE}")
+
+    result = publish()
+    print(f"Published {len(result['pointer']['files'])} files to {PUBLISH_BLOB_DIR}: "
+          f"{result['written']} new, {result['unchanged']} unchanged, {result['removed']} old removed")
+    print(f"{PUBLISH_POINTER_FILE}: published {result['pointer']['published']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,430 @@
+#!/usr/bin/env python3
+"""
+Local read-only HTTP query service over the config lists and guild data.
+
+Loads the lists in .configs/ and the guild snapshot once, keeps them in
+in-memory indexes, and answers small JSON queries instead of handing out
+the whole files:
+
+    GET /troll/{name}               {"name", "troll", "version"}
+    GET /whois/{name}               {"name", "matches": [{name, world, guild}], "lists": [...]}
+    GET /guild/{world}/{name}       {"world", "guild", "members"}
+    GET /lists/{list}               {"list", "version", "names"}
+    GET /lists/{list}?since=V       {"list", "version", "since", "added", "removed"}
+    GET /status                     versions and sizes of the loaded data
+
+Names, worlds and guilds are matched case-insensitively. `version` is the
+list file's config_store version (a digest of its content, so a list
+replaced outside config_store, e.g. by a git pull, gets a new one too);
+`since` returns what changed after a version this process has seen (the
+last QUERY_LIST_HISTORY of them), and the full list otherwise.
+
+Before answering, the service checks (at most every QUERY_RELOAD_INTERVAL
+seconds) whether any file changed on disk and rebuilds the indexes of the
+changed ones; a file that fails to parse keeps serving its last good
+data. Every response carries an ETag (If-None-Match gets a 304) and is
+gzipped when the client accepts it and it is large enough to gain.
+
+Usage:
+    python scripts/query_service.py [--host HOST] [--port PORT]
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+# Add scripts directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import (  # noqa: E402
+    ALERTS_FILE,
+    BASTEX_FILE,
+    BLOCK_FILE,
+    QUERY_GZIP_MIN_BYTES,
+    QUERY_LIST_HISTORY,
+    QUERY_RELOAD_INTERVAL,
+    QUERY_RESPONSE_CACHE_SIZE,
+    QUERY_SERVICE_HOST,
+    QUERY_SERVICE_PORT,
+    TROLLS_FILE,
+    WORLD_GUILDS_FILE
+)
+from config_store import MISSING_VERSION, VERSION_LENGTH, current_version  # noqa: E402
+from guild_snapshot import GuildSnapshot  # noqa: E402
+from member_index import fold  # noqa: E402
+
+# List name (as used in /lists/{list}) -> file
+LISTS = {
+    'trolls': TROLLS_FILE,
+    'bastex': BASTEX_FILE,
+    'block': BLOCK_FILE,
+    'alerts': ALERTS_FILE,
+}
+
+VERSION_PATTERN = re.compile(f'[0-9a-f]{{{VERSION_LENGTH}}}')
+
+
+def file_stamp(path):
+    """What identifies a file's current content on disk (None if it doesn't exist)."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+class ListIndex:
+    """One version of a name list: the names, a folded-name lookup and recent history."""
+
+    __slots__ = ('version', 'names', 'folded', 'history')
+
+    def __init__(self, names, version, previous=None):
+        """
+        Args:
+            names: The list's names, in file order
+            version: The file's config_store version
+            previous: The list's previous ListIndex, whose history is kept
+        """
+        self.version = version
+        self.names = tuple(names)
+        self.folded = {fold(name): name for name in self.names}
+        # (version, folded -> name) of recent versions, oldest first. Content
+        # that comes back (e.g. a reverted edit) keeps only its newest entry.
+        history = [entry for entry in previous.history if entry[0] != version] if previous else []
+        history.append((version, self.folded))
+        self.history = tuple(history[-QUERY_LIST_HISTORY:])
+
+    def changes_since(self, version):
+        """
+        (added, removed) names since a version, or None if it isn't in the history.
+        """
+        for seen, folded in self.history:
+            if seen == version:
+                added = sorted(self.folded[name] for name in self.folded.keys() - folded.keys())
+                removed = sorted(folded[name] for name in folded.keys() - self.folded.keys())
+                return added, removed
+        return None
+
+
+class GuildIndex:
+    """Case-insensitive guild and member lookups over a GuildSnapshot."""
+
+    __slots__ = ('version', 'worlds', 'members', 'member_count')
+
+    def __init__(self, snapshot, version):
+        self.version = version
+        # folded world -> (world, guilds, folded guild -> guild)
+        self.worlds = {}
+        # folded member -> ((name, world, guild), ...)
+        self.members = {}
+        self.member_count = 0
+        for world, guilds in snapshot.items():
+            self.worlds[fold(world)] = (world, guilds, {fold(guild): guild for guild in guilds})
+            for guild, names in guilds.items():
+                for name in names:
+                    key = fold(name)
+                    self.members[key] = self.members.get(key, ()) + ((name, world, guild),)
+                self.member_count += len(names)
+
+
+class QueryData:
+    """
+    The loaded data, reloaded when files change.
+
+    Readers take `self.state` once per request: it is replaced as a whole
+    on reload, never modified, so a request always sees one consistent
+    generation.
+    """
+
+    def __init__(self, lists=None, guilds_file=WORLD_GUILDS_FILE, reload_interval=QUERY_RELOAD_INTERVAL):
+        self.list_files = dict(LISTS if lists is None else lists)
+        self.guilds_file = guilds_file
+        self.reload_interval = reload_interval
+        self.state = {'generation': 0, 'lists': {}, 'guilds': None, 'stamps': {}}
+        self._lock = threading.Lock()
+        self._checked = 0.0
+        self.reload()
+
+    def refresh(self):
+        """Reload changed files if the reload interval has passed since the last check."""
+        if time.monotonic() - self._checked >= self.reload_interval:
+            self.reload()
+        return self.state
+
+    def reload(self):
+        """
+        Rebuild the indexes of files that changed on disk.
+
+        A file that can't be read or parsed (e.g. caught half-written) keeps
+        its last good index and is tried again on the next check.
+
+        Returns:
+            bool: True if anything was reloaded
+        """
+        with self._lock:
+            self._checked = time.monotonic()
+            state = self.state
+            stamps = {path: file_stamp(path) for path in [*self.list_files.values(), self.guilds_file]}
+            if stamps == state['stamps']:
+                return False
+
+            lists = dict(state['lists'])
+            for name, path in self.list_files.items():
+                if name not in lists or stamps[path] != state['stamps'].get(path):
+                    try:
+                        lists[name] = ListIndex(self._read_list(path), current_version(path), lists.get(name))
+                    except (OSError, ValueError) as e:
+                        self._keep_last_good(path, e, stamps, state)
+                        lists.setdefault(name, ListIndex([], MISSING_VERSION))
+            guilds = state['guilds']
+            if guilds is None or stamps[self.guilds_file] != state['stamps'].get(self.guilds_file):
+                try:
+                    guilds = GuildIndex(self._read_guilds(self.guilds_file), current_version(self.guilds_file))
+                except (OSError, ValueError) as e:
+                    self._keep_last_good(self.guilds_file, e, stamps, state)
+                    guilds = guilds or GuildIndex(GuildSnapshot(), MISSING_VERSION)
+
+            if stamps == state['stamps'] and state['guilds'] is not None:
+                return False
+            self.state = {'generation': state['generation'] + 1, 'lists': lists, 'guilds': guilds,
+                          'stamps': stamps}
+            return True
+
+    @staticmethod
+    def _keep_last_good(path, error, stamps, state):
+        print(f"Warning: could not reload {path} ({error}) - serving the last good data", file=sys.stderr)
+        # The old stamp makes the next check try the file again
+        stamps[path] = state['stamps'].get(path)
+
+    @staticmethod
+    def _read_list(path):
+        try:
+            with open(path, 'r') as f:
+                names = json.load(f)
+        except FileNotFoundError:
+            return []
+        if not isinstance(names, list):
+            raise ValueError(f"expected a list of names, got {type(names).__name__}")
+        return [name for name in names if isinstance(name, str)]
+
+    @staticmethod
+    def _read_guilds(path):
+        try:
+            return GuildSnapshot.load(path)
+        except FileNotFoundError:
+            return GuildSnapshot()
+
+
+class QueryError(Exception):
+    """A request that can't be answered (carries the HTTP status)."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def query(state, path, params):
+    """
+    Answer a query from one generation of the data.
+
+    Args:
+        state: QueryData.state
+        path: Decoded path segments (e.g. ['guild', 'Antica', 'Red Rose'])
+        params: Query string parameters (parse_qs output)
+
+    Returns:
+        dict: The response payload
+
+    Raises:
+        QueryError: Unknown endpoint, list, world or guild, or a bad parameter
+    """
+    lists = state['lists']
+    guilds = state['guilds']
+    endpoint, args = (path[0], path[1:]) if path else ('', [])
+
+    if endpoint == 'troll' and len(args) == 1:
+        trolls = lists['trolls']
+        name = trolls.folded.get(fold(args[0]))
+        return {'name': name or args[0], 'troll': name is not None, 'version': trolls.version}
+
+    if endpoint == 'whois' and len(args) == 1:
+        key = fold(args[0])
+        matches = guilds.members.get(key, ())
+        return {
+            'name': matches[0][0] if matches else args[0],
+            'matches': [{'name': name, 'world': world, 'guild': guild} for name, world, guild in matches],
+            'lists': sorted(list_name for list_name, index in lists.items() if key in index.folded),
+        }
+
+    if endpoint == 'guild' and len(args) == 2:
+        world = guilds.worlds.get(fold(args[0]))
+        guild = world and world[2].get(fold(args[1]))
+        if not guild:
+            raise QueryError(404, f"No guild {args[1]!r} on world {args[0]!r}")
+        return {'world': world[0], 'guild': guild, 'members': world[1][guild], 'version': guilds.version}
+
+    if endpoint == 'lists' and len(args) == 1:
+        index = lists.get(args[0])
+        if index is None:
+            raise QueryError(404, f"Unknown list {args[0]!r} (lists: {', '.join(sorted(lists))})")
+        payload = {'list': args[0], 'version': index.version}
+        if 'since' in params:
+            since = params['since'][-1]
+            if not VERSION_PATTERN.fullmatch(since):
+                raise QueryError(400, f"since must be a list version ({VERSION_LENGTH} hex digits)")
+            changes = index.changes_since(since)
+            if changes is not None:
+                payload.update(since=since, added=changes[0], removed=changes[1])
+                return payload
+        payload['names'] = index.names
+        return payload
+
+    if endpoint == 'status' and not args:
+        return {
+            'generation': state['generation'],
+            'lists': {name: {'version': index.version, 'names': len(index.names)}
+                      for name, index in sorted(lists.items())},
+            'guilds': {'version': guilds.version, 'worlds': len(guilds.worlds),
+                       'members': guilds.member_count},
+        }
+
+    raise QueryError(404, "Unknown endpoint (see /status, /troll/NAME, /whois/NAME, "
+                          "/guild/WORLD/NAME, /lists/LIST)")
+
+
+def encode(payload):
+    """The JSON body of a payload and its ETag."""
+    body = json.dumps(payload, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    return body, f'"{hashlib.sha256(body).hexdigest()[:20]}"'
+
+
+class ResponseCache:
+    """Encoded responses per (generation, request target), dropped wholesale when full."""
+
+    def __init__(self, size=QUERY_RESPONSE_CACHE_SIZE):
+        self.size = size
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, build):
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = build()
+            with self._lock:
+                if len(self._entries) >= self.size:
+                    self._entries.clear()
+                self._entries[key] = entry
+        return entry
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+    """GET/HEAD handler; `server.data` is the QueryData, `server.responses` the ResponseCache."""
+
+    protocol_version = 'HTTP/1.1'  # keep-alive: clients can reuse a connection
+    # Headers and body are separate writes; with Nagle on, a keep-alive
+    # client's delayed ACK holds the body back ~40 ms
+    disable_nagle_algorithm = True
+    server_version = 'TibiaOpsQuery/1'
+
+    def do_GET(self):
+        self._respond(send_body=True)
+
+    def do_HEAD(self):
+        self._respond(send_body=False)
+
+    def _respond(self, send_body):
+        state = self.server.data.refresh()
+        target = urlsplit(self.path)
+        gzip_ok = 'gzip' in self.headers.get('Accept-Encoding', '')
+        status, body, etag, encoding = self.server.responses.get(
+            (state['generation'], target.path, target.query, gzip_ok),
+            lambda: self._build(state, target, gzip_ok))
+
+        if status == 200 and etag in self._if_none_match():
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Vary', 'Accept-Encoding')
+        if status == 200:
+            self.send_header('ETag', etag)
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    @staticmethod
+    def _build(state, target, gzip_ok):
+        """(status, body, ETag, Content-Encoding) for a request."""
+        path = [unquote(part) for part in target.path.strip('/').split('/') if part]
+        try:
+            status, payload = 200, query(state, path, parse_qs(target.query))
+        except QueryError as e:
+            status, payload = e.status, {'error': str(e)}
+        body, etag = encode(payload)
+        encoding = None
+        if gzip_ok and len(body) >= QUERY_GZIP_MIN_BYTES:
+            body, encoding = gzip.compress(body, compresslevel=6, mtime=0), 'gzip'
+            # A different representation needs a different strong ETag
+            etag = f'{etag[:-1]}-gzip"'
+        return status, body, etag, encoding
+
+    def _if_none_match(self):
+        header = self.headers.get('If-None-Match', '')
+        return {tag.strip().removeprefix('W/') for tag in header.split(',')}
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def make_server(host=QUERY_SERVICE_HOST, port=QUERY_SERVICE_PORT, data=None, verbose=False):
+    """A ThreadingHTTPServer answering queries (port 0 picks a free port)."""
+    server = ThreadingHTTPServer((host, port), QueryHandler)
+    server.daemon_threads = True
+    server.data = data or QueryData()
+    server.responses = ResponseCache()
+    server.verbose = verbose
+    return server
+
+
+def main(argv=None):
+    """Serve queries until interrupted."""
+    parser = argparse.ArgumentParser(description="Read-only HTTP queries over the config and guild data")
+    parser.add_argument('--host', default=QUERY_SERVICE_HOST,
+                        help=f"Address to listen on (default {QUERY_SERVICE_HOST})")
+    parser.add_argument('--port', type=int, default=QUERY_SERVICE_PORT,
+                        help=f"Port to listen on (default {QUERY_SERVICE_PORT})")
+    parser.add_argument('--verbose', action='store_true', help="Log every request")
+    args = parser.parse_args(argv)
+
+    server = make_server(args.host, args.port, verbose=args.verbose)
+    state = server.data.state
+    print(f"Loaded {len(state['lists'])} lists and {state['guilds'].member_count} guild members "
+          f"in {len(state['guilds'].worlds)} worlds")
+    print(f"Serving on http://{server.server_address[0]}:{server.server_address[1]}/ (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Build the Guild Explorer search index from world_guilds_data.json.
+
+Writes one shard per world into docs/data/search/ plus a small manifest, so
+the page only downloads the world being browsed and answers member searches
+from precomputed data instead of lower-casing and scanning every row on each
+keystroke.
+
+Shard layout (all arrays are parallel, indexed by row id):
+    {
+        "world":  "<world>",
+        "guilds": ["<guild>", ...],              # sorted
+        "names":  ["<member>", ...],
+        "lower":  ["<member lower-cased>", ...], # sorted, so prefix queries
+                                                 # are a binary search
+        "guild":  [<index into guilds>, ...]
+    }
+
+Rows are sorted by lower-cased name, so a prefix query is a binary search
+over "lower" and the matches are one contiguous range of row ids.
+
+Usage:
+    python scripts/search_index.py
+"""
+
+import os
+import sys
+
+# Add scripts directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import WORLD_GUILDS_FILE, SEARCH_INDEX_DIR  # noqa: E402
+from config_store import read_json, write_json  # noqa: E402
+
+MANIFEST_NAME = 'index.json'
+
+
+def shard_filename(world):
+    """File name of a world's shard inside the search index directory."""
+    return f"{world.lower()}.json"
+
+
+def build_world_shard(world, guilds):
+    """
+    Build the search shard for one world.
+
+    Args:
+        world: World name
+        guilds: Guild name -> list of member names for the world
+
+    Returns:
+        dict: The shard (see module docstring for the layout)
+    """
+    guild_names = sorted(guilds, key=lambda name: (name.lower(), name))
+    guild_index = {name: idx for idx, name in enumerate(guild_names)}
+
+    rows = sorted(
+        (member.lower(), member, guild_index[guild_name])
+        for guild_name in guild_names
+        for member in guilds[guild_name]
+        if member
+    )
+
+    return {
+        'world': world,
+        'guilds': guild_names,
+        'names': [name for _, name, _ in rows],
+        'lower': [lower for lower, _, _ in rows],
+        'guild': [guild for _, _, guild in rows],
+    }
+
+
+def write_search_index(worlds_data, out_dir=SEARCH_INDEX_DIR):
+    """
+    Write one shard per world plus the manifest, removing shards of worlds
+    that are no longer in the data.
+
+    Args:
+        worlds_data: World -> guild -> members mapping
+        out_dir: Directory to write the index into
+
+    Returns:
+        dict: The manifest that was written
+    """
+    os.makedirs(out_dir, exist_ok=True)
+
+    manifest = {'worlds': {}}
+    for world in sorted(worlds_data):
+        guilds = worlds_data[world]
+        shard = build_world_shard(world, guilds)
+        filename = shard_filename(world)
+        write_json(os.path.join(out_dir, filename), shard, compact=True)
+        manifest['worlds'][world] = {
+            'file': filename,
+            'guilds': len(shard['guilds']),
+            'members': len(shard['names']),
+        }
+
+    expected = {entry['file'] for entry in manifest['worlds'].values()} | {MANIFEST_NAME}
+    for filename in os.listdir(out_dir):
+        if filename.endswith('.json') and filename not in expected:
+            os.remove(os.path.join(out_dir, filename))
+
+    write_json(os.path.join(out_dir, MANIFEST_NAME), manifest, compact=True)
+    return manifest
+
+
+def main():
+    """Build the search index from the current guild data file."""
+    manifest = write_search_index(read_json(WORLD_GUILDS_FILE))
+    total_members = sum(entry['members'] for entry in manifest['worlds'].values())
+    print(f"Wrote search index for {len(manifest['worlds'])} worlds "
+          f"({total_members} members) to {SEARCH_INDEX_DIR}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,129 +1,517 @@
 """
 Shared TibiaData API client with retry logic.
 Used by all scripts that interact with the TibiaData API.
+
+Retries are scheduled rather than slept: a request that fails transiently is
+put back on a timer (jittered exponential backoff, or the server's
+Retry-After) and other requests in the same batch keep going while it waits.
+A per-run circuit breaker stops calling an endpoint class after repeated
+failed requests (5xx and 429 responses, network errors and timeouts), and
+run statistics (calls, failures, time spent in backoff) are kept for the
+job summaries.
+
+Responses are gunzipped incrementally and, when a caller declares the fields
+it needs, projected down to those fields while parsing, so large guild and
+character payloads are never held in full as Python objects.
+
+urllib.request, concurrent.futures and email.utils are imported on first use,
+so importing this module (e.g. for a command that never calls the API) stays
+cheap.
 """
 
+import functools
+import heapq
 import json
-import urllib.request
+import random
 import urllib.parse
-import urllib.error
-import gzip
 import time
+import zlib
 
 from config import (
     TIBIADATA_BASE_URL,
     MAX_RETRIES,
     INITIAL_BACKOFF,
     TRANSIENT_ERROR_CODES,
-    REQUEST_TIMEOUT
+    REQUEST_TIMEOUT,
+    MAX_RETRY_AFTER,
+    MAX_CONCURRENT_REQUESTS,
+    CIRCUIT_BREAKER_THRESHOLD
 )
 
+# Attempt outcomes
+_OK = 'ok'
+_TRANSIENT = 'transient'
+_PERMANENT = 'permanent'
+
+# Per-run state: statistics, circuit breakers, prefetched responses and the
+# URLs the server answered with a 404
+_run_stats = {}
+_consecutive_failures = {}
+_open_circuits = set()
+_prefetched = {}
+_not_found = set()
+
+# HTTP status of a resource (e.g. a character) that doesn't exist
+NOT_FOUND_CODE = 404
+
+# Replaces _attempt for every request when set (see set_transport)
+_transport = None
+
+# Bytes read per chunk while decompressing a response
+_READ_CHUNK = 64 * 1024
+
+# Fields callers keep from each response. Projection is by key name at any
+# depth, so each tuple lists every key on the path to the values needed.
+WORLD_GUILD_FIELDS = ('guilds', 'active', 'name')
+GUILD_MEMBER_FIELDS = ('guild', 'name', 'members', 'status')
+CHARACTER_INFO_FIELDS = ('character', 'name', 'world', 'guild')
+CHARACTER_DEATH_FIELDS = ('character', 'deaths', 'time', 'killers', 'name', 'player')
+WORLD_ONLINE_FIELDS = ('world', 'online_players', 'name')
+
+
+def reset_run_stats():
+    """Reset per-run statistics and close all circuit breakers."""
+    _run_stats.clear()
+    _run_stats.update({
+        'requests': 0,
+        'failures': 0,
+        'retries': 0,
+        'latency_seconds': 0.0,
+        'backoff_seconds': 0.0,
+        'waited_seconds': 0.0,
+    })
+    _consecutive_failures.clear()
+    _open_circuits.clear()
+    _prefetched.clear()
+    _not_found.clear()
+
+
+reset_run_stats()
+
+
+def get_run_stats():
+    """Return a copy of this run's API statistics (plus open circuit breakers)."""
+    stats = dict(_run_stats)
+    stats['open_circuits'] = sorted(_open_circuits)
+    return stats
 
-def fetch_with_retry(url, max_retries=MAX_RETRIES):
+
+def format_run_stats():
+    """Format this run's API statistics as a one-line summary."""
+    stats = get_run_stats()
+    line = (f"API: {stats['requests']} requests, {stats['failures']} failed, "
+            f"{stats['retries']} retries, {stats['backoff_seconds']:.1f}s scheduled backoff "
+            f"({stats['waited_seconds']:.1f}s spent waiting)")
+    if stats['open_circuits']:
+        line += f", circuit open for: {', '.join(stats['open_circuits'])}"
+    return line
+
+
+def endpoint_class(url):
     """
-    Fetch URL with exponential backoff retry logic for transient errors.
+    Get the endpoint class of a TibiaData URL (e.g. 'guild', 'character').
 
-    Args:
-        url: The URL to fetch
-        max_retries: Maximum number of retry attempts
+    Circuit breakers are tracked per class, so a failing guild endpoint does
+    not stop character lookups.
+    """
+    path = urllib.parse.urlparse(url).path
+    base_path = urllib.parse.urlparse(TIBIADATA_BASE_URL).path
+    if path.startswith(base_path):
+        path = path[len(base_path):]
+    parts = [p for p in path.split('/') if p]
+    return parts[0] if parts else ''
+
+
+def _parse_retry_after(headers):
+    """Parse a Retry-After header (seconds or HTTP date) into seconds, or None."""
+    value = headers.get('Retry-After') if headers else None
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        from email.utils import parsedate_to_datetime
+        try:
+            seconds = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+    return min(max(seconds, 0.0), MAX_RETRY_AFTER)
+
+
+def _backoff_delay(attempt):
+    """Jittered exponential backoff for the given (zero-based) attempt."""
+    backoff = INITIAL_BACKOFF * (2 ** attempt)
+    return random.uniform(backoff / 2, backoff)  # nosec B311 - not security related
+
+
+def _read_body(response):
+    """Read a response body, gunzipping it chunk by chunk if it is compressed."""
+    if response.info().get('Content-Encoding') != 'gzip':
+        return response.read()
+
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    body = bytearray()
+    while True:
+        chunk = response.read(_READ_CHUNK)
+        if not chunk:
+            break
+        body += decompressor.decompress(chunk)
+    body += decompressor.flush()
+    return body
+
+
+@functools.lru_cache(maxsize=None)
+def _projection_hook(fields):
+    """Build (once per field set) an object hook that keeps only the given keys."""
+    keys = tuple(fields)
+    return lambda obj: {k: obj[k] for k in keys if k in obj}
+
+
+def _decode(body, fields=None):
+    """
+    Parse a JSON body (bytes, bytearray or str), keeping only the given
+    object keys if fields is set.
+
+    json.loads decodes a bytes body to text itself, so the text copy still
+    exists while parsing. Objects are trimmed as they are parsed (innermost
+    first), so members, deaths and other large lists only ever hold the
+    declared fields.
+    """
+    if fields is None:
+        return json.loads(body)
+    return json.loads(body, object_hook=_projection_hook(fields))
+
+
+def _attempt(url, fields=None):
+    """
+    Make a single request.
 
     Returns:
-        tuple: (data, success) where data is the parsed JSON or None
+        tuple: (outcome, data, reason, http_code, retry_after, elapsed)
     """
+    import urllib.error
+    import urllib.request
+
     request = urllib.request.Request(url, headers={
         'Accept-Encoding': 'gzip',
         'User-Agent': 'TibiaOpsConfig/1.0',
     })
+    started = time.monotonic()
 
-    for attempt in range(max_retries):
-        try:
-            with urllib.request.urlopen(request, timeout=REQUEST_TIMEOUT) as response:
-                raw = response.read()
-                if response.info().get('Content-Encoding') == 'gzip':
-                    raw = gzip.decompress(raw)
-                return json.loads(raw), True
+    try:
+        with urllib.request.urlopen(request, timeout=REQUEST_TIMEOUT) as response:
+            data = _decode(_read_body(response), fields)
+            return _OK, data, None, None, None, time.monotonic() - started
+
+    except urllib.error.HTTPError as e:
+        elapsed = time.monotonic() - started
+        if e.code not in TRANSIENT_ERROR_CODES:
+            return _PERMANENT, None, f"HTTP {e.code} error (non-retryable)", e.code, None, elapsed
+        return _TRANSIENT, None, f"HTTP {e.code}", e.code, _parse_retry_after(e.headers), elapsed
+
+    except urllib.error.URLError as e:
+        return _TRANSIENT, None, f"Network error: {e.reason}", None, None, time.monotonic() - started
+
+    except OSError as e:  # e.g. a timeout or reset while reading the body
+        return _TRANSIENT, None, f"Network error: {e}", None, None, time.monotonic() - started
+
+    except Exception as e:
+        return _PERMANENT, None, f"Unexpected error: {e}", None, None, time.monotonic() - started
 
-        except urllib.error.HTTPError as e:
-            if e.code not in TRANSIENT_ERROR_CODES:
-                print(f"  Error: HTTP {e.code} error (non-retryable). Skipping.")
-                return None, False
-            transient_reason = f"HTTP {e.code}"
 
-        except urllib.error.URLError as e:
-            transient_reason = f"Network error: {e.reason}"
+def _is_service_failure(outcome, http_code):
+    """
+    Whether a failed attempt says the service is unwell: a 5xx or 429
+    response, or a network error or timeout (a transient outcome without an
+    HTTP code). A 404 or a body that fails to parse says nothing about it.
+    """
+    if http_code is None:
+        return outcome == _TRANSIENT
+    return http_code >= 500 or http_code == 429
+
+
+def _record_outcome(url, outcome, http_code):
+    """
+    Update the circuit breaker for the URL's endpoint class.
+
+    Service failures (see _is_service_failure) count and only a success
+    resets the count; other failures leave it as it is.
+    """
+    endpoint = endpoint_class(url)
+    if outcome == _OK:
+        _consecutive_failures[endpoint] = 0
+    elif _is_service_failure(outcome, http_code):
+        _consecutive_failures[endpoint] = _consecutive_failures.get(endpoint, 0) + 1
+        if (_consecutive_failures[endpoint] >= CIRCUIT_BREAKER_THRESHOLD
+                and endpoint not in _open_circuits):
+            _open_circuits.add(endpoint)
+            print(f"  Error: {_consecutive_failures[endpoint]} consecutive failed requests (5xx/429 or "
+                  f"network errors) to '{endpoint}' endpoints - circuit open for the rest of this run.")
+
+
+def set_transport(transport):
+    """
+    Route every request attempt through transport(url, fields) instead of
+    the network (None restores it). The transport returns the same tuple as
+    _attempt; http_fixtures uses this to record and replay runs.
+
+    Returns:
+        The previous transport
+    """
+    global _transport
+    previous, _transport = _transport, transport
+    return previous
+
 
-        except Exception as e:
-            print(f"  Error: Unexpected error: {e}")
-            return None, False
+def _submit(pool, url, fields):
+    """Run an attempt on the pool, or inline (as a completed future) without one."""
+    attempt = _transport or _attempt
+    if pool is not None:
+        return pool.submit(attempt, url, fields)
+    from concurrent.futures import Future
+    future = Future()
+    future.set_result(attempt(url, fields))
+    return future
 
-        if attempt < max_retries - 1:
-            backoff = INITIAL_BACKOFF * (2 ** attempt)
-            print(f"  Warning: {transient_reason} (attempt "
-                  f"{attempt + 1}/{max_retries}). "
-                  f"Retrying in {backoff}s...")
-            time.sleep(backoff)
-        else:
-            print(f"  Error: {transient_reason} persisted after {max_retries} attempts. Skipping.")
 
-    return None, False
+def _projection(fields):
+    """Normalize a declared field list into a hashable set (None keeps everything)."""
+    return frozenset(fields) if fields is not None else None
 
 
-def fetch_character(character_name):
+def fetch_many(urls, max_retries=MAX_RETRIES, workers=MAX_CONCURRENT_REQUESTS, fields=None):
+    """
+    Fetch several URLs, scheduling retries instead of sleeping on them.
+
+    Up to `workers` requests run at once. A request that fails transiently is
+    rescheduled after a jittered backoff (or the server's Retry-After) and the
+    remaining requests carry on meanwhile; the loop only waits when nothing
+    else is ready to run.
+
+    Args:
+        urls: The URLs to fetch (duplicates are fetched once)
+        max_retries: Maximum number of attempts per URL
+        workers: Maximum number of concurrent requests
+        fields: Object keys to keep from each response (None keeps everything)
+
+    Returns:
+        dict: url -> (data, success), as returned by fetch_with_retry
+    """
+    from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+    fields = _projection(fields)
+    results = {}
+    schedule = []  # heap of (ready_at, sequence, url, attempt)
+    for sequence, url in enumerate(dict.fromkeys(urls)):
+        heapq.heappush(schedule, (0.0, sequence, url, 0))
+    sequence = len(schedule)
+    in_flight = {}
+
+    pool = ThreadPoolExecutor(max_workers=workers) if workers > 1 and len(schedule) > 1 else None
+    try:
+        while schedule or in_flight:
+            now = time.monotonic()
+            while schedule and schedule[0][0] <= now and len(in_flight) < max(workers, 1):
+                _, _, url, attempt = heapq.heappop(schedule)
+                if endpoint_class(url) in _open_circuits:
+                    print(f"  Error: circuit open for '{endpoint_class(url)}' endpoints. Skipping.")
+                    _run_stats['failures'] += 1
+                    results[url] = (None, False)
+                    continue
+                in_flight[_submit(pool, url, fields)] = (url, attempt)
+
+            if not in_flight:
+                if schedule:
+                    delay = max(0.0, schedule[0][0] - time.monotonic())
+                    _run_stats['waited_seconds'] += delay
+                    time.sleep(delay)
+                continue
+
+            if schedule and len(in_flight) < max(workers, 1):
+                timeout = max(0.0, schedule[0][0] - time.monotonic())
+            else:
+                timeout = None
+            done, _ = wait(list(in_flight), timeout=timeout, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                url, attempt = in_flight.pop(future)
+                outcome, data, reason, http_code, retry_after, elapsed = future.result()
+                _run_stats['requests'] += 1
+                _run_stats['latency_seconds'] += elapsed
+                _record_outcome(url, outcome, http_code)
+                if http_code == NOT_FOUND_CODE:
+                    _not_found.add(url)
+                else:
+                    _not_found.discard(url)
+
+                if outcome == _OK:
+                    results[url] = (data, True)
+                    continue
+
+                if outcome == _PERMANENT:
+                    print(f"  Error: {reason}. Skipping.")
+                elif attempt < max_retries - 1:
+                    delay = retry_after if retry_after is not None else _backoff_delay(attempt)
+                    print(f"  Warning: {reason} (attempt "
+                          f"{attempt + 1}/{max_retries}). "
+                          f"Retrying in {delay:.1f}s...")
+                    _run_stats['retries'] += 1
+                    _run_stats['backoff_seconds'] += delay
+                    heapq.heappush(schedule, (time.monotonic() + delay, sequence, url, attempt + 1))
+                    sequence += 1
+                    continue
+                else:
+                    print(f"  Error: {reason} persisted after {max_retries} attempts. Skipping.")
+
+                _run_stats['failures'] += 1
+                results[url] = (None, False)
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+    return results
+
+
+def prefetch(urls, fields=None):
+    """
+    Fetch a batch of URLs concurrently ahead of the calls that will use them.
+
+    The next fetch_with_retry call for each URL (with the same fields)
+    returns the prefetched result instead of making a request.
+    """
+    projection = _projection(fields)
+    for url, result in fetch_many(urls, fields=fields).items():
+        _prefetched[(url, projection)] = result
+
+
+def fetch_with_retry(url, max_retries=MAX_RETRIES, fields=None):
+    """
+    Fetch URL with exponential backoff retry logic for transient errors.
+
+    With nothing else to run, a retry is waited for inline. Work-queue task
+    handlers pass max_retries=QUEUED_FETCH_ATTEMPTS instead, so a failure
+    returns at once and the queue reschedules the task while other tasks
+    run (and the two retry budgets don't multiply).
+
+    Args:
+        url: The URL to fetch
+        max_retries: Maximum number of attempts
+        fields: Object keys to keep from the response (None keeps everything)
+
+    Returns:
+        tuple: (data, success) where data is the parsed JSON or None
+    """
+    key = (url, _projection(fields))
+    if key in _prefetched:
+        return _prefetched.pop(key)
+    return fetch_many([url], max_retries=max_retries, workers=1, fields=fields)[url]
+
+
+def character_url(character_name):
+    """Build the TibiaData URL for a character."""
+    return f"{TIBIADATA_BASE_URL}/character/{urllib.parse.quote(character_name)}"
+
+
+def guild_url(guild_name):
+    """Build the TibiaData URL for a guild."""
+    return f"{TIBIADATA_BASE_URL}/guild/{urllib.parse.quote(guild_name)}"
+
+
+def world_url(world):
+    """Build the TibiaData URL for a world (includes its online players)."""
+    return f"{TIBIADATA_BASE_URL}/world/{urllib.parse.quote(world)}"
+
+
+def prefetch_characters(character_names, fields=None):
+    """Concurrently prefetch character data for the following fetch_character calls."""
+    prefetch([character_url(name) for name in character_names], fields=fields)
+
+
+def prefetch_guilds(guild_names, fields=None):
+    """Concurrently prefetch guild data for the following fetch_guild calls."""
+    prefetch([guild_url(name) for name in guild_names], fields=fields)
+
+
+def prefetch_worlds(worlds):
+    """Concurrently prefetch world data for the following get_online_players calls."""
+    prefetch([world_url(world) for world in worlds], fields=WORLD_ONLINE_FIELDS)
+
+
+def fetch_character(character_name, fields=None, max_retries=MAX_RETRIES):
     """
     Fetch character data from TibiaData API.
 
     Args:
         character_name: The character name to look up
+        fields: Object keys to keep from the response (None keeps everything)
+        max_retries: Maximum number of attempts (see fetch_with_retry)
 
     Returns:
         dict or None: Character data dict, or None if fetch failed
     """
-    encoded_name = urllib.parse.quote(character_name)
-    url = f"{TIBIADATA_BASE_URL}/character/{encoded_name}"
-    data, success = fetch_with_retry(url)
+    data, success = fetch_with_retry(character_url(character_name), max_retries, fields=fields)
 
     if success and data:
         return data.get('character', {})
     return None
 
 
-def fetch_guild(guild_name):
+def fetch_guild(guild_name, fields=None, max_retries=MAX_RETRIES):
     """
     Fetch guild data from TibiaData API.
 
     Args:
         guild_name: The guild name to look up
+        fields: Object keys to keep from the response (None keeps everything)
+        max_retries: Maximum number of attempts (see fetch_with_retry)
 
     Returns:
         dict or None: Guild data dict, or None if fetch failed
     """
-    encoded_name = urllib.parse.quote(guild_name)
-    url = f"{TIBIADATA_BASE_URL}/guild/{encoded_name}"
-    data, success = fetch_with_retry(url)
+    data, success = fetch_with_retry(guild_url(guild_name), max_retries, fields=fields)
 
     if success and data:
         return data.get('guild', {})
     return None
 
 
-def fetch_world_guilds(world):
+def fetch_world_guilds(world, max_retries=MAX_RETRIES):
     """
     Fetch list of active guilds for a world.
 
     Args:
         world: The world name to look up
+        max_retries: Maximum number of attempts (see fetch_with_retry)
 
     Returns:
         list or None: List of guild dicts, or None if fetch failed
     """
     url = f"{TIBIADATA_BASE_URL}/guilds/{world}"
-    data, success = fetch_with_retry(url)
+    data, success = fetch_with_retry(url, max_retries, fields=WORLD_GUILD_FIELDS)
 
     if success and data:
         return data.get('guilds', {}).get('active', [])
     return None
 
 
+def get_online_players(world):
+    """
+    Get the names of every player online on a world (one request per world).
+
+    Args:
+        world: The world name to check
+
+    Returns:
+        list or None: Online player names, or None if fetch failed
+    """
+    data, success = fetch_with_retry(world_url(world), fields=WORLD_ONLINE_FIELDS)
+    if not success or not data:
+        return None
+    # TibiaData sends null rather than [] when nobody is online
+    players = data.get('world', {}).get('online_players') or []
+    return [player['name'] for player in players if player.get('name')]
+
+
 def get_online_guild_members(guild_name):
     """
     Get list of online member names from a guild.
@@ -134,7 +522,7 @@ def get_online_guild_members(guild_name):
     Returns:
         list: List of online member names (empty if none or fetch failed)
     """
-    guild_data = fetch_guild(guild_name)
+    guild_data = fetch_guild(guild_name, fields=GUILD_MEMBER_FIELDS)
     if guild_data is None:
         return []
 
@@ -152,7 +540,7 @@ def get_character_deaths(character_name):
     Returns:
         list: List of death records (empty if none or fetch failed)
     """
-    char_data = fetch_character(character_name)
+    char_data = fetch_character(character_name, fields=CHARACTER_DEATH_FIELDS)
     if char_data is None:
         return []
     return char_data.get('deaths', [])
@@ -162,18 +550,28 @@ def get_character_info(character_name):
     """
     Get basic character info (name, world, guild).
 
+    A failed request (network error, 5xx, open circuit, retries used up)
+    says nothing about the character, so it is kept apart from a definite
+    answer that the character doesn't exist.
+
     Args:
         character_name: The character name to look up
 
     Returns:
-        tuple: (correct_name, world, guild_name) or (None, None, None) if failed
+        tuple or None: (correct_name, world, guild_name), (None, None, None)
+        if the character doesn't exist (a 404, or a response without a
+        name), or None if the lookup failed
     """
-    char_data = fetch_character(character_name)
+    char_data = fetch_character(character_name, fields=CHARACTER_INFO_FIELDS)
     if char_data is None:
-        return None, None, None
+        if character_url(character_name) in _not_found:
+            return None, None, None
+        return None
 
     char_info = char_data.get('character', {})
     correct_name = char_info.get('name')
+    if not correct_name:
+        return None, None, None
     world = char_info.get('world', '')
     guild = char_info.get('guild', {})
     guild_name = guild.get('name', '') if guild else ''
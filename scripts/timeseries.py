@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Compact time-series store for per-run app metrics.
+
+Each scheduled job records one sample per run (trolls count, guilds and
+members per world, API calls/latency/failures) into its own store. A store
+keeps one columnar file per resolution in .cache/timeseries/ (carried
+between runs in the Actions cache):
+
+    <store>.raw.json    one point per run
+    <store>.hour.json   hourly rollup
+    <store>.day.json    daily rollup
+
+The published resolutions (TIMESERIES_PUBLISHED) are also written to
+docs/data/timeseries/ for the dashboard, without their still-open bucket.
+A published file therefore only changes when a bucket closes - once an hour
+or once a day - and is only rewritten then, so runs in between leave
+nothing to commit. When a cached file is missing (e.g. the cache was
+evicted), the store starts again from the published one.
+
+File layout (columns are parallel to "t"; null where a series has no value):
+    {
+        "resolution": "hour",
+        "step": 3600,
+        "t": [<bucket start, epoch seconds>, ...],
+        "series": {"<name>": [<value>, ...], ...}
+    }
+
+Rollups are updated incrementally as samples arrive: counters (COUNTER_SERIES)
+are summed within a bucket, every other series keeps the bucket's last value.
+Points older than a resolution's retention window are dropped on write.
+"""
+
+import bisect
+import json
+import os
+import sys
+import time
+
+# Add scripts directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import (  # noqa: E402
+    TIMESERIES_DIR,
+    TIMESERIES_PUBLISHED,
+    TIMESERIES_RESOLUTIONS,
+    TIMESERIES_STATE_DIR
+)
+from config_store import compact_json, file_digest, text_digest, write_json, write_text  # noqa: E402
+
+# Series summed within a rollup bucket (the rest are gauges)
+COUNTER_SERIES = frozenset({
+    'api.requests',
+    'api.failures',
+    'api.retries',
+    'api.latency_ms',
+    'trolls.added',
+})
+
+
+def empty_columns(resolution, step):
+    """An empty file for a resolution."""
+    return {'resolution': resolution, 'step': step, 't': [], 'series': {}}
+
+
+def add_sample(columns, timestamp, sample):
+    """
+    Add one sample to a columnar file, merging it into the last bucket when
+    the step is non-zero and the sample falls into it.
+
+    Args:
+        columns: File contents (see module docstring), modified in place
+        timestamp: Sample time, epoch seconds
+        sample: Series name -> numeric value
+    """
+    step = columns['step']
+    bucket = int(timestamp) - int(timestamp) % step if step else int(timestamp)
+    times = columns['t']
+    series = columns['series']
+
+    if step and times and times[-1] == bucket:
+        idx = len(times) - 1
+    else:
+        times.append(bucket)
+        for values in series.values():
+            values.append(None)
+        idx = len(times) - 1
+
+    for name, value in sample.items():
+        if value is None:
+            continue
+        values = series.setdefault(name, [None] * len(times))
+        if name in COUNTER_SERIES and values[idx] is not None:
+            values[idx] += value
+        else:
+            values[idx] = value
+
+
+def trim(columns, cutoff):
+    """Drop points before cutoff, and series with no values left."""
+    start = bisect.bisect_left(columns['t'], cutoff)
+    if start:
+        columns['t'] = columns['t'][start:]
+        for name in list(columns['series']):
+            columns['series'][name] = columns['series'][name][start:]
+    for name, values in list(columns['series'].items()):
+        if all(value is None for value in values):
+            del columns['series'][name]
+
+
+def closed_buckets(columns, timestamp):
+    """
+    A copy of a rollup without its last bucket if that bucket is still open
+    at timestamp (the raw resolution has no open bucket).
+    """
+    times = columns['t']
+    end = len(times) - 1 if columns['step'] and times and times[-1] + columns['step'] > timestamp else len(times)
+    closed = dict(columns, t=times[:end], series={name: values[:end] for name, values in columns['series'].items()})
+    trim(closed, float('-inf'))
+    return closed
+
+
+class TimeSeriesStore:
+    """One job's metric history, one file per resolution."""
+
+    def __init__(self, name, directory=TIMESERIES_STATE_DIR, resolutions=None,
+                 publish_dir=TIMESERIES_DIR, published=TIMESERIES_PUBLISHED):
+        self.name = name
+        self.directory = directory
+        self.resolutions = resolutions or TIMESERIES_RESOLUTIONS
+        self.publish_dir = publish_dir
+        self.published = published
+
+    def path(self, resolution, directory=None):
+        """File holding a resolution of this store (in the state directory by default)."""
+        return os.path.join(directory or self.directory, f"{self.name}.{resolution}.json")
+
+    def load(self, resolution):
+        """
+        Load a resolution from the state directory, falling back to its
+        published file (an empty file if neither exists yet).
+        """
+        step, _ = self.resolutions[resolution]
+        paths = [self.path(resolution)]
+        if resolution in self.published:
+            paths.append(self.path(resolution, self.publish_dir))
+        for path in paths:
+            try:
+                with open(path, 'r') as f:
+                    return json.load(f)
+            except (FileNotFoundError, ValueError):
+                continue
+        return empty_columns(resolution, step)
+
+    def publish(self, resolution, columns, timestamp):
+        """
+        Write a resolution's closed buckets to the publish directory unless
+        the file already holds them.
+
+        Returns:
+            bool: True if the published file was written
+        """
+        text = compact_json(closed_buckets(columns, timestamp))
+        path = self.path(resolution, self.publish_dir)
+        if file_digest(path) == text_digest(text):
+            return False
+        os.makedirs(self.publish_dir, exist_ok=True)
+        write_text(path, text)
+        return True
+
+    def record(self, sample, timestamp=None):
+        """
+        Record one sample into every resolution, apply retention and publish
+        the resolutions whose closed buckets changed.
+
+        Args:
+            sample: Series name -> numeric value
+            timestamp: Sample time, epoch seconds (defaults to now)
+
+        Returns:
+            list: The resolutions that were published
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        os.makedirs(self.directory, exist_ok=True)
+        published = []
+        for resolution, (_, retention) in self.resolutions.items():
+            columns = self.load(resolution)
+            add_sample(columns, timestamp, sample)
+            trim(columns, timestamp - retention)
+            write_json(self.path(resolution), columns, compact=True)
+            if resolution in self.published and self.publish(resolution, columns, timestamp):
+                published.append(resolution)
+        return published
+
+
+def api_sample(stats):
+    """Series for a run's API statistics (see tibia_api.get_run_stats)."""
+    return {
+        'api.requests': stats['requests'],
+        'api.failures': stats['failures'],
+        'api.retries': stats['retries'],
+        'api.latency_ms': round(stats['latency_seconds'] * 1000),
+    }
+
+
+def record_run(name, sample, timestamp=None):
+    """
+    Record a job's per-run sample. Metrics are best-effort: a failure is
+    reported but never fails the job.
+
+    Returns:
+        bool: True if the sample was written
+    """
+    try:
+        published = TimeSeriesStore(name).record(sample, timestamp)
+        print(f"Recorded {len(sample)} metric(s) to the '{name}' time series"
+              + (f" (published {', '.join(published)})" if published else ""))
+        return True
+    except Exception as e:
+        print(f"Warning: could not record metrics: {e}")
+        return False
@@ -0,0 +1,19 @@
+"""
+Small helpers shared by the job scripts.
+"""
+
+from datetime import datetime
+
+
+def parse_time(value):
+    """
+    Parse an ISO-8601 UTC timestamp ('2025-01-15T10:30:00Z'), as used by
+    TibiaData and the GitHub API, into epoch seconds.
+
+    Returns:
+        float: Epoch seconds, or None if the value is missing or invalid
+    """
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+    except (AttributeError, ValueError):
+        return None
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Validate the JSON files in .configs/ against their schemas, in one pass.
+
+Every file is read and parsed exactly once; files are checked concurrently
+on a thread pool. Schemas by file:
+
+    trolls, bastex, block, alerts   a list of character names
+    world_guilds_data               world -> guild -> list of member names
+    anything else                   any valid JSON
+
+A character name is 2 to NAME_MAX_LENGTH letters, spaces, apostrophes and
+hyphens, starting with a letter, with no leading, trailing or doubled
+spaces.
+
+Errors (invalid JSON, a wrong shape, a malformed name, a missing required
+file) fail the validation. Warnings (a name listed twice, case-insensitively,
+a member in two guilds, a world that isn't configured) are reported, and
+only fail it with --strict.
+
+The JSON report (--report) has one entry per file:
+
+    {
+        "ok": true,
+        "missing": [],
+        "files": {
+            "trolls.json": {"schema": "name_list", "bytes": 1452, "entries": 74,
+                            "errors": [], "warnings": [...],
+                            "duplicates": [["Sleeping Booty", "Sleeping Booty"], ...]},
+            ...
+        }
+    }
+
+Usage:
+    python scripts/validate_configs.py [--report PATH] [--strict]
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Add scripts directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import CONFIGS_DIR, DEPLOY_REQUIRED_KEYS, WORLDS  # noqa: E402
+
+NAME_MAX_LENGTH = 29
+NAME_PATTERN = re.compile(r"[^\W\d_](?:[^\W\d_]|[ '-](?! ))*")
+
+# File name -> schema; other files only have to be valid JSON
+SCHEMAS = {
+    'trolls.json': 'name_list',
+    'bastex.json': 'name_list',
+    'block.json': 'name_list',
+    'alerts.json': 'name_list',
+    'world_guilds_data.json': 'guild_snapshot',
+}
+
+# Issues listed per file before the rest are only counted
+MAX_ISSUES = 20
+
+
+def name_problem(name):
+    """Why a character name is malformed, or None if it is well-formed."""
+    if not isinstance(name, str):
+        return f"{name!r} is not a string"
+    if not 2 <= len(name) <= NAME_MAX_LENGTH:
+        return f"{name!r} is not 2-{NAME_MAX_LENGTH} characters long"
+    if name != name.strip() or not NAME_PATTERN.fullmatch(name):
+        return f"{name!r} is not a well-formed character name"
+    return None
+
+
+def duplicate_groups(names):
+    """Groups of names that are equal case-insensitively, in first-seen order."""
+    groups = {}
+    for name in names:
+        groups.setdefault(name.casefold(), []).append(name)
+    return [group for group in groups.values() if len(group) > 1]
+
+
+class FileCheck:
+    """Issues found in one file."""
+
+    def __init__(self, name, schema, size):
+        self.name = name
+        self.schema = schema
+        self.size = size
+        self.entries = None
+        self.errors = []
+        self.warnings = []
+        self.duplicates = []
+
+    def _add(self, issues, message):
+        if len(issues) < MAX_ISSUES:
+            issues.append(message)
+        elif len(issues) == MAX_ISSUES:
+            issues.append("... (more not listed)")
+
+    def error(self, message):
+        self._add(self.errors, message)
+
+    def warn(self, message):
+        self._add(self.warnings, message)
+
+    def to_json(self):
+        return {
+            'schema': self.schema,
+            'bytes': self.size,
+            'entries': self.entries,
+            'errors': self.errors,
+            'warnings': self.warnings,
+            'duplicates': self.duplicates,
+        }
+
+
+def check_name_list(check, data):
+    if not isinstance(data, list):
+        check.error(f"expected a list of names, got {type(data).__name__}")
+        return
+    check.entries = len(data)
+    for index, name in enumerate(data):
+        problem = name_problem(name)
+        if problem:
+            check.error(f"[{index}] {problem}")
+    check.duplicates = duplicate_groups(name for name in data if isinstance(name, str))
+    for group in check.duplicates:
+        check.warn(f"listed {len(group)} times: {', '.join(repr(name) for name in group)}")
+
+
+def check_guild_snapshot(check, data):
+    if not isinstance(data, dict):
+        check.error(f"expected world -> guild -> members, got {type(data).__name__}")
+        return
+    check.entries = 0
+    configured = set(WORLDS)
+    for world, guilds in data.items():
+        if world not in configured:
+            check.warn(f"world {world!r} is not in config.WORLDS")
+        if not isinstance(guilds, dict):
+            check.error(f"{world}: expected guild -> members, got {type(guilds).__name__}")
+            continue
+        guild_of = {}
+        for guild, members in guilds.items():
+            if not isinstance(members, list):
+                check.error(f"{world}/{guild}: expected a list of members, got {type(members).__name__}")
+                continue
+            check.entries += len(members)
+            for member in members:
+                problem = name_problem(member)
+                if problem:
+                    check.error(f"{world}/{guild}: {problem}")
+                    continue
+                key = member.casefold()
+                if key in guild_of:
+                    check.duplicates.append([f"{world}/{guild_of[key]}/{member}", f"{world}/{guild}/{member}"])
+                    check.warn(f"{world}: {member!r} is listed in both {guild_of[key]!r} and {guild!r}"
+                               if guild_of[key] != guild else f"{world}/{guild}: {member!r} is listed twice")
+                else:
+                    guild_of[key] = guild
+
+
+CHECKS = {
+    'name_list': check_name_list,
+    'guild_snapshot': check_guild_snapshot,
+}
+
+
+def check_file(path):
+    """
+    Parse one file and check it against its schema.
+
+    Returns:
+        tuple: (FileCheck, parsed data or None if it isn't valid JSON)
+    """
+    name = os.path.basename(path)
+    schema = SCHEMAS.get(name, 'json')
+    with open(path, 'rb') as f:
+        raw = f.read()
+    check = FileCheck(name, schema, len(raw))
+    try:
+        data = json.loads(raw)
+    except ValueError as e:
+        check.error(f"invalid JSON: {e}")
+        return check, None
+    if schema in CHECKS:
+        CHECKS[schema](check, data)
+    elif isinstance(data, (list, dict)):
+        check.entries = len(data)
+    return check, data
+
+
+def validate(configs_dir=CONFIGS_DIR, required=DEPLOY_REQUIRED_KEYS, workers=8):
+    """
+    Validate every JSON file in a config directory.
+
+    Args:
+        configs_dir: Directory with the *.json files
+        required: Names (without .json) of files that must be present
+        workers: Threads checking files concurrently
+
+    Returns:
+        tuple: (report dict, name without .json -> parsed data of the valid files)
+    """
+    paths = sorted(os.path.join(configs_dir, name) for name in os.listdir(configs_dir)
+                   if name.endswith('.json'))
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(paths)))) as pool:
+        results = list(pool.map(check_file, paths))
+
+    files = {check.name: check.to_json() for check, _ in results}
+    missing = [f"{name}.json" for name in required if f"{name}.json" not in files]
+    data = {check.name[:-len('.json')]: parsed for check, parsed in results if parsed is not None}
+    report = {
+        'ok': not missing and not any(entry['errors'] for entry in files.values()),
+        'missing': missing,
+        'files': files,
+    }
+    return report, data
+
+
+def print_report(report):
+    """Print one PASS/FAIL line per file, then its issues."""
+    for name, entry in report['files'].items():
+        status = 'FAIL' if entry['errors'] else 'PASS'
+        entries = '' if entry['entries'] is None else f", {entry['entries']} entries"
+        print(f"  {status}: {name} ({entry['schema']}, {entry['bytes']} bytes{entries})")
+        for message in entry['errors']:
+            print(f"    error: {message}")
+        for message in entry['warnings']:
+            print(f"    warning: {message}")
+    for name in report['missing']:
+        print(f"  FAIL: {name} - required file is missing")
+
+
+def write_report(path, report):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+        f.write('\n')
+
+
+def main(argv=None):
+    """Validate .configs/ and report the result."""
+    parser = argparse.ArgumentParser(description="Validate the .configs JSON files against their schemas")
+    parser.add_argument('--dir', default=CONFIGS_DIR, help=f"Config directory (default {CONFIGS_DIR})")
+    parser.add_argument('--report', help="Write the JSON report to this file")
+    parser.add_argument('--strict', action='store_true', help="Fail on warnings (e.g. duplicate names) too")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    report, _ = validate(args.dir)
+    seconds = time.perf_counter() - started
+    print_report(report)
+    if args.report:
+        write_report(args.report, report)
+
+    warnings = sum(len(entry['warnings']) for entry in report['files'].values())
+    ok = report['ok'] and not (args.strict and warnings)
+    print(f"{'Config validation passed' if ok else 'Config validation FAILED'}: "
+          f"{len(report['files'])} files, {warnings} warning(s) in {seconds * 1000:.0f} ms")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
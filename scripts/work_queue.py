@@ -0,0 +1,225 @@
+"""
+Persistent priority queue of pending TibiaData fetch tasks.
+
+Both scheduled jobs enqueue their work (guild refreshes, character lookups,
+death checks) here and drain it in priority order, so a slow or failing task
+no longer holds up everything queued behind it. Tasks that fail are requeued
+with exponential backoff instead of sleeping inline, and anything still
+pending when a run ends is picked up again by the next run.
+
+The queue is a single SQLite table, so it survives between runs as one file.
+"""
+
+import json
+import os
+import sqlite3
+import time
+from collections import namedtuple
+
+from config import INITIAL_BACKOFF, MAX_RETRIES
+
+Task = namedtuple('Task', ['id', 'kind', 'key', 'priority', 'not_before', 'retries', 'payload'])
+
+
+class RetryableError(Exception):
+    """Raised by a handler for a failure worth retrying (like returning False)."""
+
+
+# Exceptions from a handler that drain() retries; anything else is a bug and
+# propagates instead of being retried until the task is dropped
+RETRYABLE_ERRORS = (OSError, RetryableError)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id         INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind       TEXT    NOT NULL,
+    key        TEXT    NOT NULL,
+    priority   INTEGER NOT NULL,
+    not_before REAL    NOT NULL,
+    retries    INTEGER NOT NULL DEFAULT 0,
+    payload    TEXT,
+    UNIQUE (kind, key)
+);
+CREATE INDEX IF NOT EXISTS tasks_ready ON tasks (priority, not_before, id);
+"""
+
+
+class WorkQueue:
+    """
+    SQLite-backed priority queue keyed by (kind, key).
+
+    Lower priority values are drained first; within a priority, tasks run in
+    the order they became due. Enqueueing a task that is already pending keeps
+    its retry count and not-before time, so requeued work is not reset just
+    because the next run asks for it again.
+    """
+
+    def __init__(self, path, max_retries=MAX_RETRIES, initial_backoff=INITIAL_BACKOFF):
+        if path != ':memory:':
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.max_retries = max_retries
+        self.initial_backoff = initial_backoff
+        self._conn = sqlite3.connect(path)
+        self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        """Close the underlying database connection."""
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def enqueue(self, kind, key, priority, payload=None, not_before=None):
+        """
+        Add a task, or raise the priority of one that is already pending.
+
+        Args:
+            kind: Task type, used to pick the handler when draining
+            key: Identifies the task within its kind (e.g. a world or character name)
+            priority: Lower values run first
+            payload: Optional JSON-serializable data passed to the handler
+            not_before: Earliest time (epoch seconds) the task may run; defaults to now
+        """
+        if not_before is None:
+            not_before = time.time()
+        with self._conn:
+            self._conn.execute(
+                "INSERT INTO tasks (kind, key, priority, not_before, payload) "
+                "VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (kind, key) DO UPDATE SET "
+                "priority = MIN(priority, excluded.priority), "
+                "payload = COALESCE(excluded.payload, payload)",
+                (kind, key, priority, not_before,
+                 json.dumps(payload) if payload is not None else None)
+            )
+
+    def next_ready(self, now=None):
+        """
+        Get the most urgent task that is due, without removing it.
+
+        Returns:
+            Task or None: The next runnable task, or None if nothing is due
+        """
+        if now is None:
+            now = time.time()
+        row = self._conn.execute(
+            "SELECT id, kind, key, priority, not_before, retries, payload FROM tasks "
+            "WHERE not_before <= ? ORDER BY priority, not_before, id LIMIT 1",
+            (now,)
+        ).fetchone()
+        if row is None:
+            return None
+        payload = json.loads(row[6]) if row[6] is not None else None
+        return Task(*row[:6], payload)
+
+    def next_due(self):
+        """Return the earliest not-before time of any pending task, or None if empty."""
+        row = self._conn.execute("SELECT MIN(not_before) FROM tasks").fetchone()
+        return row[0]
+
+    def complete(self, task):
+        """Remove a finished (or abandoned) task from the queue."""
+        with self._conn:
+            self._conn.execute("DELETE FROM tasks WHERE id = ?", (task.id,))
+
+    def retry(self, task, now=None):
+        """
+        Requeue a failed task with exponential backoff.
+
+        Returns:
+            bool: True if the task was requeued, False if it ran out of retries
+                  and was dropped
+        """
+        if task.retries + 1 >= self.max_retries:
+            self.complete(task)
+            return False
+        if now is None:
+            now = time.time()
+        backoff = self.initial_backoff * (2 ** task.retries)
+        with self._conn:
+            self._conn.execute(
+                "UPDATE tasks SET retries = retries + 1, not_before = ? WHERE id = ?",
+                (now + backoff, task.id)
+            )
+        return True
+
+    def pending(self, kind=None):
+        """Count pending tasks, optionally of a single kind."""
+        if kind is None:
+            row = self._conn.execute("SELECT COUNT(*) FROM tasks").fetchone()
+        else:
+            row = self._conn.execute("SELECT COUNT(*) FROM tasks WHERE kind = ?", (kind,)).fetchone()
+        return row[0]
+
+
+def drain(queue, handlers, deadline=None, clock=time.time, sleep=time.sleep):
+    """
+    Run queued tasks in priority order until the queue is empty or time runs out.
+
+    Each handler takes a Task and returns True on success or False (or
+    raises one of RETRYABLE_ERRORS) on a failure worth retrying. Failed
+    tasks are requeued with backoff and the loop moves straight on to the
+    next ready task; it only waits when every remaining task is deferred.
+    Other exceptions propagate, leaving the task queued. No task is started
+    once the deadline has passed, and tasks not due before it are left in
+    the queue for the next run.
+
+    Args:
+        queue: The WorkQueue to drain
+        handlers: Mapping of task kind -> handler function
+        deadline: Epoch seconds after which no task is started or waited for
+        clock: Time source (injectable for tests)
+        sleep: Sleep function (injectable for tests)
+
+    Returns:
+        dict: Counts of 'completed', 'retried' and 'dropped' tasks
+    """
+    stats = {'completed': 0, 'retried': 0, 'dropped': 0}
+
+    while True:
+        now = clock()
+        if deadline is not None and now > deadline:
+            if queue.pending():
+                print(f"\nRun budget spent - {queue.pending()} task(s) carried over to the next run")
+            break
+        task = queue.next_ready(now)
+        if task is None:
+            due = queue.next_due()
+            if due is None:
+                break
+            if deadline is not None and due > deadline:
+                print(f"\n{queue.pending()} deferred task(s) carried over to the next run")
+                break
+            sleep(max(0, due - clock()))
+            continue
+
+        handler = handlers.get(task.kind)
+        if handler is None:
+            print(f"  Warning: no handler for task kind '{task.kind}' - dropping {task.key}")
+            queue.complete(task)
+            stats['dropped'] += 1
+            continue
+
+        try:
+            ok = handler(task)
+        except RETRYABLE_ERRORS as e:
+            print(f"  Error: task {task.kind} '{task.key}' raised: {e}")
+            ok = False
+
+        if ok:
+            queue.complete(task)
+            stats['completed'] += 1
+        elif queue.retry(task, now=clock()):
+            stats['retried'] += 1
+        else:
+            print(f"  Error: task {task.kind} '{task.key}' failed after "
+                  f"{task.retries + 1} attempts. Dropping.")
+            stats['dropped'] += 1
+
+    return stats
@@ -0,0 +1,114 @@
+"""
+Tests for scripts/check_alerts.py - alerts/block list evaluation.
+"""
+
+import sys
+import os
+import json
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+import check_alerts  # noqa: E402
+from check_alerts import (  # noqa: E402
+    build_watch_index,
+    build_guild_lookup,
+    evaluate,
+    diff_online
+)
+
+WORLDS_DATA = {
+    'Firmera': {'Bastex': ['Alpha', 'Gamma']},
+    'Antica': {'Red Rose': ['Beta']},
+}
+
+
+def entry(name, world, guild=None, lists=('alerts',)):
+    return {'name': name, 'lists': list(lists), 'world': world, 'guild': guild}
+
+
+class TestBuildWatchIndex:
+    """Test folding the watch lists into one index."""
+
+    def test_folds_names_and_merges_lists(self):
+        watch = build_watch_index({'alerts': ['Alpha', 'beta'], 'block': ['ALPHA', '']})
+        assert watch == {'alpha': ['alerts', 'block'], 'beta': ['alerts']}
+
+
+class TestEvaluate:
+    """Test matching online players against the watch index."""
+
+    def test_matches_case_insensitively_with_snapshot_guild(self):
+        watch = build_watch_index({'alerts': ['alpha', 'Beta'], 'block': ['Delta']})
+        guilds = build_guild_lookup(watch, WORLDS_DATA)
+        online = evaluate(watch, {'Firmera': ['Alpha', 'Someone'], 'Antica': ['Delta']}, guilds)
+        assert online == {
+            'alpha': entry('Alpha', 'Firmera', 'Bastex'),
+            'delta': entry('Delta', 'Antica', lists=['block']),
+        }
+
+    def test_guild_on_another_world_is_ignored(self):
+        watch = build_watch_index({'alerts': ['Beta']})
+        guilds = build_guild_lookup(watch, WORLDS_DATA)
+        online = evaluate(watch, {'Firmera': ['Beta']}, guilds)
+        assert online['beta']['guild'] is None
+
+    def test_guild_lookup_only_keeps_watched_names(self):
+        watch = build_watch_index({'alerts': ['gamma']})
+        assert build_guild_lookup(watch, WORLDS_DATA) == {'gamma': ('Firmera', 'Bastex')}
+
+
+class TestDiffOnline:
+    """Test reporting what changed since the previous run."""
+
+    def test_online_offline_and_moved(self):
+        previous = {'alpha': entry('Alpha', 'Firmera'), 'beta': entry('Beta', 'Antica')}
+        current = {'alpha': entry('Alpha', 'Antica'), 'gamma': entry('Gamma', 'Firmera')}
+        changes = diff_online(previous, current)
+        assert [e['name'] for e in changes['online']] == ['Gamma']
+        assert [e['name'] for e in changes['offline']] == ['Beta']
+        assert changes['moved'] == [dict(entry('Alpha', 'Antica'), previous_world='Firmera', previous_guild=None)]
+
+    def test_no_changes(self):
+        same = {'alpha': entry('Alpha', 'Firmera')}
+        assert diff_online(same, dict(same)) == {'online': [], 'offline': [], 'moved': []}
+
+
+class TestMain:
+    """Test a full run with mocked online lists."""
+
+    def run(self, tmp_path, monkeypatch, online):
+        monkeypatch.setattr(check_alerts, 'WORLDS', ['Firmera', 'Antica'])
+        lists = {'alerts': tmp_path / 'alerts.json', 'block': tmp_path / 'block.json'}
+        lists['alerts'].write_text(json.dumps(['Alpha', 'Beta']))
+        lists['block'].write_text(json.dumps(['Delta']))
+        monkeypatch.setattr(check_alerts, 'WATCH_LISTS', {name: str(path) for name, path in lists.items()})
+        guilds = tmp_path / 'world_guilds_data.json'
+        guilds.write_text(json.dumps(WORLDS_DATA))
+        monkeypatch.setattr(check_alerts, 'WORLD_GUILDS_FILE', str(guilds))
+
+        output = tmp_path / 'events.json'
+        with patch('check_alerts.prefetch_worlds') as prefetch, \
+                patch('check_alerts.get_online_players', side_effect=online.get):
+            assert check_alerts.main(['--output', str(output)]) == 0
+        prefetch.assert_called_once_with(['Firmera', 'Antica'])
+        with open(output) as f:
+            return json.load(f)
+
+    def test_writes_events_and_diffs_against_previous_run(self, tmp_path, monkeypatch):
+        events = self.run(tmp_path, monkeypatch, {'Firmera': ['alpha'], 'Antica': ['Beta']})
+        assert [e['name'] for e in events['online']] == ['alpha', 'Beta']
+        assert events['online'][0]['guild'] == 'Bastex'
+        assert len(events['changes']['online']) == 2
+
+        events = self.run(tmp_path, monkeypatch, {'Firmera': ['Delta'], 'Antica': ['Beta']})
+        assert [e['name'] for e in events['changes']['online']] == ['Delta']
+        assert [e['name'] for e in events['changes']['offline']] == ['alpha']
+        assert events['changes']['moved'] == []
+
+    def test_unavailable_world_carries_players_over(self, tmp_path, monkeypatch):
+        self.run(tmp_path, monkeypatch, {'Firmera': ['Alpha'], 'Antica': []})
+        events = self.run(tmp_path, monkeypatch, {'Antica': []})
+        assert events['unavailable_worlds'] == ['Firmera']
+        assert [e['name'] for e in events['online']] == ['Alpha']
+        assert events['changes']['offline'] == []
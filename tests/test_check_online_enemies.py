@@ -5,15 +5,33 @@ Tests for scripts/check_online_enemies.py - Enemy tracker unit tests.
 import sys
 import os
 import json
+import random
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
 
+from config_store import current_version, write_json  # noqa: E402
 from check_online_enemies import (  # noqa: E402
     extract_player_killers,
     build_case_insensitive_map,
     load_json_list,
-    save_trolls
+    save_trolls,
+    merge_troll_changes,
+    classify_killers,
+    build_guild_snapshot_index,
+    Verdict,
+    BASTEX,
+    ALREADY_CHECKED,
+    KNOWN,
+    NORMALIZE,
+    KEEP_EXISTING,
+    NOT_FOUND,
+    LOOKUP_FAILED,
+    DIFFERENT_WORLD,
+    GUILDED,
+    ADD,
+    record_processed_deaths
 )
+from death_store import DeathStore  # noqa: E402
 
 
 class TestExtractPlayerKillers:
@@ -113,6 +131,33 @@ class TestSaveTrolls:
         content = out_file.read_text()
         assert "    " in content  # 4-space indent
 
+    def test_concurrent_save_merges_instead_of_overwriting(self, tmp_path, monkeypatch):
+        out_file = tmp_path / "trolls.json"
+        monkeypatch.setattr('check_online_enemies.TROLLS_FILE', str(out_file))
+        out_file.write_text(json.dumps(["Ruslex", "rodlex"]))
+        version = current_version(str(out_file))
+
+        # Another worker saves while this run is still going
+        write_json(str(out_file), ["Ruslex", "rodlex", "Other Worker Troll"])
+
+        mine = ["Ruslex", "Rodlex", "New Troll"]
+        assert save_trolls(mine, version, added=[("New Troll", "Firmera", "Victim")],
+                           normalized=[("rodlex", "Rodlex")]) is True
+        assert json.loads(out_file.read_text()) == ["Ruslex", "Rodlex", "Other Worker Troll", "New Troll"]
+
+
+class TestMergeTrollChanges:
+    """Test re-applying a run's changes on top of a newer trolls list."""
+
+    def test_skips_additions_already_present_in_any_case(self):
+        merged = merge_troll_changes(["Evil Player"], [("evil player", "Firmera", "X")], [])
+        assert merged == ["Evil Player"]
+
+    def test_does_not_modify_current_list(self):
+        current = ["A"]
+        merge_troll_changes(current, [("B", "Firmera", "X")], [("a", "A")])
+        assert current == ["A"]
+
 
 class TestDuplicateDetection:
     """Test that the system correctly handles duplicates."""
@@ -129,3 +174,147 @@ class TestDuplicateDetection:
         # Simulating what the main loop does
         assert "ruslex" in lookup       # exact lowercase
         assert "trip wick" in lookup     # with space
+
+
+def per_killer_verdict(killer, world, bastex_set, trolls_lookup, skipped_killers, info):
+    """The original inline per-killer decision, kept as the reference."""
+    killer_lower = killer.lower()
+    if killer_lower in bastex_set:
+        return (BASTEX, killer)
+    if (killer_lower, world) in skipped_killers:
+        return (ALREADY_CHECKED, killer)
+    if killer_lower in trolls_lookup:
+        _, existing_name = trolls_lookup[killer_lower]
+        if existing_name == killer:
+            return (KNOWN, existing_name)
+        correct_name, _, _ = info[killer] or (None, None, None)
+        if correct_name and correct_name != existing_name:
+            return (NORMALIZE, correct_name)
+        return (KEEP_EXISTING, existing_name)
+    if info[killer] is None:
+        return (LOOKUP_FAILED, killer)
+    correct_name, char_world, char_guild = info[killer]
+    if correct_name is None:
+        return (NOT_FOUND, killer)
+    if char_world and char_world.lower() != world.lower():
+        return (DIFFERENT_WORLD, killer)
+    if char_guild:
+        return (GUILDED, killer)
+    return (ADD, correct_name)
+
+
+def random_case(rng):
+    """A random batch of killers with bastex/troll lists and API answers."""
+    names = [f"Player {i}" for i in range(12)]
+    killers = {rng.choice([name, name.lower(), name.upper()]) for name in rng.sample(names, 8)}
+    bastex_set = {name.lower() for name in rng.sample(names, 2)}
+    trolls = [rng.choice([name, name.lower()]) for name in rng.sample(names, 4)]
+    skipped = {(name.lower(), "Firmera") for name in rng.sample(names, 2)}
+    info = {}
+    for killer in killers:
+        info[killer] = rng.choice([
+            None,
+            (None, None, None),
+            (killer.title(), "Firmera", ""),
+            (killer.title(), "firmera", ""),
+            (killer.title(), "Antica", ""),
+            (killer.title(), "Firmera", "Some Guild"),
+            (killer.title(), "", ""),
+        ])
+    return killers, bastex_set, build_case_insensitive_map(trolls), skipped, info
+
+
+class TestClassifyKillers:
+    """The batch classifier must agree with the per-killer path."""
+
+    def test_matches_per_killer_path(self):
+        rng = random.Random(1234)
+        for _ in range(300):
+            killers, bastex_set, trolls_lookup, skipped, info = random_case(rng)
+            verdicts = classify_killers(killers, "Firmera", bastex_set, trolls_lookup, skipped,
+                                        lambda names: {n: info[n] for n in names})
+            for killer in killers:
+                expected = per_killer_verdict(killer, "Firmera", bastex_set, trolls_lookup, skipped, info)
+                assert (verdicts[killer].action, verdicts[killer].name) == expected
+
+    def test_matches_per_killer_path_with_guild_snapshot(self):
+        """A snapshot that agrees with the API gives the same verdicts."""
+        rng = random.Random(99)
+        for _ in range(300):
+            killers, bastex_set, trolls_lookup, skipped, info = random_case(rng)
+            guild_index = {
+                killer.lower(): answer[1:]
+                for killer, answer in info.items() if answer and answer[2]
+            }
+            verdicts = classify_killers(killers, "Firmera", bastex_set, trolls_lookup, skipped,
+                                        lambda names: {n: info[n] for n in names}, guild_index)
+            for killer in killers:
+                expected = per_killer_verdict(killer, "Firmera", bastex_set, trolls_lookup, skipped, info)
+                assert (verdicts[killer].action, verdicts[killer].name) == expected
+
+    def test_looks_up_only_unresolved_names_in_one_batch(self):
+        calls = []
+
+        def character_info(names):
+            calls.append(sorted(names))
+            return {name: (name, "Firmera", "") for name in names}
+
+        guild_index = build_guild_snapshot_index({"Antica": {"Guild": ["Roamer"]},
+                                                  "Firmera": {"Guild": ["Member"]}})
+        verdicts = classify_killers(
+            ["Bastex Guy", "Known", "Roamer", "Member", "Fresh One", "Fresh Two"], "Firmera",
+            {"bastex guy"}, build_case_insensitive_map(["Known"]), set(), character_info, guild_index
+        )
+        assert calls == [["Fresh One", "Fresh Two"]]
+        assert verdicts["Roamer"] == Verdict(DIFFERENT_WORLD, "Roamer", "Antica")
+        assert verdicts["Member"] == Verdict(GUILDED, "Member", "Guild")
+        assert verdicts["Fresh One"].action == ADD
+
+    def test_no_lookup_when_everything_is_resolved(self):
+        def character_info(names):
+            raise AssertionError("unexpected lookup")
+
+        verdicts = classify_killers(["Known"], "Firmera", set(), build_case_insensitive_map(["Known"]),
+                                    set(), character_info)
+        assert verdicts["Known"].action == KNOWN
+
+
+class TestRecordProcessedDeaths:
+    """Only deaths whose killers all have a verdict are recorded."""
+
+    NOW = 1737331200  # 2025-01-20T00:00:00Z
+    DEATH = {"time": "2025-01-19T12:00:00Z",
+             "killers": [{"name": "Maybe Troll", "player": True}, {"name": "Deleted Char", "player": True}]}
+
+    def classify(self, info):
+        return classify_killers(["Maybe Troll", "Deleted Char"], "Firmera", set(), {}, set(),
+                                lambda names: {name: info[name] for name in names})
+
+    def process(self, store, verdicts):
+        not_found = {name.lower() for name, v in verdicts.items() if v.action == NOT_FOUND}
+        failed = {name.lower() for name, v in verdicts.items() if v.action == LOOKUP_FAILED}
+        return record_processed_deaths(store, "Enemy Knight", store.new_deaths("Enemy Knight", [self.DEATH]),
+                                       not_found, failed)
+
+    def test_failed_lookup_is_retried_by_the_next_run(self):
+        store = DeathStore(now=self.NOW)
+        gone = (None, None, None)
+
+        # Outage: the lookup fails, so the death stays unprocessed
+        verdicts = self.classify({"Maybe Troll": None, "Deleted Char": gone})
+        assert verdicts["Maybe Troll"].action == LOOKUP_FAILED
+        assert self.process(store, verdicts) == 0
+        assert store.new_deaths("Enemy Knight", [self.DEATH]) == [self.DEATH]
+
+        # Next run: the retry succeeds and the troll is found
+        verdicts = self.classify({"Maybe Troll": ("Maybe Troll", "Firmera", ""), "Deleted Char": gone})
+        assert verdicts["Maybe Troll"] == Verdict(ADD, "Maybe Troll", None)
+        assert self.process(store, verdicts) == 1
+        event, = store.events.values()
+        assert event.not_found == ("Deleted Char",)
+        assert store.new_deaths("Enemy Knight", [self.DEATH]) == []
+
+    def test_failed_lookup_of_a_listed_troll_keeps_the_entry(self):
+        verdicts = classify_killers(["known"], "Firmera", set(), build_case_insensitive_map(["Known"]), set(),
+                                    lambda names: {name: None for name in names})
+        assert verdicts["known"] == Verdict(KEEP_EXISTING, "Known", None)
@@ -0,0 +1,173 @@
+"""
+Tests for scripts/collect_metrics.py - dashboard metrics collector.
+"""
+
+import sys
+import os
+import json
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from collect_metrics import (  # noqa: E402
+    FixtureRunSource,
+    update_cache,
+    compute_pipeline_metrics,
+    format_duration,
+    collect,
+    update_metrics_file
+)
+
+NOW = datetime(2025, 8, 8, 12, 0, tzinfo=timezone.utc)
+SINCE = datetime(2025, 7, 10, tzinfo=timezone.utc)
+
+
+def run(run_id, created, conclusion='success', status='completed', seconds=120):
+    """Build a workflow run as returned by the GitHub API."""
+    return {
+        'id': run_id,
+        'status': status,
+        'conclusion': conclusion if status == 'completed' else None,
+        'created_at': f"{created}T10:00:00Z",
+        'run_started_at': f"{created}T10:00:00Z",
+        'updated_at': f"{created}T10:{seconds // 60:02d}:{seconds % 60:02d}Z",
+        'head_branch': 'main',
+    }
+
+
+class CountingSource:
+    """Wrap a run source and count how many runs were read from it."""
+
+    def __init__(self, runs):
+        self.runs_by_workflow = runs
+        self.read = 0
+        self.refreshed = []
+
+    def runs(self, workflow, since):
+        for item in sorted(self.runs_by_workflow.get(workflow, []), key=lambda r: r['created_at'], reverse=True):
+            self.read += 1
+            yield item
+
+    def run(self, run_id):
+        self.refreshed.append(run_id)
+        for runs in self.runs_by_workflow.values():
+            for item in runs:
+                if item['id'] == run_id:
+                    return item
+        return None
+
+
+class TestUpdateCache:
+    """Test the incremental run cache."""
+
+    def test_first_fetch_caches_projected_runs(self):
+        cache = {}
+        source = CountingSource({'ci.yml': [run(1, '2025-08-01'), run(2, '2025-08-02')]})
+        assert update_cache(cache, source, 'ci.yml', SINCE) == 2
+        assert set(cache['ci.yml']) == {'1', '2'}
+        assert 'head_branch' not in cache['ci.yml']['1']
+
+    def test_stops_paging_at_first_cached_completed_run(self):
+        cache = {}
+        runs = [run(1, '2025-08-01'), run(2, '2025-08-02')]
+        update_cache(cache, CountingSource({'ci.yml': runs}), 'ci.yml', SINCE)
+
+        source = CountingSource({'ci.yml': runs + [run(3, '2025-08-03')]})
+        assert update_cache(cache, source, 'ci.yml', SINCE) == 1
+        assert source.read == 2  # the new run, then the first cached one
+        assert set(cache['ci.yml']) == {'1', '2', '3'}
+
+    def test_refreshes_runs_that_were_in_progress(self):
+        cache = {}
+        update_cache(cache, CountingSource({'ci.yml': [run(1, '2025-08-01', status='in_progress')]}),
+                     'ci.yml', SINCE)
+
+        source = CountingSource({'ci.yml': [run(1, '2025-08-01', conclusion='failure')]})
+        update_cache(cache, source, 'ci.yml', SINCE)
+        assert cache['ci.yml']['1']['conclusion'] == 'failure'
+
+    def test_prunes_runs_older_than_window(self):
+        cache = {'ci.yml': {'9': run(9, '2025-06-01')}}
+        update_cache(cache, CountingSource({}), 'ci.yml', SINCE)
+        assert cache['ci.yml'] == {}
+
+
+class TestComputePipelineMetrics:
+    """Test the one-pass rolling window computation."""
+
+    def test_daily_series_rates_and_build_time(self):
+        cache = {
+            'ci.yml': {
+                '1': run(1, '2025-08-08', seconds=100),
+                '2': run(2, '2025-08-08', seconds=200),
+                '3': run(3, '2025-08-07', conclusion='failure'),
+                '4': run(4, '2025-07-10'),
+            },
+            'cd.yml': {'5': run(5, '2025-08-08', conclusion='failure')},
+        }
+        pipeline = compute_pipeline_metrics(cache, NOW)
+
+        assert len(pipeline['labels']) == 30
+        assert pipeline['labels'][0] == 'Jul 10'
+        assert pipeline['labels'][-1] == 'Aug 08'
+        assert pipeline['ci'][-1] == 2
+        assert pipeline['ci'][-2] == 1
+        assert pipeline['ci'][0] == 1
+        assert sum(pipeline['cd']) == 1
+        assert pipeline['ciSuccessRate'] == '75%'
+        assert pipeline['cdSuccessRate'] == '0%'
+        assert pipeline['avgBuildTime'] == format_duration((100 + 200 + 120) / 3)
+        assert pipeline['totalDeployments'] == 1
+
+    def test_empty_cache(self):
+        pipeline = compute_pipeline_metrics({}, NOW)
+        assert pipeline['ci'] == [0] * 30
+        assert pipeline['ciSuccessRate'] == '0%'
+        assert pipeline['avgBuildTime'] == '--'
+
+
+class TestCollect:
+    """Test end-to-end collection against recorded fixtures."""
+
+    def test_updates_metrics_in_place(self, tmp_path):
+        fixtures = tmp_path / 'runs.json'
+        fixtures.write_text(json.dumps({
+            'ci.yml': [run(1, '2025-08-08'), run(2, '2025-08-01', conclusion='failure')],
+            'cd.yml': [run(3, '2025-08-08')],
+        }))
+        metrics_path = tmp_path / 'metrics.json'
+        metrics_path.write_text(json.dumps({
+            'security': {'passed': 85, 'warnings': 12, 'failed': 3},
+            'application': {'enemiesOnline': 4},
+        }))
+
+        metrics = collect(FixtureRunSource(str(fixtures)), now=NOW,
+                          cache_path=str(tmp_path / 'runs_cache.json'), metrics_path=str(metrics_path))
+
+        assert metrics['security'] == {'passed': 85, 'warnings': 12, 'failed': 3}
+        assert metrics['application']['enemiesOnline'] == 4
+        assert metrics['pipeline']['ciSuccessRate'] == '50%'
+        assert metrics['lastUpdated'] == '2025-08-08T12:00:00Z'
+        assert metrics['updated']['pipeline'] == '2025-08-08T12:00:00Z'
+        assert metrics['updated']['application']['trollsTotal'] == '2025-08-08T12:00:00Z'
+        # Not supplied by this collector: kept, but not stamped as current
+        assert metrics['updated']['application']['enemiesOnline'] is None
+        with open(metrics_path) as f:
+            assert json.load(f) == metrics
+        with open(tmp_path / 'runs_cache.json') as f:
+            assert set(json.load(f)['ci.yml']) == {'1', '2'}
+
+    def test_values_not_refreshed_keep_their_old_timestamp(self, tmp_path):
+        metrics_path = tmp_path / 'metrics.json'
+        earlier = NOW - timedelta(days=1)
+        update_metrics_file({}, {'trollsTotal': 1, 'apiCalls': 500}, earlier, str(metrics_path))
+        metrics = update_metrics_file({}, {'trollsTotal': 2}, NOW, str(metrics_path))
+        assert metrics['application'] == {'trollsTotal': 2, 'apiCalls': 500}
+        assert metrics['updated']['application'] == {
+            'trollsTotal': '2025-08-08T12:00:00Z',
+            'apiCalls': '2025-08-07T12:00:00Z',
+        }
+
+    def test_format_duration(self):
+        assert format_duration(154) == '2m 34s'
+        assert format_duration(5) == '0m 05s'
@@ -0,0 +1,157 @@
+"""
+Tests for scripts/config_store.py - .configs/ data file access.
+"""
+
+import sys
+import os
+import json
+import threading
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from config_store import (  # noqa: E402
+    read_json,
+    read_versioned,
+    write_json,
+    compare_and_swap,
+    update,
+    current_version,
+    clear_cache,
+    file_digest,
+    text_digest,
+    write_text,
+    ConflictError,
+    MISSING_VERSION
+)
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    clear_cache()
+    yield
+    clear_cache()
+
+
+class TestReadJson:
+    """Test the parsed-file cache."""
+
+    def test_unchanged_file_is_parsed_once(self, tmp_path):
+        path = tmp_path / "trolls.json"
+        path.write_text(json.dumps(["A", "B"]))
+        assert read_json(str(path)) is read_json(str(path))
+
+    def test_changed_file_is_reread(self, tmp_path):
+        path = tmp_path / "trolls.json"
+        path.write_text(json.dumps(["A"]))
+        assert read_json(str(path)) == ["A"]
+        path.write_text(json.dumps(["A", "B"]))
+        assert read_json(str(path)) == ["A", "B"]
+
+    def test_missing_file_raises(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            read_json(str(tmp_path / "missing.json"))
+
+    def test_invalid_json_raises(self, tmp_path):
+        path = tmp_path / "bad.json"
+        path.write_text("{not json")
+        with pytest.raises(ValueError):
+            read_json(str(path))
+
+
+class TestWrites:
+    """Test atomic, versioned writes."""
+
+    def test_write_changes_version_and_is_readable(self, tmp_path):
+        path = str(tmp_path / "trolls.json")
+        assert current_version(path) == MISSING_VERSION
+        first = write_json(path, ["A"])
+        second = write_json(path, ["A", "B"])
+        assert MISSING_VERSION != first != second
+        assert read_versioned(path) == (["A", "B"], second)
+        clear_cache()
+        assert current_version(path) == second
+
+    def test_write_uses_indent_and_leaves_no_temp_files(self, tmp_path):
+        path = tmp_path / "trolls.json"
+        write_json(str(path), ["A"])
+        assert "    " in path.read_text()
+        assert sorted(p.name for p in tmp_path.iterdir()) == [
+            ".trolls.json.lock", "trolls.json"
+        ]
+
+    def test_compact_write_is_minified_and_sorted(self, tmp_path):
+        path = tmp_path / "index.json"
+        write_json(str(path), {"b": [1, 2], "a": {"c": 3}}, compact=True)
+        assert path.read_text() == '{"a":{"c":3},"b":[1,2]}'
+        assert sorted(p.name for p in tmp_path.iterdir()) == [".index.json.lock", "index.json"]
+
+    def test_write_text_is_versioned_and_digest_matches_the_file(self, tmp_path):
+        path = str(tmp_path / "world_guilds_data.json")
+        assert file_digest(path) is None
+        text = json.dumps({"Antica": {"Alpha": ["Anna"]}}, indent=4)
+        assert write_text(path, text) == current_version(path)
+        assert read_json(path) == {"Antica": {"Alpha": ["Anna"]}}
+        assert file_digest(path) == text_digest(text)
+
+    def test_external_change_counts_as_a_new_version(self, tmp_path):
+        path = tmp_path / "trolls.json"
+        version = write_json(str(path), ["A"])
+        path.write_text(json.dumps(["A", "Edited By Git"]))
+        assert current_version(str(path)) not in (version, MISSING_VERSION)
+
+    def test_compare_and_swap_succeeds_at_expected_version(self, tmp_path):
+        path = str(tmp_path / "trolls.json")
+        write_json(path, ["A"])
+        _, version = read_versioned(path)
+        assert compare_and_swap(path, version, ["A", "B"]) == current_version(path) != version
+
+    def test_compare_and_swap_conflicts_after_another_write(self, tmp_path):
+        path = str(tmp_path / "trolls.json")
+        write_json(path, ["A"])
+        _, version = read_versioned(path)
+        write_json(path, ["A", "Other Worker"])
+        with pytest.raises(ConflictError):
+            compare_and_swap(path, version, ["A", "Mine"])
+        assert read_json(path) == ["A", "Other Worker"]
+
+    def test_compare_and_swap_conflicts_after_several_outside_writes(self, tmp_path):
+        path = tmp_path / "trolls.json"
+        write_json(str(path), ["A"])
+        _, version = read_versioned(str(path))
+        write_json(str(path), ["A", "Worker"])
+        for edit in (["A", "Git 1"], ["A", "Git 2"]):
+            path.write_text(json.dumps(edit))
+        with pytest.raises(ConflictError):
+            compare_and_swap(str(path), version, ["A", "Mine"])
+
+
+class TestUpdate:
+    """Test locked read-modify-write."""
+
+    def test_update_missing_file_starts_from_default(self, tmp_path):
+        path = str(tmp_path / "trolls.json")
+        data, version = update(path, lambda current: current + ["A"], default=[])
+        assert data == ["A"]
+        assert version == current_version(path) != MISSING_VERSION
+
+    def test_unchanged_result_skips_the_write(self, tmp_path):
+        path = str(tmp_path / "trolls.json")
+        version = write_json(path, ["A"])
+        assert update(path, lambda current: current) == (["A"], version)
+
+    def test_concurrent_updates_are_not_lost(self, tmp_path):
+        path = str(tmp_path / "trolls.json")
+        write_json(path, [])
+
+        def worker(n):
+            for i in range(20):
+                update(path, lambda current: current + [f"w{n}-{i}"])
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(read_json(path)) == 100
@@ -0,0 +1,112 @@
+"""
+Tests for scripts/death_store.py - processed enemy death events.
+"""
+
+import sys
+import os
+import gzip
+import json
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from death_store import DeathEvent, DeathStore, player_killers  # noqa: E402
+
+NOW = datetime(2025, 1, 20, tzinfo=timezone.utc).timestamp()
+DAY = 86400
+
+
+def death(days_ago, *killers, creature=None):
+    """A TibiaData death record `days_ago` before NOW."""
+    when = datetime.fromtimestamp(NOW - days_ago * DAY, timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+    records = [{"name": name, "player": True} for name in killers]
+    if creature:
+        records.append({"name": creature, "player": False})
+    return {"time": when, "killers": records}
+
+
+class TestPlayerKillers:
+    """Test killer extraction for one death."""
+
+    def test_players_only_in_order_without_duplicates(self):
+        record = death(1, "Troll B", "Troll A", "Troll B", creature="a demon")
+        assert player_killers(record) == ("Troll B", "Troll A")
+
+
+class TestDeathStore:
+    """Test dedup, the killer index and retention."""
+
+    def test_recorded_deaths_are_not_new_for_any_spelling_of_the_victim(self):
+        store = DeathStore(now=NOW)
+        fight = death(1, "Troll A")
+        assert store.new_deaths("Enemy Knight", [fight, death(2, "Troll B")]) == [fight, death(2, "Troll B")]
+        store.record("Enemy Knight", fight)
+        assert store.new_deaths("enemy knight", [fight, death(2, "Troll B")]) == [death(2, "Troll B")]
+        # Same fight, another victim: a separate event
+        assert store.new_deaths("Enemy Druid", [fight]) == [fight]
+
+    def test_deaths_past_retention_are_never_new(self):
+        store = DeathStore(now=NOW)
+        assert store.new_deaths("Enemy Knight", [death(40, "Troll A")]) == []
+
+    def test_deaths_without_a_time_are_always_new(self):
+        store = DeathStore(now=NOW)
+        record = {"killers": [{"name": "Troll A", "player": True}]}
+        assert store.record("Enemy Knight", record) is False
+        assert store.new_deaths("Enemy Knight", [record]) == [record]
+
+    def test_killer_index(self):
+        store = DeathStore(now=NOW)
+        store.record("Enemy Knight", death(1, "Troll A", "Troll B"))
+        store.record("Enemy Druid", death(1, "Troll A"))
+        store.record("Enemy Druid", death(3, "Troll C"))
+        events = store.events_by("TROLL A")
+        assert [event.victim for event in events] == ["Enemy Druid", "Enemy Knight"]
+        assert events[1].killers == ("Troll A", "Troll B")
+        assert store.events_by("Nobody") == []
+
+    def test_prune_drops_old_events_and_their_index_entries(self):
+        store = DeathStore([DeathEvent("Enemy Knight", int(NOW - 40 * DAY), ("Troll A",)),
+                            DeathEvent("Enemy Knight", int(NOW - DAY), ("Troll B",))], now=NOW)
+        assert store.prune() == 1
+        assert list(store.by_killer) == ["troll b"]
+
+    def test_round_trip_through_the_file(self, tmp_path):
+        path = str(tmp_path / ".cache" / "death_events.json.gz")
+        store = DeathStore(now=NOW)
+        store.record("Enemy Knight", death(1, "Troll A", "Troll B"))
+        store.record("Enemy Druid", death(2, "Troll A"))
+        store.save(path)
+
+        loaded = DeathStore.load(path, now=NOW)
+        assert loaded.events == store.events
+        assert loaded.events_by("troll a") == store.events_by("troll a")
+        # Saving unchanged data writes identical bytes
+        with open(path, 'rb') as f:
+            first = f.read()
+        loaded.save(path)
+        with open(path, 'rb') as f:
+            assert f.read() == first
+
+    def test_not_found_killers_are_recorded_with_the_death(self, tmp_path):
+        path = str(tmp_path / "death_events.json.gz")
+        store = DeathStore(now=NOW)
+        fight = death(1, "Troll A", "Deleted Char")
+        store.record("Enemy Knight", fight, not_found=["Deleted Char"])
+        assert store.new_deaths("Enemy Knight", [fight]) == []
+        store.save(path)
+        event, = DeathStore.load(path, now=NOW).events_by("deleted char")
+        assert (event.killers, event.not_found) == (("Troll A", "Deleted Char"), ("Deleted Char",))
+
+    def test_loads_format_1_events(self, tmp_path):
+        path = tmp_path / "death_events.json.gz"
+        path.write_bytes(gzip.compress(json.dumps(
+            {"format": 1, "names": ["Enemy Knight", "Troll A"], "events": [[0, int(NOW - DAY), [1]]]}).encode()))
+        event, = DeathStore.load(str(path), now=NOW).events.values()
+        assert event == DeathEvent("Enemy Knight", int(NOW - DAY), ("Troll A",), ())
+
+    def test_missing_or_corrupt_file_starts_empty(self, tmp_path):
+        assert DeathStore.load(str(tmp_path / "missing.json.gz"), now=NOW).events == {}
+        corrupt = tmp_path / "corrupt.json.gz"
+        corrupt.write_bytes(b"not gzip")
+        assert DeathStore.load(str(corrupt), now=NOW).events == {}
@@ -0,0 +1,162 @@
+"""
+Tests for scripts/deploy_config.py - config packaging and S3 deploys.
+"""
+
+import sys
+import os
+import gzip
+import hashlib
+import json
+import subprocess
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from deploy_config import (  # noqa: E402
+    FilesystemBackend,
+    S3Backend,
+    deploy,
+    package,
+    verify
+)
+
+KEY = "configs/combined.json"
+
+
+@pytest.fixture
+def artifact(tmp_path):
+    """A packaged artifact built from a small .configs/ directory."""
+    configs = tmp_path / ".configs"
+    configs.mkdir()
+    for name, data in {"alerts": ["Anna"], "bastex": [], "block": ["Bert"], "trolls": ["Carl"]}.items():
+        (configs / f"{name}.json").write_text(json.dumps(data))
+    path = str(tmp_path / "combined_config.json")
+    package(str(configs), path)
+    return path
+
+
+class CountingBackend(FilesystemBackend):
+    """Filesystem backend that counts requests by method."""
+
+    def __init__(self, root):
+        super().__init__(root)
+        self.requests = {'HEAD': 0, 'PUT': 0, 'GET': 0}
+
+    def head(self, key):
+        self.requests['HEAD'] += 1
+        return super().head(key)
+
+    def put(self, *args, **kwargs):
+        self.requests['PUT'] += 1
+        return super().put(*args, **kwargs)
+
+    def get(self, key, path):
+        self.requests['GET'] += 1
+        return super().get(key, path)
+
+
+class TestPackage:
+    """Test building the artifact."""
+
+    def test_writes_artifact_gzip_copy_and_sha(self, artifact):
+        with open(artifact, 'rb') as f:
+            payload = f.read()
+        with open(f"{artifact}.gz", 'rb') as f:
+            assert gzip.decompress(f.read()) == payload
+        with open(os.path.join(os.path.dirname(artifact), "artifact.sha256")) as f:
+            assert f.read() == hashlib.sha256(payload).hexdigest()
+        assert json.loads(payload)["trolls"] == ["Carl"]
+
+    def test_configs_that_fail_validation_are_not_packaged(self, tmp_path):
+        configs = tmp_path / ".configs"
+        configs.mkdir()
+        (configs / "trolls.json").write_text(json.dumps(["Carl", 42]))
+        report = tmp_path / "validation-report.json"
+        with pytest.raises(ValueError, match="trolls.json"):
+            package(str(configs), str(tmp_path / "combined_config.json"), report_path=str(report))
+        assert not (tmp_path / "combined_config.json").exists()
+        assert json.loads(report.read_text())['ok'] is False
+
+
+class TestDeploy:
+    """Test change detection and upload."""
+
+    def test_first_deploy_uploads_gzip_with_sha_metadata(self, artifact, tmp_path):
+        backend = FilesystemBackend(str(tmp_path / "bucket"))
+        result = deploy(backend, KEY, artifact, metadata={'commit': 'abc1234'})
+        assert (result['status'], result['previous']) == ('uploaded', None)
+
+        info = backend.head(KEY)
+        assert info['content_encoding'] == 'gzip'
+        assert info['metadata'] == {'commit': 'abc1234', 'sha256': result['sha256']}
+        assert verify(backend, KEY)["alerts"] == ["Anna"]
+
+    def test_unchanged_artifact_costs_one_head_and_no_download(self, artifact, tmp_path):
+        backend = CountingBackend(str(tmp_path / "bucket"))
+        deploy(backend, KEY, artifact)
+        backend.requests = {'HEAD': 0, 'PUT': 0, 'GET': 0}
+
+        result = deploy(backend, KEY, artifact)
+        assert (result['status'], result['checked']) == ('unchanged', 'head')
+        assert backend.requests == {'HEAD': 1, 'PUT': 0, 'GET': 0}
+
+    def test_manifest_match_skips_the_head_request(self, artifact, tmp_path):
+        backend = CountingBackend(str(tmp_path / "bucket"))
+        manifest = str(tmp_path / ".cache" / "deploy_manifest.json")
+        deploy(backend, KEY, artifact, manifest_path=manifest)
+        backend.requests = {'HEAD': 0, 'PUT': 0, 'GET': 0}
+
+        result = deploy(backend, KEY, artifact, manifest_path=manifest)
+        assert (result['status'], result['checked']) == ('unchanged', 'manifest')
+        assert backend.requests == {'HEAD': 0, 'PUT': 0, 'GET': 0}
+
+    def test_changed_artifact_is_uploaded(self, artifact, tmp_path):
+        backend = FilesystemBackend(str(tmp_path / "bucket"))
+        manifest = str(tmp_path / "deploy_manifest.json")
+        first = deploy(backend, KEY, artifact, manifest_path=manifest)
+        (tmp_path / ".configs" / "trolls.json").write_text(json.dumps(["Carl", "Dave"]))
+        package(str(tmp_path / ".configs"), artifact)
+
+        result = deploy(backend, KEY, artifact, manifest_path=manifest)
+        assert result['status'] == 'uploaded'
+        assert result['previous'] == first['sha256']
+        assert verify(backend, KEY)["trolls"] == ["Carl", "Dave"]
+
+    def test_verify_rejects_a_body_that_does_not_match_its_sha(self, artifact, tmp_path):
+        backend = FilesystemBackend(str(tmp_path / "bucket"))
+        deploy(backend, KEY, artifact)
+        with open(backend.target(KEY), 'wb') as f:
+            f.write(gzip.compress(b'{"alerts": []}'))
+        with pytest.raises(ValueError, match="sha256"):
+            verify(backend, KEY)
+
+
+class TestS3Backend:
+    """Test the aws CLI calls (no AWS access)."""
+
+    def run(self, returncode=0, stdout='{}', stderr=''):
+        return subprocess.CompletedProcess([], returncode, stdout, stderr)
+
+    def test_head_reads_the_sha_metadata(self):
+        response = json.dumps({'Metadata': {'sha256': 'abc'}, 'ContentEncoding': 'gzip', 'ContentLength': 10})
+        with patch('subprocess.run', return_value=self.run(stdout=response)) as run:
+            info = S3Backend("bucket").head(KEY)
+        assert info == {'metadata': {'sha256': 'abc'}, 'content_encoding': 'gzip', 'size': 10}
+        assert run.call_args[0][0][:5] == ['aws', 's3api', 'head-object', '--key', KEY]
+
+    def test_head_of_a_missing_object_is_none(self):
+        missing = self.run(255, '', "An error occurred (404) when calling the HeadObject operation: Not Found")
+        with patch('subprocess.run', return_value=missing):
+            assert S3Backend("bucket").head(KEY) is None
+
+    def test_put_sends_encoding_metadata_and_sse(self):
+        with patch('subprocess.run', return_value=self.run()) as run:
+            S3Backend("bucket", sse="aws:kms", kms_key_id="key-1").put(
+                KEY, "combined_config.json.gz", {'sha256': 'abc', 'commit': 'abc1234'},
+                content_type='application/json', content_encoding='gzip')
+        argv = run.call_args[0][0]
+        assert argv[argv.index('--metadata') + 1] == "commit=abc1234,sha256=abc"
+        assert argv[argv.index('--content-encoding') + 1] == "gzip"
+        assert argv[argv.index('--ssekms-key-id') + 1] == "key-1"
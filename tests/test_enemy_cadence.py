@@ -0,0 +1,117 @@
+"""
+Tests for scripts/enemy_cadence.py - adaptive enemy check cadence.
+"""
+
+import sys
+import os
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from config import (  # noqa: E402
+    CADENCE_HOT_INTERVAL,
+    CADENCE_IDLE_INTERVAL,
+    CADENCE_REQUESTS_PER_HOUR,
+    CADENCE_WARM_INTERVAL
+)
+from enemy_cadence import EnemyCadence, count_new_deaths  # noqa: E402
+
+T0 = 1_700_000_000
+
+
+def after(cadence, seconds):
+    """The saved state reloaded `seconds` later (as the next run sees it)."""
+    return EnemyCadence(cadence.to_json(), now=cadence.now + seconds)
+
+
+class TestCountNewDeaths:
+    """Test counting deaths since the last check."""
+
+    def test_counts_only_later_deaths(self):
+        deaths = [
+            {"time": "2023-11-14T22:20:00Z"},
+            {"time": "2023-11-14T22:00:00Z"},
+            {"time": "not a time"},
+            {},
+        ]
+        assert count_new_deaths(deaths, since=1_699_999_900) == 1
+
+
+class TestCadence:
+    """Test per-guild intervals."""
+
+    def test_new_guilds_are_due_at_the_warm_interval(self):
+        cadence = EnemyCadence(now=T0)
+        assert cadence.plan(["Bastex"]) == (["Bastex"], [])
+        assert cadence.interval("Bastex") == CADENCE_WARM_INTERVAL
+
+    def test_one_quiet_first_check_does_not_make_a_guild_idle(self):
+        cadence = EnemyCadence(now=T0)
+        cadence.record("Bastex", online=0, requests=1)
+        assert cadence.mode("Bastex") == "warm"
+
+    def test_fight_makes_a_guild_hot_immediately(self):
+        cadence = EnemyCadence(now=T0)
+        cadence.record("Bastex", online=1, requests=2)
+        cadence = after(cadence, CADENCE_WARM_INTERVAL)
+        cadence.record("Bastex", online=8, deaths=3, trolls=1, requests=20)
+        assert cadence.mode("Bastex") == "hot"
+
+        cadence = after(cadence, CADENCE_HOT_INTERVAL)
+        assert cadence.plan(["Bastex"])[0] == ["Bastex"]
+
+    def test_quiet_guild_cools_off_to_idle_and_is_skipped_until_due(self):
+        cadence = EnemyCadence(now=T0)
+        cadence.record("Bastex", online=8, requests=10)
+        for _ in range(24):
+            cadence = after(cadence, CADENCE_WARM_INTERVAL)
+            cadence.record("Bastex", online=0, requests=1)
+        assert cadence.mode("Bastex") == "idle"
+
+        selected, skipped = after(cadence, CADENCE_WARM_INTERVAL).plan(["Bastex"])
+        assert selected == [] and skipped[0][0] == "Bastex"
+        assert after(cadence, CADENCE_IDLE_INTERVAL).plan(["Bastex"])[0] == ["Bastex"]
+
+    def test_heat_is_an_average_not_a_sum(self):
+        cadence = EnemyCadence(now=T0)
+        for _ in range(50):
+            cadence.record("Bastex", online=2, requests=3)
+            cadence = after(cadence, CADENCE_HOT_INTERVAL)
+        assert cadence.heat("Bastex") == pytest.approx(2, abs=0.01)
+
+
+class TestBudget:
+    """Test the shared request budget."""
+
+    def test_budget_refills_up_to_one_hour(self):
+        cadence = EnemyCadence(now=T0)
+        cadence.charge(CADENCE_REQUESTS_PER_HOUR)
+        assert cadence.tokens == 0
+        assert after(cadence, 1800).tokens == CADENCE_REQUESTS_PER_HOUR / 2
+        assert after(cadence, 86400).tokens == CADENCE_REQUESTS_PER_HOUR
+
+    def test_hottest_due_guilds_get_the_budget_first(self):
+        cadence = EnemyCadence(now=T0)
+        cadence.record("Cold", online=1, requests=40)
+        cadence.record("Hot", online=9, requests=40)
+        cadence.charge(CADENCE_REQUESTS_PER_HOUR)  # 10 minutes refill enough for one check
+        selected, skipped = after(cadence, CADENCE_WARM_INTERVAL).plan(["Cold", "Hot"])
+        assert selected == ["Hot"]
+        assert skipped[0][0] == "Cold" and "budget" in skipped[0][1]
+
+    def test_overdue_guilds_are_checked_even_without_budget(self):
+        cadence = EnemyCadence(now=T0)
+        cadence.record("Bastex", online=1, requests=40)
+        cadence.charge(10 * CADENCE_REQUESTS_PER_HOUR)
+        assert after(cadence, CADENCE_IDLE_INTERVAL).plan(["Bastex"])[0] == ["Bastex"]
+
+    def test_state_round_trips_through_the_file(self, tmp_path):
+        path = str(tmp_path / "cache" / "enemy_cadence.json")
+        cadence = EnemyCadence(now=T0)
+        cadence.record("Bastex", online=6, requests=12)
+        cadence.charge(12)
+        cadence.save(path)
+        loaded = EnemyCadence.load(path, now=T0)
+        assert loaded.to_json() == cadence.to_json()
+        assert EnemyCadence.load(str(tmp_path / "missing.json"), now=T0).guilds == {}
@@ -4,16 +4,31 @@ Tests for scripts/gen_worlds_guilds.py - World guild data generation.
 
 import sys
 import os
+import json
+import pytest
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
 
 import gen_worlds_guilds  # noqa: E402
-from gen_worlds_guilds import build_world_data  # noqa: E402
+from gen_worlds_guilds import (  # noqa: E402
+    DropQuarantine,
+    build_world_data,
+    refresh_worlds,
+    report_anomalies,
+    parse_shard,
+    shard_worlds,
+    merge_snapshots,
+    run_shard,
+    merge_partials,
+    run_all,
+    save_data
+)
+from guild_snapshot import GuildSnapshot  # noqa: E402
 
 
 def make_fetch_guild(responses):
     """Build a fake fetch_guild returning canned member lists per guild name."""
-    def fake_fetch_guild(guild_name):
+    def fake_fetch_guild(guild_name, fields=None):
         return responses.get(guild_name)
     return fake_fetch_guild
 
@@ -87,3 +102,205 @@ class TestBuildWorldData:
         old_data = {"Alpha": ["Old Member"]}
         world_data, _, _ = build_world_data([{"name": "Alpha"}], old_data)
         assert world_data == {"Alpha": ["New Member"]}
+
+
+def roster(count, prefix="Player"):
+    return [f"{prefix} {i}" for i in range(count)]
+
+
+class TestSnapshotGuard:
+    """Test that implausible drops keep the previous data."""
+
+    def test_truncated_roster_keeps_old_members(self, monkeypatch):
+        monkeypatch.setattr(gen_worlds_guilds, 'fetch_guild', make_fetch_guild({
+            "Alpha": {"members": [{"name": "Player 0"}]}
+        }))
+        old_data = {"Alpha": roster(20)}
+        anomalies = []
+        world_data, processed, failed = build_world_data([{"name": "Alpha"}], old_data, anomalies)
+        assert world_data == {"Alpha": roster(20)}
+        assert (processed, failed) == (0, 1)
+        assert anomalies == [("Alpha", "members dropped from 20 to 1")]
+
+    def test_plausible_changes_and_small_guilds_are_accepted(self, monkeypatch):
+        monkeypatch.setattr(gen_worlds_guilds, 'fetch_guild', make_fetch_guild({
+            "Alpha": {"members": [{"name": n} for n in roster(12)]},
+            "Tiny": {"members": [{"name": "Solo"}]},
+        }))
+        old_data = {"Alpha": roster(20), "Tiny": roster(5)}
+        anomalies = []
+        world_data, processed, _ = build_world_data([{"name": "Alpha"}, {"name": "Tiny"}], old_data, anomalies)
+        assert world_data == {"Alpha": roster(12), "Tiny": ["Solo"]}
+        assert processed == 2
+        assert anomalies == []
+
+    def test_without_guard_drops_are_accepted(self, monkeypatch):
+        monkeypatch.setattr(gen_worlds_guilds, 'fetch_guild', make_fetch_guild({
+            "Alpha": {"members": [{"name": "Player 0"}]}
+        }))
+        world_data, _, _ = build_world_data([{"name": "Alpha"}], {"Alpha": roster(20)})
+        assert world_data == {"Alpha": ["Player 0"]}
+
+    def test_persistent_drop_is_accepted_after_consecutive_runs(self, monkeypatch, tmp_path):
+        monkeypatch.setattr(gen_worlds_guilds, 'fetch_guild', make_fetch_guild({
+            "Alpha": {"members": [{"name": "Player 0"}]}
+        }))
+        path = str(tmp_path / "quarantine.json")
+        kept = []
+        for _ in range(3):
+            quarantine = DropQuarantine.load(path)
+            world_data, _, _ = build_world_data([{"name": "Alpha"}], {"Alpha": roster(20)}, [],
+                                                lambda guild, count: quarantine.confirm(f"Antica/{guild}", count))
+            quarantine.save(path)
+            kept.append(world_data["Alpha"] == roster(20))
+        assert kept == [True, True, False]
+        assert DropQuarantine.load(path).seen == {}
+
+    def test_a_different_or_missing_drop_starts_the_count_over(self):
+        quarantine = DropQuarantine({"Antica": {"count": 1, "runs": 2}, "Belobra": {"count": 3, "runs": 2}})
+        assert quarantine.confirm("Antica", 2) is False
+        assert quarantine.observed == {"Antica": {"count": 2, "runs": 1}}
+
+    def refresh(self, monkeypatch, tmp_path, guild_lists, guard=True, quarantine=None):
+        monkeypatch.setattr(gen_worlds_guilds, 'WORLDS', list(guild_lists))
+        monkeypatch.setattr(gen_worlds_guilds, 'ENEMY_GUILDS', {})
+        monkeypatch.setattr(gen_worlds_guilds, 'prefetch_guilds', lambda names, fields=None: None)
+        monkeypatch.setattr(gen_worlds_guilds, 'fetch_world_guilds',
+                            lambda world, max_retries=None: guild_lists.get(world))
+        monkeypatch.setattr(gen_worlds_guilds, 'fetch_guild', lambda name, fields=None: {
+            "members": [{"name": n} for n in roster(15, name)]
+        })
+        existing = {
+            "Antica": {f"Guild {i}": roster(15, f"Guild {i}") for i in range(6)},
+            "Belobra": {"Guild 0": roster(40, "Guild 0")},
+        }
+        return refresh_worlds(list(guild_lists), existing, str(tmp_path / "queue.sqlite3"), guard, quarantine)
+
+    def test_emptied_world_is_left_out_and_reported(self, monkeypatch, tmp_path):
+        refreshed, stats = self.refresh(monkeypatch, tmp_path, {
+            "Antica": [{"name": "Guild 0"}],
+            "Belobra": [{"name": "Guild 0"}],
+        })
+        assert set(refreshed) == {"Belobra"}
+        assert stats['anomalies'] == [
+            {'world': 'Antica', 'guild': None, 'reason': 'guilds dropped from 6 to 1'},
+            {'world': 'Belobra', 'guild': 'Guild 0', 'reason': 'members dropped from 40 to 15'},
+        ]
+        assert refreshed["Belobra"]["Guild 0"] == tuple(sorted(roster(40, "Guild 0")))
+
+    def test_emptied_world_is_accepted_once_confirmed(self, monkeypatch, tmp_path):
+        quarantine = DropQuarantine({"Antica": {"count": 1, "runs": 2}})
+        refreshed, stats = self.refresh(monkeypatch, tmp_path, {"Antica": [{"name": "Guild 0"}]},
+                                        quarantine=quarantine)
+        assert list(refreshed["Antica"]) == ["Guild 0"]
+        assert stats['anomalies'] == []
+
+    def test_guard_can_be_disabled(self, monkeypatch, tmp_path):
+        refreshed, stats = self.refresh(monkeypatch, tmp_path, {"Antica": []}, guard=False)
+        assert refreshed == {"Antica": {}}
+        assert stats['anomalies'] == []
+
+    def test_all_quarantined_run_is_not_a_failure(self, monkeypatch, tmp_path, capsys):
+        data_file = tmp_path / "world_guilds_data.json"
+        old = {"Antica": {f"Guild {i}": roster(15, f"Guild {i}") for i in range(6)}}
+        data_file.write_text(json.dumps(old))
+        monkeypatch.setattr(gen_worlds_guilds, 'WORLDS', ["Antica"])
+        monkeypatch.setattr(gen_worlds_guilds, 'ENEMY_GUILDS', {})
+        monkeypatch.setattr(gen_worlds_guilds, 'WORLD_GUILDS_FILE', str(data_file))
+        monkeypatch.setattr(gen_worlds_guilds, 'GUILD_QUEUE_FILE', str(tmp_path / "queue.sqlite3"))
+        monkeypatch.setattr(gen_worlds_guilds, 'GUILD_QUARANTINE_FILE', str(tmp_path / "quarantine.json"))
+        monkeypatch.setattr(gen_worlds_guilds, 'record_run', lambda name, sample: None)
+        monkeypatch.setattr(gen_worlds_guilds, 'fetch_world_guilds', lambda world, max_retries=None: [])
+
+        run_all()
+
+        output = capsys.readouterr().out
+        assert "0/1 successful, 1 quarantined, 0 failed" in output
+        assert json.loads(data_file.read_text()) == {
+            world: {guild: sorted(members) for guild, members in guilds.items()} for world, guilds in old.items()
+        }
+
+    def test_anomalies_go_to_the_job_summary(self, monkeypatch, tmp_path):
+        summary = tmp_path / "summary.md"
+        monkeypatch.setenv('GITHUB_STEP_SUMMARY', str(summary))
+        report_anomalies([{'world': 'Antica', 'guild': 'Alpha', 'reason': 'members dropped from 20 to 1'}])
+        assert "- Antica/Alpha: members dropped from 20 to 1" in summary.read_text()
+
+
+class TestSaveData:
+    """Test canonical, skip-if-unchanged saving."""
+
+    def test_unchanged_data_is_not_rewritten(self, monkeypatch, tmp_path, capsys):
+        data_file = tmp_path / "world_guilds_data.json"
+        monkeypatch.setattr(gen_worlds_guilds, 'WORLD_GUILDS_FILE', str(data_file))
+        assert save_data(GuildSnapshot({"Antica": {"Alpha": ["Bert", "Anna"]}}))
+        written = data_file.read_text()
+        os.utime(data_file, (0, 0))
+
+        # Same members in a different (rank) order: nothing to write
+        assert save_data(GuildSnapshot({"Antica": {"Alpha": ["Anna", "Bert"]}}))
+        assert data_file.stat().st_mtime == 0
+        assert "unchanged" in capsys.readouterr().out
+
+        assert save_data(GuildSnapshot({"Antica": {"Alpha": ["Anna"]}}))
+        assert data_file.read_text() != written
+        assert json.loads(data_file.read_text()) == {"Antica": {"Alpha": ["Anna"]}}
+
+
+class TestSharding:
+    """Test splitting worlds across shards and merging partial snapshots."""
+
+    def test_parse_shard(self):
+        assert parse_shard("2/4") == (2, 4)
+
+    @pytest.mark.parametrize("spec", ["0/4", "5/4", "1/0", "two/4", "1"])
+    def test_parse_shard_rejects_bad_specs(self, spec):
+        with pytest.raises(ValueError):
+            parse_shard(spec)
+
+    def test_shards_cover_every_world_once(self):
+        worlds = ["A", "B", "C", "D", "E"]
+        shards = [shard_worlds(worlds, i, 3) for i in range(1, 4)]
+        assert shards == [["A", "D"], ["B", "E"], ["C"]]
+
+    def test_merge_keeps_unrefreshed_worlds_and_drops_unconfigured(self, monkeypatch):
+        monkeypatch.setattr(gen_worlds_guilds, 'WORLDS', ["Antica", "Belobra", "Celesta"])
+        base = {"Antica": {"Old": ["A"]}, "Belobra": {"Old": ["B"]}, "Gone": {"G": ["X"]}}
+        merged = merge_snapshots(base, [{"Antica": {"New": ["A"]}}, {"Celesta": {"C": ["C"]}}])
+        assert json.loads(json.dumps(merged.to_json())) == {
+            "Antica": {"New": ["A"]},
+            "Belobra": {"Old": ["B"]},
+            "Celesta": {"C": ["C"]},
+        }
+
+    def test_shards_then_merge_write_the_data_file(self, monkeypatch, tmp_path):
+        data_file = tmp_path / "world_guilds_data.json"
+        data_file.write_text(json.dumps({"Antica": {"Old Guild": ["Someone"]}}))
+        recorded = []
+        monkeypatch.setattr(gen_worlds_guilds, 'WORLDS', ["Antica", "Belobra", "Celesta"])
+        monkeypatch.setattr(gen_worlds_guilds, 'ENEMY_GUILDS', {})
+        monkeypatch.setattr(gen_worlds_guilds, 'WORLD_GUILDS_FILE', str(data_file))
+        monkeypatch.setattr(gen_worlds_guilds, 'GUILD_QUEUE_FILE', str(tmp_path / "queue.sqlite3"))
+        monkeypatch.setattr(gen_worlds_guilds, 'GUILD_QUARANTINE_FILE', str(tmp_path / "quarantine.json"))
+        monkeypatch.setattr(gen_worlds_guilds, 'QUEUE_RUN_BUDGET', 1)  # carry retries over, don't wait
+        monkeypatch.setattr(gen_worlds_guilds, 'record_run', lambda name, sample: recorded.append(sample))
+        monkeypatch.setattr(gen_worlds_guilds, 'prefetch_guilds', lambda names, fields=None: None)
+        monkeypatch.setattr(gen_worlds_guilds, 'fetch_world_guilds',
+                            lambda world, max_retries=None: None if world == "Celesta" else [{"name": f"{world} Guild"}])
+        monkeypatch.setattr(gen_worlds_guilds, 'fetch_guild', make_fetch_guild({
+            "Antica Guild": {"members": [{"name": "Anna"}]},
+            "Belobra Guild": {"members": [{"name": "Bert"}]},
+        }))
+
+        shard_dir = str(tmp_path / "shards")
+        run_shard(1, 2, shard_dir)   # Antica, Celesta (Celesta fails)
+        run_shard(2, 2, shard_dir)   # Belobra
+        merge_partials(shard_dir)
+
+        with open(data_file) as f:
+            assert json.load(f) == {
+                "Antica": {"Antica Guild": ["Anna"]},
+                "Belobra": {"Belobra Guild": ["Bert"]},
+            }
+        assert os.listdir(shard_dir) == []
+        assert recorded[0]["members.Belobra"] == 1
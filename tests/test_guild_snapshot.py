@@ -0,0 +1,111 @@
+"""
+Tests for scripts/guild_snapshot.py - compact world guild data.
+"""
+
+import sys
+import os
+import json
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from guild_snapshot import GuildSnapshot, WorldGuilds  # noqa: E402
+
+DATA = {
+    "Antica": {"Alpha": ["Anna", "Bert"], "Beta": ["Carl"]},
+    "Belobra": {"Gamma": ["Dora"]},
+}
+
+
+def fresh(name):
+    """An equal string that is a different object (like one parsed from an API response)."""
+    return ''.join(list(name))
+
+
+class TestWorldGuilds:
+    """Test a world's roster."""
+
+    def test_reads_like_the_json_dict(self):
+        world = WorldGuilds(DATA["Antica"])
+        assert world["Alpha"] == ("Anna", "Bert")
+        assert world.get("Nope") is None
+        assert len(world) == 2
+        assert world.member_count() == 3
+        assert "Beta" in world
+
+    def test_unchanged_roster_reuses_the_old_tuple(self):
+        old = WorldGuilds(DATA["Antica"])
+        new = WorldGuilds({fresh("Alpha"): [fresh("Anna"), fresh("Bert")]}, previous=old)
+        assert new["Alpha"] is old["Alpha"]
+        assert next(iter(new)) is next(iter(old))
+
+    def test_changed_roster_shares_remaining_names(self):
+        old = WorldGuilds(DATA["Antica"])
+        new = WorldGuilds({"Alpha": [fresh("Anna"), "Eve"]}, previous=old)
+        assert new["Alpha"] == ("Anna", "Eve")
+        assert new["Alpha"][0] is old["Alpha"][0]
+
+    def test_rank_shuffle_is_not_a_change(self):
+        old = WorldGuilds({"Alpha": ["bert", "Anna", "Carl"]})
+        assert old["Alpha"] == ("Anna", "bert", "Carl")
+        new = WorldGuilds({"Alpha": [fresh("Carl"), fresh("Anna"), fresh("bert")]}, previous=old)
+        assert new["Alpha"] is old["Alpha"]
+
+    def test_removed_guilds_is_a_key_diff(self):
+        old = WorldGuilds(DATA["Antica"])
+        new = WorldGuilds({"Alpha": ["Anna"]})
+        assert old.keys() - new.keys() == {"Beta"}
+
+
+class TestGuildSnapshot:
+    """Test the whole snapshot."""
+
+    def test_load_and_round_trip(self, tmp_path):
+        path = tmp_path / "world_guilds_data.json"
+        path.write_text(json.dumps(DATA))
+        snapshot = GuildSnapshot.load(str(path))
+        assert json.loads(json.dumps(snapshot.to_json())) == DATA
+
+    @pytest.mark.parametrize("data", [
+        {"Antica": {}},
+        {"Antica": {"Alpha": ["Bert", "Anna"]}, "Belobra": {}},
+        {"Antica": {}, "Belobra": {"Gamma": []}},
+        {},
+    ])
+    def test_load_empty_and_mixed_worlds(self, tmp_path, data):
+        path = tmp_path / "world_guilds_data.json"
+        path.write_text(json.dumps(data))
+        snapshot = GuildSnapshot.load(str(path))
+        assert isinstance(snapshot, GuildSnapshot)
+        assert all(isinstance(snapshot[world], WorldGuilds) for world in data)
+        assert snapshot.canonical_json() == GuildSnapshot(data).canonical_json()
+
+    @pytest.mark.parametrize("text", ['[]', '{"Antica": ["Anna"]}'])
+    def test_load_rejects_other_shapes(self, tmp_path, text):
+        path = tmp_path / "world_guilds_data.json"
+        path.write_text(text)
+        with pytest.raises(ValueError):
+            GuildSnapshot.load(str(path))
+
+    def test_replace_worlds_is_copy_on_write(self):
+        old = GuildSnapshot(DATA)
+        new = old.replace_worlds({"Antica": {"Alpha": ["Anna"], "Beta": [fresh("Carl")]}})
+        assert old["Antica"]["Alpha"] == ("Anna", "Bert")
+        assert new["Antica"]["Alpha"] == ("Anna",)
+        assert new["Antica"]["Beta"] is old["Antica"]["Beta"]
+        assert new["Belobra"] is old["Belobra"]
+
+    def test_canonical_json_is_sorted_with_one_member_per_line(self):
+        snapshot = GuildSnapshot({"Belobra": {"Gamma": ["Dora"]}, "Antica": {"Beta": ["Carl"], "Alpha": ["Bert", "Anna"]}})
+        text = snapshot.canonical_json()
+        assert json.loads(text) == {"Antica": {"Alpha": ["Anna", "Bert"], "Beta": ["Carl"]}, "Belobra": {"Gamma": ["Dora"]}}
+        assert list(json.loads(text)) == ["Antica", "Belobra"]
+        assert '        "Alpha": [\n            "Anna",\n            "Bert"\n        ],' in text
+        reshuffled = GuildSnapshot({"Antica": {"Alpha": ["Anna", "Bert"], "Beta": ["Carl"]}, "Belobra": {"Gamma": ["Dora"]}})
+        assert reshuffled.canonical_json() == text
+
+    def test_only_worlds_and_missing_world(self):
+        snapshot = GuildSnapshot(DATA).only_worlds({"Belobra"})
+        assert list(snapshot) == ["Belobra"]
+        assert len(snapshot.world("Antica")) == 0
@@ -0,0 +1,107 @@
+"""
+Tests for scripts/http_fixtures.py - API traffic record/replay.
+"""
+
+import sys
+import os
+import gzip
+import json
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+import tibia_api  # noqa: E402
+from http_fixtures import Replayer, load_archive, recording, replaying  # noqa: E402
+
+URL_A = "https://api.tibiadata.com/v4/guild/Alpha"
+URL_B = "https://api.tibiadata.com/v4/guild/Beta"
+
+
+@pytest.fixture(autouse=True)
+def fresh_run_stats(monkeypatch):
+    """Clean run state, and retries that don't actually wait."""
+    tibia_api.reset_run_stats()
+    monkeypatch.setattr(tibia_api, '_backoff_delay', lambda attempt: 0.0)
+    yield
+    tibia_api.reset_run_stats()
+
+
+def ok(data, elapsed=0.2):
+    return ('ok', data, None, 200, None, elapsed)
+
+
+def transient(retry_after=None):
+    return ('transient', None, "HTTP 503", 503, retry_after, 0.1)
+
+
+def record(path, outcomes):
+    """Record fetching URL_A and URL_B against canned per-URL outcomes."""
+    def fake_attempt(url, fields=None):
+        return outcomes[url].pop(0)
+    with patch('tibia_api._attempt', side_effect=fake_attempt), recording(str(path)):
+        return tibia_api.fetch_many([URL_A, URL_B], fields=('guild', 'name'))
+
+
+class TestRecording:
+    """Test capturing attempts into an archive."""
+
+    def test_archive_is_gzipped_json_lines(self, tmp_path):
+        path = tmp_path / "run.jsonl.gz"
+        record(path, {URL_A: [ok({'guild': {'name': 'Alpha'}})], URL_B: [ok({'guild': {'name': 'Beta'}})]})
+        with gzip.open(path, 'rt') as f:
+            lines = [json.loads(line) for line in f]
+        assert lines[0]['format'] == 1
+        assert lines[0]['attempts'] == 2
+        assert {line['url'] for line in lines[1:]} == {URL_A, URL_B}
+        assert lines[1]['fields'] == ['guild', 'name']
+
+    def test_transport_is_restored(self, tmp_path):
+        record(tmp_path / "run.jsonl.gz", {URL_A: [ok({})], URL_B: [ok({})]})
+        assert tibia_api.set_transport(None) is None
+
+
+class TestReplaying:
+    """Test answering attempts from an archive."""
+
+    def test_replay_reproduces_results_and_retries(self, tmp_path):
+        path = tmp_path / "run.jsonl.gz"
+        recorded = record(path, {
+            URL_A: [transient(), ok({'guild': {'name': 'Alpha'}})],
+            URL_B: [ok({'guild': {'name': 'Beta'}})],
+        })
+        recorded_stats = tibia_api.get_run_stats()
+        tibia_api.reset_run_stats()
+
+        with patch('tibia_api._attempt', side_effect=AssertionError("network used")), \
+                replaying(str(path), time_scale=0) as replayer:
+            replayed = tibia_api.fetch_many([URL_A, URL_B], fields=('guild', 'name'))
+        assert replayed == recorded
+        assert tibia_api.get_run_stats()['retries'] == recorded_stats['retries'] == 1
+        assert replayer.served == 3
+
+    def test_time_scale_applies_to_latency_and_retry_after(self):
+        slept = []
+        entries = [{'url': URL_A, 'outcome': 'transient', 'data': None, 'reason': "HTTP 429",
+                    'http_code': 429, 'retry_after': 10.0, 'elapsed': 0.5}]
+        outcome = Replayer(entries, time_scale=0.1, sleep=slept.append)(URL_A)
+        assert slept == [pytest.approx(0.05)]
+        assert outcome[4] == pytest.approx(1.0)
+
+    def test_unrecorded_url_fails_permanently(self):
+        replayer = Replayer([], time_scale=0)
+        assert replayer(URL_A)[0] == 'permanent'
+        assert replayer.missing == [URL_A]
+
+    def test_last_attempt_is_repeated(self):
+        replayer = Replayer([{'url': URL_A, 'outcome': 'ok', 'data': {'n': 1}, 'reason': None,
+                              'http_code': 200, 'retry_after': None, 'elapsed': 0}], time_scale=0)
+        assert replayer(URL_A)[1] == replayer(URL_A)[1] == {'n': 1}
+
+    def test_rejects_unknown_archive_format(self, tmp_path):
+        path = tmp_path / "bad.jsonl.gz"
+        with gzip.open(path, 'wt') as f:
+            f.write(json.dumps({'format': 99}) + '\n')
+        with pytest.raises(ValueError):
+            load_archive(str(path))
@@ -0,0 +1,116 @@
+"""
+Tests for scripts/member_index.py - Cross-world member index.
+"""
+
+import sys
+import os
+import json
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from member_index import (  # noqa: E402
+    MemberIndex,
+    build_shards,
+    shard_key,
+    write_member_index,
+    main
+)
+
+
+WORLDS = {
+    "Firmera": {"Bastex": ["Ruslex", "Rodlex"], "Other": ["Monlex"]},
+    "Quidera": {"Alpha": ["rusty blade", "Zed"], "Weird": ["'Quoted"]},
+}
+
+
+@pytest.fixture
+def index_dir(tmp_path):
+    write_member_index(WORLDS, str(tmp_path))
+    return str(tmp_path)
+
+
+class TestBuildShards:
+    """Test shard layout."""
+
+    def test_shards_by_first_letter(self):
+        shards = build_shards(WORLDS)
+        assert sorted(shards) == ["_", "m", "r", "z"]
+        assert shards["r"]["names"] == ["Rodlex", "Ruslex", "rusty blade"]
+
+    def test_shard_is_sorted_by_folded_name(self):
+        shard = build_shards(WORLDS)["r"]
+        assert shard["folded"] == sorted(shard["folded"])
+
+    def test_non_letters_go_to_other_shard(self):
+        assert shard_key("'quoted") == "_"
+        assert shard_key("ruslex") == "r"
+
+
+class TestMemberIndex:
+    """Test the query API."""
+
+    def test_whois_is_case_insensitive(self, index_dir):
+        assert MemberIndex(index_dir).whois("RUSLEX") == [("Ruslex", "Firmera", "Bastex")]
+
+    def test_whois_unknown_name(self, index_dir):
+        assert MemberIndex(index_dir).whois("Nobody") == []
+        assert MemberIndex(index_dir).whois("") == []
+
+    def test_prefix_search_spans_worlds(self, index_dir):
+        rows = MemberIndex(index_dir).search("rus")
+        assert rows == [("Ruslex", "Firmera", "Bastex"), ("rusty blade", "Quidera", "Alpha")]
+
+    def test_prefix_search_respects_limit(self, index_dir):
+        assert len(MemberIndex(index_dir).search("r", limit=2)) == 2
+
+    def test_missing_shard_returns_nothing(self, index_dir):
+        assert MemberIndex(index_dir).search("xyz") == []
+
+    def test_lookup_loads_a_single_shard(self, index_dir):
+        index = MemberIndex(index_dir)
+        index.whois("Zed")
+        assert list(index._shards) == ["z"]
+
+
+class TestWriteMemberIndex:
+    """Test writing the index to disk."""
+
+    def test_manifest_counts_members(self, tmp_path):
+        manifest = write_member_index(WORLDS, str(tmp_path))
+        assert manifest["shards"]["r"] == {"file": "r.json", "members": 3}
+        with open(tmp_path / "index.json") as f:
+            assert json.load(f) == manifest
+
+    @pytest.mark.parametrize('query', ["ſtraße", "STRASSE", "Straße Guard", "ΣΊΣΥΦΟΣ"])
+    def test_manifest_fold_table_matches_casefold(self, tmp_path, query):
+        worlds = {"Firmera": {"Bastex": ["Straße Guard", "Sisyphos"]}}
+        manifest = write_member_index(worlds, str(tmp_path))
+        # How the page folds a query: toLowerCase(), then the manifest's table
+        folded = "".join(manifest["fold"].get(c, c) for c in query.lower())
+        assert folded == query.casefold()
+        assert shard_key(folded) == shard_key(query.casefold())
+
+    def test_page_fold_finds_names_with_special_folds(self, tmp_path):
+        manifest = write_member_index({"Firmera": {"Bastex": ["Straße Guard"]}}, str(tmp_path))
+        folded = "".join(manifest["fold"].get(c, c) for c in "ſtraße".lower())
+        with open(tmp_path / f"{shard_key(folded)}.json") as f:
+            shard = json.load(f)
+        assert any(name.startswith(folded) for name in shard["folded"])
+
+    def test_removes_stale_shards(self, tmp_path):
+        write_member_index(WORLDS, str(tmp_path))
+        write_member_index({"Firmera": {"Bastex": ["Ruslex"]}}, str(tmp_path))
+        assert not (tmp_path / "z.json").exists()
+
+
+class TestCli:
+    """Test the command-line interface."""
+
+    def test_whois_prints_world_and_guild(self, index_dir, capsys):
+        assert main(["--dir", index_dir, "whois", "ruslex"]) == 0
+        assert "Ruslex - Bastex (Firmera)" in capsys.readouterr().out
+
+    def test_no_match_exits_nonzero(self, index_dir):
+        assert main(["--dir", index_dir, "search", "qqq"]) == 1
@@ -0,0 +1,89 @@
+"""
+Tests for scripts/profiling.py - opt-in job profiling.
+"""
+
+import sys
+import os
+import pstats
+import time
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+import profiling  # noqa: E402
+import tibia_api  # noqa: E402
+from profiling import phase  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def no_session():
+    """Never leave a profiling session running between tests."""
+    tibia_api.reset_run_stats()
+    yield
+    profiling.finish()
+    tibia_api.reset_run_stats()
+
+
+def decode_payload(url, fields=None):
+    return ('ok', tibia_api._decode('{"guild": {"name": "Alpha"}}', fields), None, 200, None, 0.01)
+
+
+class TestPhase:
+    """Test phase marks."""
+
+    def test_is_a_shared_no_op_when_off(self):
+        assert phase('load') is phase('save')
+        with phase('load'):
+            pass
+
+    def test_nested_phases_are_timed_exclusively(self, tmp_path):
+        profiling.start('job', str(tmp_path))
+        with phase('build'):
+            with phase('fetch'):
+                time.sleep(0.05)
+        phases = profiling._session.phases
+        assert phases['fetch']['seconds'] >= 0.05
+        assert phases['build']['seconds'] < 0.05
+
+
+class TestReport:
+    """Test the written report."""
+
+    def test_writes_pstats_and_summary_including_worker_threads(self, tmp_path):
+        urls = [f"https://api.tibiadata.com/v4/guild/G{i}" for i in range(8)]
+        profiling.start('guilds', str(tmp_path), top=5)
+        with patch('tibia_api._attempt', side_effect=decode_payload):
+            with phase('load'):
+                data = [str(i) * 100 for i in range(1000)]
+            with phase('fetch'):
+                tibia_api.fetch_many(urls, workers=4)
+        pstats_path, summary_path = profiling.finish()
+
+        stats = pstats.Stats(pstats_path)
+        if sys.version_info >= (3, 12):
+            # One profiler sees the worker threads on the CI interpreter
+            assert any(func[2] == '_decode' for func in stats.stats)
+        with open(summary_path) as f:
+            summary = f.read()
+        assert "Profile: guilds" in summary
+        assert "load " in summary and "fetch " in summary
+        assert "Request attempts: 8," in summary
+        assert "Top allocation sites in 'load'" in summary
+        assert tibia_api.set_transport(None) is None
+        assert data
+
+    def test_worker_thread_attempts_run_under_the_session_profiler(self, tmp_path):
+        # Python 3.12+ refuses a second active profiler, so a per-thread
+        # cProfile here would raise ValueError on the CI interpreter
+        profiling.start('enemies', str(tmp_path))
+        with patch('tibia_api._attempt', side_effect=decode_payload):
+            results = tibia_api.fetch_many([f"https://api.tibiadata.com/v4/character/C{i}" for i in range(8)],
+                                           workers=8)
+        assert len(results) == 8
+        assert profiling._session.attempts == 8
+        assert profiling.finish() is not None
+
+    def test_finish_without_start(self):
+        assert profiling.finish() is None
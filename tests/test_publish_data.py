@@ -0,0 +1,176 @@
+"""
+Tests for scripts/publish_data.py - content-hashed Pages data.
+"""
+
+import sys
+import os
+import json
+import threading
+import urllib.error
+import urllib.request
+from datetime import datetime, timezone
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from publish_data import publish, load_pointer  # noqa: E402
+
+NOW = datetime(2026, 10, 19, 12, 0, tzinfo=timezone.utc)
+LATER = datetime(2026, 10, 19, 12, 5, tzinfo=timezone.utc)
+
+
+def write(data_dir, name, data):
+    path = data_dir / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data))
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    """A Pages data directory with a mirror, a search index and a member shard."""
+    data_dir = tmp_path / "data"
+    write(data_dir, "world_guilds_data.json", {"Antica": {"Alpha": ["Anna"] * 500}})
+    write(data_dir, "search/index.json", {"worlds": {"Antica": {"file": "antica.json"}}})
+    write(data_dir, "search/antica.json", {"names": ["Anna"] * 500})
+    write(data_dir, "members/a.json", {"names": ["Anna"] * 500})
+    write(data_dir, "metrics.json", {"not": "published"})
+    return data_dir
+
+
+class TestPublish:
+    """Test blob and pointer writing."""
+
+    def test_writes_hashed_blobs_and_pointer(self, data_dir):
+        result = publish(str(data_dir), now=NOW)
+        files = result['pointer']['files']
+        assert sorted(files) == ["members/a.json", "search/antica.json", "search/index.json",
+                                 "world_guilds_data.json"]
+        assert files["search/antica.json"].startswith("blobs/search/antica.")
+        for name, blob in files.items():
+            original = (data_dir / name).read_bytes()
+            assert (data_dir / blob).read_bytes() == original
+        blobs = {path.relative_to(data_dir).as_posix() for path in (data_dir / "blobs").rglob("*")
+                 if path.is_file()}
+        assert blobs == set(files.values())
+        assert load_pointer(str(data_dir / "latest.json")) == result['pointer']
+        assert result['pointer']['published'] == "2026-10-19T12:00:00Z"
+
+    def test_republishing_unchanged_data_changes_nothing(self, data_dir):
+        publish(str(data_dir), now=NOW)
+        before = {path: path.read_bytes() for path in data_dir.rglob("*") if path.is_file()}
+        result = publish(str(data_dir), now=LATER)
+        after = {path: path.read_bytes() for path in data_dir.rglob("*") if path.is_file()}
+        assert after == before
+        assert (result['written'], result['removed']) == (0, 0)
+        assert result['pointer']['published'] == "2026-10-19T12:00:00Z"
+
+    def test_changed_file_gets_a_new_blob_and_the_old_one_is_pruned(self, data_dir):
+        first = publish(str(data_dir), now=NOW)['pointer']['files']
+        write(data_dir, "search/antica.json", {"names": ["Anna", "Bert"]})
+        result = publish(str(data_dir), now=LATER)
+        second = result['pointer']['files']
+        assert (result['written'], result['removed']) == (1, 1)
+        assert second["search/antica.json"] != first["search/antica.json"]
+        assert second["members/a.json"] == first["members/a.json"]
+        assert not (data_dir / first["search/antica.json"]).exists()
+
+    def test_unreferenced_and_gzip_blobs_are_removed(self, data_dir):
+        files = publish(str(data_dir), now=NOW)['pointer']['files']
+        (data_dir / f"{files['members/a.json']}.gz").write_bytes(b"legacy")
+        (data_dir / "blobs" / "old").mkdir()
+        (data_dir / "blobs" / "old" / "x.0123.json").write_text("{}")
+
+        result = publish(str(data_dir), now=LATER)
+        assert (result['written'], result['removed']) == (0, 2)
+        assert not (data_dir / "blobs" / "old").exists()
+        assert all((data_dir / blob).exists() for blob in files.values())
+
+
+class CachingClient:
+    """
+    Fetches the way guilds.js does: the pointer is revalidated on every
+    load, content-hashed blobs are served from the cache once fetched.
+    Counts the response body bytes that actually cross the wire.
+    """
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self.cache = {}  # url -> (Last-Modified, body)
+        self.body_bytes = 0
+
+    def get(self, path, immutable=False):
+        url = self.base_url + path
+        cached = self.cache.get(url)
+        if cached and immutable:
+            return cached[1]
+        request = urllib.request.Request(url)
+        if cached:
+            request.add_header('If-Modified-Since', cached[0])
+        try:
+            with urllib.request.urlopen(request, timeout=5) as response:
+                body = response.read()
+                self.cache[url] = (response.headers['Last-Modified'], body)
+        except urllib.error.HTTPError as e:
+            if e.code != 304:
+                raise
+            return cached[1]
+        self.body_bytes += len(body)
+        return body
+
+    def load_page(self, names):
+        pointer = json.loads(self.get("latest.json"))
+        for name in names:
+            self.get(pointer['files'][name], immutable=True)
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def static_server(data_dir):
+    """Serve the data directory over HTTP, like Pages does."""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), partial(QuietHandler, directory=str(data_dir)))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/"
+    server.shutdown()
+    server.server_close()
+
+
+class TestStaticServer:
+    """Repeat page loads against a local static server."""
+
+    PAGE = ("search/index.json", "search/antica.json", "members/a.json")
+
+    def test_repeat_loads_move_no_data_bodies(self, data_dir, static_server):
+        publish(str(data_dir), now=NOW)
+        client = CachingClient(static_server)
+        client.load_page(self.PAGE)
+        first_load = client.body_bytes
+        assert first_load > 6000
+
+        client.body_bytes = 0
+        client.load_page(self.PAGE)
+        assert client.body_bytes == 0
+
+    def test_only_changed_files_are_downloaded_after_a_publish(self, data_dir, static_server):
+        publish(str(data_dir), now=NOW)
+        client = CachingClient(static_server)
+        client.load_page(self.PAGE)
+
+        write(data_dir, "search/antica.json", {"names": ["Bert"]})
+        publish(str(data_dir), now=LATER)
+        # Publishes are minutes apart; Last-Modified only has 1s resolution
+        pointer = data_dir / "latest.json"
+        mtime = pointer.stat().st_mtime + 60
+        os.utime(pointer, (mtime, mtime))
+
+        client.body_bytes = 0
+        client.load_page(self.PAGE)
+        changed = json.loads(pointer.read_text())['files']["search/antica.json"]
+        assert client.body_bytes == pointer.stat().st_size + (data_dir / changed).stat().st_size
@@ -0,0 +1,163 @@
+"""
+Tests for scripts/query_service.py - local read-only query service.
+"""
+
+import sys
+import os
+import gzip
+import http.client
+import json
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from config_store import current_version, write_json  # noqa: E402
+from query_service import QueryData, QueryError, make_server, query  # noqa: E402
+
+
+@pytest.fixture
+def files(tmp_path):
+    """List files and a guild data file in a temporary .configs/."""
+    configs = tmp_path / ".configs"
+    paths = {name: str(configs / f"{name}.json") for name in ("trolls", "bastex", "block", "alerts")}
+    write_json(paths["trolls"], ["Trip Wick", "Savage Kley"])
+    write_json(paths["bastex"], [])
+    write_json(paths["block"], ["Savage Kley"])
+    write_json(paths["alerts"], ["Anna"])
+    guilds = str(configs / "world_guilds_data.json")
+    write_json(guilds, {
+        "Antica": {"Red Rose": ["Anna", "Bert"], "Blue Moon": ["Carl"]},
+        "Secura": {"Night Owls": [f"Owl {i}" for i in range(300)]},
+    })
+    return paths, guilds
+
+
+@pytest.fixture
+def data(files):
+    lists, guilds = files
+    return QueryData(lists, guilds, reload_interval=0)
+
+
+class TestQuery:
+    """Test answering queries from the indexes."""
+
+    def test_troll_lookup_is_case_insensitive(self, data):
+        version = data.state['lists']['trolls'].version
+        assert query(data.state, ["troll", "trip WICK"], {}) == {"name": "Trip Wick", "troll": True, "version": version}
+        assert query(data.state, ["troll", "Anna"], {})["troll"] is False
+
+    def test_whois_finds_world_guild_and_lists(self, data):
+        result = query(data.state, ["whois", "savage kley"], {})
+        assert result == {"name": "savage kley", "matches": [], "lists": ["block", "trolls"]}
+        result = query(data.state, ["whois", "ANNA"], {})
+        assert result["matches"] == [{"name": "Anna", "world": "Antica", "guild": "Red Rose"}]
+        assert result["lists"] == ["alerts"]
+
+    def test_guild_members(self, data):
+        result = query(data.state, ["guild", "antica", "red rose"], {})
+        assert (result["world"], result["guild"], list(result["members"])) == ("Antica", "Red Rose", ["Anna", "Bert"])
+        with pytest.raises(QueryError) as error:
+            query(data.state, ["guild", "Antica", "Nobody"], {})
+        assert error.value.status == 404
+
+    def test_list_since_a_known_version_returns_the_changes(self, data, files):
+        lists, _ = files
+        first = current_version(lists["trolls"])
+        second = write_json(lists["trolls"], ["Trip Wick", "New Troll"])
+        assert data.reload()
+        result = query(data.state, ["lists", "trolls"], {"since": [first]})
+        assert result == {"list": "trolls", "version": second, "since": first,
+                          "added": ["New Troll"], "removed": ["Savage Kley"]}
+        assert query(data.state, ["lists", "trolls"], {"since": [second]})["added"] == []
+
+    def test_list_since_an_unknown_version_returns_the_full_list(self, data):
+        result = query(data.state, ["lists", "alerts"], {"since": ["0123456789abcdef"]})
+        assert result == {"list": "alerts", "version": data.state['lists']['alerts'].version, "names": ("Anna",)}
+        with pytest.raises(QueryError):
+            query(data.state, ["lists", "alerts"], {"since": ["1"]})
+        with pytest.raises(QueryError):
+            query(data.state, ["lists", "nope"], {})
+
+    def test_reload_rebuilds_only_changed_files(self, data, files):
+        lists, _ = files
+        guilds = data.state["guilds"]
+        assert not data.reload()
+        write_json(lists["block"], [])
+        assert data.reload()
+        assert data.state["guilds"] is guilds
+        assert data.state["lists"]["block"].names == ()
+
+    def test_unparseable_file_keeps_the_last_good_data(self, data, files, capsys):
+        lists, guilds = files
+        with open(lists["trolls"], 'w') as f:
+            f.write('["Trip Wick", "Half Writ')
+        with open(guilds, 'w') as f:
+            f.write('{"Antica": {"Red Rose": [')
+        data.reload()
+        assert data.state["lists"]["trolls"].names == ("Trip Wick", "Savage Kley")
+        assert query(data.state, ["guild", "Antica", "Red Rose"], {})["members"] == ("Anna", "Bert")
+        assert "serving the last good data" in capsys.readouterr().err
+
+        # Retried on the next check once the file is whole again
+        write_json(lists["trolls"], ["Trip Wick"])
+        assert data.reload()
+        assert data.state["lists"]["trolls"].names == ("Trip Wick",)
+
+
+@pytest.fixture
+def server(data):
+    server = make_server("127.0.0.1", 0, data)
+    thread = threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def get(server, path, headers=None):
+    connection = http.client.HTTPConnection(*server.server_address, timeout=5)
+    connection.request("GET", path, headers=headers or {})
+    response = connection.getresponse()
+    body = response.read()
+    connection.close()
+    return response, body
+
+
+class TestServer:
+    """Test the HTTP layer."""
+
+    def test_etag_revalidation_returns_304(self, server):
+        response, body = get(server, "/troll/Trip%20Wick")
+        assert response.status == 200 and json.loads(body)["troll"] is True
+        etag = response.headers["ETag"]
+
+        response, body = get(server, "/troll/Trip%20Wick", {"If-None-Match": etag})
+        assert (response.status, body) == (304, b"")
+
+    def test_large_responses_are_gzipped_when_accepted(self, server):
+        response, body = get(server, "/guild/Secura/Night%20Owls", {"Accept-Encoding": "gzip"})
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert len(json.loads(gzip.decompress(body))["members"]) == 300
+
+        response, body = get(server, "/guild/Secura/Night%20Owls")
+        assert response.headers["Content-Encoding"] is None
+        assert len(body) > 1024
+
+        response, _ = get(server, "/troll/Anna", {"Accept-Encoding": "gzip"})
+        assert response.headers["Content-Encoding"] is None
+
+    def test_changed_file_is_served_without_a_restart(self, server, files):
+        lists, _ = files
+        _, body = get(server, "/whois/Dave")
+        assert json.loads(body)["lists"] == []
+        write_json(lists["alerts"], ["Anna", "Dave"])
+        _, body = get(server, "/whois/Dave")
+        assert json.loads(body)["lists"] == ["alerts"]
+
+    def test_errors_are_json(self, server):
+        response, body = get(server, "/guild/Nowhere/Nobody")
+        assert response.status == 404 and "error" in json.loads(body)
+        response, _ = get(server, "/lists/trolls?since=x")
+        assert response.status == 400
@@ -0,0 +1,66 @@
+"""
+Tests for scripts/search_index.py - Guild Explorer search index shards.
+"""
+
+import sys
+import os
+import json
+import bisect
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from search_index import build_world_shard, write_search_index, shard_filename  # noqa: E402
+
+
+GUILDS = {
+    "Zeta": ["bob", "Alice"],
+    "alpha": ["Carol", "Al Bundy"],
+}
+
+
+class TestBuildWorldShard:
+    """Test the per-world shard layout."""
+
+    def test_rows_are_sorted_by_lower_cased_name(self):
+        shard = build_world_shard("Firmera", GUILDS)
+        assert shard["lower"] == sorted(shard["lower"])
+        assert shard["lower"] == [name.lower() for name in shard["names"]]
+
+    def test_guilds_are_sorted_case_insensitively(self):
+        shard = build_world_shard("Firmera", GUILDS)
+        assert shard["guilds"] == ["alpha", "Zeta"]
+
+    def test_every_member_keeps_its_guild(self):
+        shard = build_world_shard("Firmera", GUILDS)
+        pairs = {(name, shard["guilds"][g]) for name, g in zip(shard["names"], shard["guild"])}
+        assert pairs == {(m, g) for g, members in GUILDS.items() for m in members}
+
+    def test_prefix_query_is_a_contiguous_range(self):
+        shard = build_world_shard("Firmera", GUILDS)
+        start = bisect.bisect_left(shard["lower"], "al")
+        end = start
+        while end < len(shard["lower"]) and shard["lower"][end].startswith("al"):
+            end += 1
+        assert shard["names"][start:end] == ["Al Bundy", "Alice"]
+
+    def test_empty_world(self):
+        shard = build_world_shard("Firmera", {})
+        assert shard["names"] == []
+        assert shard["guilds"] == []
+
+
+class TestWriteSearchIndex:
+    """Test writing shards and the manifest."""
+
+    def test_writes_one_shard_per_world_and_manifest(self, tmp_path):
+        manifest = write_search_index({"Firmera": GUILDS, "Quidera": {}}, str(tmp_path))
+        assert manifest["worlds"]["Firmera"] == {"file": "firmera.json", "guilds": 2, "members": 4}
+        assert (tmp_path / "quidera.json").exists()
+        with open(tmp_path / "index.json") as f:
+            assert json.load(f) == manifest
+
+    def test_removes_shards_of_dropped_worlds(self, tmp_path):
+        write_search_index({"Firmera": GUILDS, "Quidera": {}}, str(tmp_path))
+        write_search_index({"Firmera": GUILDS}, str(tmp_path))
+        assert not (tmp_path / shard_filename("Quidera")).exists()
+        assert (tmp_path / shard_filename("Firmera")).exists()
@@ -5,24 +5,79 @@ Uses mocking to avoid real API calls during CI.
 
 import sys
 import os
+import io
+import gzip
 import json
 from unittest.mock import patch, MagicMock
 
+import pytest
+
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
 
+import tibia_api  # noqa: E402
 from tibia_api import (  # noqa: E402
     fetch_with_retry,
+    fetch_many,
     fetch_character,
     fetch_guild,
+    prefetch_guilds,
+    endpoint_class,
+    get_run_stats,
+    reset_run_stats,
     get_online_guild_members,
+    get_online_players,
     get_character_info
 )
 
 
+@pytest.fixture(autouse=True)
+def fresh_run_stats():
+    """Each test starts with clean run statistics and closed circuit breakers."""
+    reset_run_stats()
+    yield
+    reset_run_stats()
+
+
+class FakeClock:
+    """Monotonic clock that only moves when something sleeps on it."""
+
+    def __init__(self):
+        self.now = 100.0
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+def ok(data):
+    return ('ok', data, None, 200, None, 0.01)
+
+
+def transient(code=503, retry_after=None):
+    return ('transient', None, f"HTTP {code}", code, retry_after, 0.01)
+
+
+def permanent(code=404):
+    return ('permanent', None, f"HTTP {code} error (non-retryable)", code, None, 0.01)
+
+
+@pytest.fixture
+def fake_clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(tibia_api.time, 'monotonic', clock.monotonic)
+    monkeypatch.setattr(tibia_api.time, 'sleep', clock.sleep)
+    monkeypatch.setattr(tibia_api, '_backoff_delay', lambda attempt: 2.0 * (2 ** attempt))
+    return clock
+
+
 class TestFetchWithRetry:
     """Test the core retry logic."""
 
-    @patch('tibia_api.urllib.request.urlopen')
+    @patch('urllib.request.urlopen')
     def test_successful_fetch(self, mock_urlopen):
         """Test that a successful API call returns data."""
         mock_response = MagicMock()
@@ -36,7 +91,7 @@ class TestFetchWithRetry:
         assert success is True
         assert data == {"key": "value"}
 
-    @patch('tibia_api.urllib.request.urlopen')
+    @patch('urllib.request.urlopen')
     def test_returns_none_on_permanent_error(self, mock_urlopen):
         """Test that a 404 error returns None without retry."""
         import urllib.error
@@ -49,6 +104,134 @@ class TestFetchWithRetry:
         assert data is None
 
 
+class TestFetchManyScheduling:
+    """Test that retries are scheduled instead of blocking other requests."""
+
+    def test_failed_url_does_not_block_the_rest(self, fake_clock):
+        calls = []
+        outcomes = {
+            "https://x/v4/guild/A": [transient(), ok({"a": 1})],
+            "https://x/v4/guild/B": [ok({"b": 1})],
+        }
+
+        def fake_attempt(url, fields=None):
+            calls.append(url)
+            return outcomes[url].pop(0)
+
+        with patch('tibia_api._attempt', side_effect=fake_attempt):
+            results = fetch_many(list(outcomes), workers=1)
+
+        assert calls == ["https://x/v4/guild/A", "https://x/v4/guild/B", "https://x/v4/guild/A"]
+        assert results["https://x/v4/guild/A"] == ({"a": 1}, True)
+        assert results["https://x/v4/guild/B"] == ({"b": 1}, True)
+        assert fake_clock.slept == [2.0]
+
+    def test_honors_retry_after(self, fake_clock):
+        outcomes = [transient(429, retry_after=7.0), ok({})]
+        with patch('tibia_api._attempt', side_effect=lambda url, fields=None: outcomes.pop(0)):
+            data, success = fetch_with_retry("https://x/v4/character/A")
+        assert success is True
+        assert fake_clock.slept == [7.0]
+
+    def test_gives_up_after_max_retries(self, fake_clock):
+        with patch('tibia_api._attempt', return_value=transient()) as attempt:
+            data, success = fetch_with_retry("https://x/v4/character/A", max_retries=3)
+        assert (data, success) == (None, False)
+        assert attempt.call_count == 3
+
+    def test_reports_backoff_time(self, fake_clock):
+        outcomes = [transient(), transient(), ok({})]
+        with patch('tibia_api._attempt', side_effect=lambda url, fields=None: outcomes.pop(0)):
+            fetch_with_retry("https://x/v4/character/A")
+        stats = get_run_stats()
+        assert stats['retries'] == 2
+        assert stats['backoff_seconds'] == 6.0
+        assert stats['waited_seconds'] == 6.0
+        assert stats['requests'] == 3
+
+    def test_single_attempt_returns_without_waiting(self, fake_clock):
+        # Work-queue handlers fetch with one attempt and let the queue reschedule
+        with patch('tibia_api._attempt', return_value=transient()) as attempt:
+            assert fetch_guild("Bastex", max_retries=1) is None
+        assert attempt.call_count == 1
+        assert fake_clock.slept == []
+
+    def test_prefetched_response_is_used_once(self, fake_clock):
+        with patch('tibia_api._attempt', return_value=ok({"guild": {"name": "Bastex"}})) as attempt:
+            prefetch_guilds(["Bastex"])
+            assert fetch_guild("Bastex") == {"name": "Bastex"}
+            assert attempt.call_count == 1
+            fetch_guild("Bastex")
+            assert attempt.call_count == 2
+
+
+class TestCircuitBreaker:
+    """Test the per-endpoint-class circuit breaker."""
+
+    def test_endpoint_class(self):
+        assert endpoint_class("https://api.tibiadata.com/v4/guild/Bastex") == "guild"
+        assert endpoint_class("https://api.tibiadata.com/v4/character/Some%20One") == "character"
+        assert endpoint_class("https://api.tibiadata.com/v4/guilds/Firmera") == "guilds"
+
+    def test_opens_after_repeated_5xx(self, fake_clock, monkeypatch):
+        monkeypatch.setattr(tibia_api, 'CIRCUIT_BREAKER_THRESHOLD', 3)
+        urls = [f"https://api.tibiadata.com/v4/guild/G{i}" for i in range(5)]
+        with patch('tibia_api._attempt', return_value=permanent(500)) as attempt:
+            results = fetch_many(urls, workers=1)
+        assert attempt.call_count == 3
+        assert all(result == (None, False) for result in results.values())
+        assert get_run_stats()['open_circuits'] == ["guild"]
+
+    def test_other_endpoint_classes_keep_working(self, fake_clock, monkeypatch):
+        monkeypatch.setattr(tibia_api, 'CIRCUIT_BREAKER_THRESHOLD', 1)
+        with patch('tibia_api._attempt', return_value=permanent(500)):
+            fetch_with_retry("https://api.tibiadata.com/v4/guild/A")
+        with patch('tibia_api._attempt', return_value=ok({"character": {}})):
+            data, success = fetch_with_retry("https://api.tibiadata.com/v4/character/A")
+        assert success is True
+
+    def test_network_errors_count_and_only_success_resets(self, fake_clock, monkeypatch):
+        monkeypatch.setattr(tibia_api, 'CIRCUIT_BREAKER_THRESHOLD', 3)
+        timeout = ('transient', None, "Network error: timed out", None, None, 0.01)
+        outcomes = [timeout, permanent(404), permanent(500), timeout]
+        urls = [f"https://api.tibiadata.com/v4/character/C{i}" for i in range(5)]
+        with patch('tibia_api._attempt', side_effect=lambda url, fields=None: outcomes.pop(0)):
+            fetch_many(urls, max_retries=1, workers=1)
+        assert get_run_stats()['open_circuits'] == ["character"]
+
+    def test_unparseable_bodies_do_not_open_the_circuit(self, fake_clock, monkeypatch):
+        monkeypatch.setattr(tibia_api, 'CIRCUIT_BREAKER_THRESHOLD', 2)
+        bad_json = ('permanent', None, "Unexpected error: Expecting value", None, None, 0.01)
+        outcomes = [bad_json, bad_json, bad_json, transient(429), transient(429)]
+        urls = [f"https://api.tibiadata.com/v4/guild/G{i}" for i in range(3)]
+        with patch('tibia_api._attempt', side_effect=lambda url, fields=None: outcomes.pop(0)):
+            fetch_many(urls, max_retries=1, workers=1)
+        assert get_run_stats()['open_circuits'] == []
+        with patch('tibia_api._attempt', side_effect=lambda url, fields=None: outcomes.pop(0)):
+            fetch_many(["https://api.tibiadata.com/v4/guild/X", "https://api.tibiadata.com/v4/guild/Y"],
+                       max_retries=1, workers=1)
+        assert get_run_stats()['open_circuits'] == ["guild"]
+
+    def test_read_timeout_is_a_transient_network_error(self):
+        response = MagicMock()
+        response.info.return_value = {}
+        response.read.side_effect = TimeoutError("The read operation timed out")
+        response.__enter__ = MagicMock(return_value=response)
+        response.__exit__ = MagicMock(return_value=False)
+        with patch('urllib.request.urlopen', return_value=response):
+            outcome, _, reason, http_code, _, _ = tibia_api._attempt("https://api.tibiadata.com/v4/guild/G")
+        assert (outcome, http_code) == ('transient', None)
+        assert reason.startswith("Network error")
+
+    def test_success_resets_the_count(self, fake_clock, monkeypatch):
+        monkeypatch.setattr(tibia_api, 'CIRCUIT_BREAKER_THRESHOLD', 2)
+        outcomes = [permanent(500), ok({}), permanent(500), ok({})]
+        urls = [f"https://api.tibiadata.com/v4/guild/G{i}" for i in range(4)]
+        with patch('tibia_api._attempt', side_effect=lambda url, fields=None: outcomes.pop(0)):
+            fetch_many(urls, workers=1)
+        assert get_run_stats()['open_circuits'] == []
+
+
 class TestFetchCharacter:
     """Test character fetching."""
 
@@ -109,6 +292,28 @@ class TestGetOnlineGuildMembers:
         assert result == []
 
 
+class TestGetOnlinePlayers:
+    """Test world online list extraction."""
+
+    @patch('tibia_api.fetch_with_retry')
+    def test_returns_online_names(self, mock_fetch):
+        mock_fetch.return_value = ({
+            "world": {"name": "Firmera", "online_players": [{"name": "Alpha"}, {"name": "Beta"}]}
+        }, True)
+        assert get_online_players("Firmera") == ["Alpha", "Beta"]
+        assert mock_fetch.call_args[0][0].endswith("/world/Firmera")
+
+    @patch('tibia_api.fetch_with_retry')
+    def test_nobody_online(self, mock_fetch):
+        mock_fetch.return_value = ({"world": {"name": "Firmera", "online_players": None}}, True)
+        assert get_online_players("Firmera") == []
+
+    @patch('tibia_api.fetch_with_retry')
+    def test_returns_none_on_failure(self, mock_fetch):
+        mock_fetch.return_value = (None, False)
+        assert get_online_players("Firmera") is None
+
+
 class TestGetCharacterInfo:
     """Test character info extraction."""
 
@@ -138,10 +343,87 @@ class TestGetCharacterInfo:
         name, world, guild = get_character_info("Guilded Player")
         assert guild == "Bastex"
 
-    @patch('tibia_api.fetch_character')
-    def test_returns_none_on_failure(self, mock_fetch):
-        mock_fetch.return_value = None
-        name, world, guild = get_character_info("Ghost")
-        assert name is None
-        assert world is None
-        assert guild is None
+    def test_404_means_the_character_does_not_exist(self, fake_clock):
+        with patch('tibia_api._attempt', return_value=permanent(404)):
+            assert get_character_info("Ghost") == (None, None, None)
+
+    @pytest.mark.parametrize("outcome", [transient(503), ('transient', None, "Network error: timed out",
+                                                          None, None, 0.01)])
+    def test_failed_lookup_is_not_a_verdict(self, fake_clock, outcome):
+        with patch('tibia_api._attempt', return_value=outcome):
+            assert get_character_info("Maybe Troll") is None
+
+    def test_lookup_that_failed_succeeds_on_a_later_try(self, fake_clock):
+        outcomes = [transient(503)] * tibia_api.MAX_RETRIES + [
+            ok({"character": {"character": {"name": "Maybe Troll", "world": "Firmera"}}})]
+        with patch('tibia_api._attempt', side_effect=lambda url, fields=None: outcomes.pop(0)):
+            assert get_character_info("maybe troll") is None
+            assert get_character_info("maybe troll") == ("Maybe Troll", "Firmera", "")
+
+
+class TestResponseDecoding:
+    """Test incremental gunzip and field projection."""
+
+    PAYLOAD = {
+        "guild": {
+            "name": "Bastex",
+            "description": "A long description",
+            "members": [
+                {"name": "Player One", "status": "online", "level": 300, "vocation": "Knight"},
+                {"name": "Player Two", "status": "offline", "level": 200, "vocation": "Druid"}
+            ]
+        },
+        "information": {"api": {"version": 4}}
+    }
+
+    def make_response(self, body, headers):
+        response = MagicMock()
+        response.info.return_value = headers
+        stream = io.BytesIO(body)
+        response.read.side_effect = lambda size=-1: stream.read(size)
+        response.__enter__ = MagicMock(return_value=response)
+        response.__exit__ = MagicMock(return_value=False)
+        return response
+
+    @patch('urllib.request.urlopen')
+    def test_gzip_body_is_decompressed_in_chunks(self, mock_urlopen, monkeypatch):
+        monkeypatch.setattr(tibia_api, '_READ_CHUNK', 16)
+        body = gzip.compress(json.dumps(self.PAYLOAD).encode())
+        mock_urlopen.return_value = self.make_response(body, {'Content-Encoding': 'gzip'})
+
+        data, success = fetch_with_retry("https://api.example.com/guild/Bastex")
+        assert success is True
+        assert data == self.PAYLOAD
+
+    @patch('urllib.request.urlopen')
+    def test_projects_declared_fields_only(self, mock_urlopen):
+        body = gzip.compress(json.dumps(self.PAYLOAD).encode())
+        mock_urlopen.return_value = self.make_response(body, {'Content-Encoding': 'gzip'})
+
+        data, success = fetch_with_retry("https://api.example.com/guild/Bastex",
+                                         fields=tibia_api.GUILD_MEMBER_FIELDS)
+        assert data == {
+            "guild": {
+                "name": "Bastex",
+                "members": [
+                    {"name": "Player One", "status": "online"},
+                    {"name": "Player Two", "status": "offline"}
+                ]
+            }
+        }
+
+    def test_projection_keeps_the_fields_callers_use(self):
+        full = tibia_api._decode(json.dumps(self.PAYLOAD))
+        projected = tibia_api._decode(json.dumps(self.PAYLOAD), frozenset(tibia_api.GUILD_MEMBER_FIELDS))
+        assert ([(m["name"], m["status"]) for m in full["guild"]["members"]]
+                == [(m["name"], m["status"]) for m in projected["guild"]["members"]])
+
+    def test_decodes_the_gunzipped_bytearray_as_read(self):
+        body = bytearray(json.dumps({"guild": {"name": "Hidofäs", "members": []}}, ensure_ascii=False).encode())
+        data = tibia_api._decode(body, frozenset(tibia_api.GUILD_MEMBER_FIELDS))
+        assert data["guild"]["name"] == "Hidofäs"
+
+    def test_death_projection_keeps_killer_names(self, sample_deaths):
+        body = json.dumps({"character": {"character": {"name": "X", "sex": "male"}, "deaths": sample_deaths}})
+        data = tibia_api._decode(body.encode(), frozenset(tibia_api.CHARACTER_DEATH_FIELDS))
+        assert data["character"]["deaths"] == sample_deaths
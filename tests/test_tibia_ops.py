@@ -0,0 +1,71 @@
+"""
+Tests for the tibia_ops command-line entry point.
+"""
+
+import sys
+import os
+import subprocess
+
+REPO_ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, REPO_ROOT)
+
+from tibia_ops.__main__ import main, parse_options, COMMANDS  # noqa: E402
+
+
+def imported_modules(code):
+    """Modules loaded by running code in a fresh interpreter."""
+    result = subprocess.run(
+        [sys.executable, '-c', f"{code}; import sys; print('\\n'.join(sys.modules))"],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True
+    )
+    return set(result.stdout.split())
+
+
+class TestDispatch:
+    """Test command dispatch."""
+
+    def test_help_lists_every_command(self, capsys):
+        assert main(['--help']) == 0
+        output = capsys.readouterr().out
+        for command in COMMANDS:
+            assert command in output
+
+    def test_no_command_is_a_usage_error(self, capsys):
+        assert main([]) == 2
+
+    def test_unknown_command(self, capsys):
+        assert main(['nope']) == 2
+        assert "Unknown command" in capsys.readouterr().err
+
+    def test_arguments_are_passed_to_the_command(self, tmp_path, capsys):
+        assert main(['members', '--dir', str(tmp_path), 'whois', 'Nobody']) == 1
+        assert "No matching characters" in capsys.readouterr().out
+
+    def test_config_commands_are_dispatched(self, tmp_path, capsys):
+        assert main(['validate', '--dir', str(tmp_path)]) == 1
+        assert "Config validation FAILED" in capsys.readouterr().out
+        assert main(['deaths', '--file', str(tmp_path / 'deaths.json'), 'stats']) == 0
+        assert "0 death events" in capsys.readouterr().out
+
+    def test_traffic_options_precede_the_command(self):
+        options, argv = parse_options(['--replay', 'run.jsonl.gz', '--time-scale', '0.5', 'guilds', '--merge'])
+        assert options == {'record': None, 'replay': 'run.jsonl.gz', 'time_scale': 0.5}
+        assert argv == ['guilds', '--merge']
+
+    def test_record_and_replay_are_exclusive(self, capsys):
+        assert main(['--record', 'a.gz', '--replay', 'b.gz', 'alerts']) == 2
+        assert "can't be combined" in capsys.readouterr().err
+
+
+class TestLazyImports:
+    """Guard cold start: nothing heavy is imported before it is needed."""
+
+    def test_entry_point_imports_no_command_modules(self):
+        modules = imported_modules("import tibia_ops.__main__")
+        assert not modules & {name for name, _ in COMMANDS.values()}
+        assert 'tibia_api' not in modules
+
+    def test_api_client_defers_network_modules(self):
+        modules = imported_modules("import tibia_ops, tibia_api")
+        assert 'urllib.request' not in modules
+        assert 'concurrent.futures' not in modules
@@ -0,0 +1,138 @@
+"""
+Tests for scripts/timeseries.py - per-run app metrics store.
+"""
+
+import sys
+import os
+import json
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from timeseries import (  # noqa: E402
+    TimeSeriesStore,
+    add_sample,
+    empty_columns,
+    trim,
+    api_sample
+)
+
+HOUR = 3600
+RESOLUTIONS = {
+    'raw': (0, 2 * HOUR),
+    'hour': (HOUR, 24 * HOUR),
+}
+
+
+def store_in(tmp_path, name):
+    """A store keeping its state and published files under tmp_path."""
+    return TimeSeriesStore(name, str(tmp_path / 'state'), RESOLUTIONS, publish_dir=str(tmp_path / 'pages'),
+                           published=('hour',))
+
+
+class TestAddSample:
+    """Test appending and rolling up samples."""
+
+    def test_raw_keeps_one_point_per_sample(self):
+        columns = empty_columns('raw', 0)
+        add_sample(columns, 100, {'trolls': 5})
+        add_sample(columns, 160, {'trolls': 6})
+        assert columns['t'] == [100, 160]
+        assert columns['series']['trolls'] == [5, 6]
+
+    def test_rollup_sums_counters_and_keeps_last_gauge(self):
+        columns = empty_columns('hour', HOUR)
+        add_sample(columns, HOUR + 10, {'trolls': 5, 'api.requests': 10})
+        add_sample(columns, HOUR + 600, {'trolls': 6, 'api.requests': 4})
+        add_sample(columns, 2 * HOUR + 5, {'trolls': 7, 'api.requests': 1})
+        assert columns['t'] == [HOUR, 2 * HOUR]
+        assert columns['series']['trolls'] == [6, 7]
+        assert columns['series']['api.requests'] == [14, 1]
+
+    def test_new_series_is_backfilled_with_nulls(self):
+        columns = empty_columns('raw', 0)
+        add_sample(columns, 100, {'trolls': 5})
+        add_sample(columns, 200, {'trolls': 5, 'members.Antica': 40})
+        add_sample(columns, 300, {'members.Antica': 41})
+        assert columns['series']['members.Antica'] == [None, 40, 41]
+        assert columns['series']['trolls'] == [5, 5, None]
+
+
+class TestTrim:
+    """Test retention."""
+
+    def test_drops_old_points_and_empty_series(self):
+        columns = empty_columns('raw', 0)
+        add_sample(columns, 100, {'gone': 1})
+        add_sample(columns, 200, {'trolls': 5})
+        trim(columns, 150)
+        assert columns['t'] == [200]
+        assert columns['series'] == {'trolls': [5]}
+
+
+class TestTimeSeriesStore:
+    """Test the per-resolution files."""
+
+    def test_record_writes_every_resolution(self, tmp_path):
+        store = store_in(tmp_path, 'enemies')
+        store.record({'trolls': 5, 'api.requests': 3}, timestamp=HOUR + 1)
+        store.record({'trolls': 6, 'api.requests': 2}, timestamp=HOUR + 601)
+
+        with open(tmp_path / 'state' / 'enemies.raw.json') as f:
+            raw = json.load(f)
+        assert raw['t'] == [HOUR + 1, HOUR + 601]
+        hourly = store.load('hour')
+        assert hourly['t'] == [HOUR]
+        assert hourly['series']['api.requests'] == [5]
+
+    def test_retention_is_per_resolution(self, tmp_path):
+        store = store_in(tmp_path, 'enemies')
+        store.record({'trolls': 5}, timestamp=0)
+        store.record({'trolls': 6}, timestamp=3 * HOUR)
+        assert store.load('raw')['t'] == [3 * HOUR]
+        assert store.load('hour')['t'] == [0, 3 * HOUR]
+
+    def test_load_missing_resolution_is_empty(self, tmp_path):
+        store = store_in(tmp_path, 'guilds')
+        assert store.load('hour') == empty_columns('hour', HOUR)
+
+
+class TestPublishing:
+    """Only closed rollup buckets reach the published files."""
+
+    def test_open_bucket_is_not_published(self, tmp_path):
+        store = store_in(tmp_path, 'enemies')
+        assert store.record({'trolls': 5}, timestamp=HOUR + 1) == ['hour']
+        with open(tmp_path / 'pages' / 'enemies.hour.json') as f:
+            assert json.load(f) == empty_columns('hour', HOUR)
+        assert not (tmp_path / 'pages' / 'enemies.raw.json').exists()
+
+    def test_runs_within_a_bucket_leave_the_published_file_alone(self, tmp_path):
+        store = store_in(tmp_path, 'enemies')
+        store.record({'trolls': 5}, timestamp=HOUR + 1)
+        published = tmp_path / 'pages' / 'enemies.hour.json'
+        before = published.stat().st_mtime_ns
+        assert store.record({'trolls': 6}, timestamp=HOUR + 300) == []
+        assert store.record({'trolls': 7}, timestamp=HOUR + 600) == []
+        assert published.stat().st_mtime_ns == before
+
+        assert store.record({'trolls': 8}, timestamp=2 * HOUR + 1) == ['hour']
+        with open(published) as f:
+            hourly = json.load(f)
+        assert (hourly['t'], hourly['series']) == ([HOUR], {'trolls': [7]})
+
+    def test_missing_state_starts_from_the_published_file(self, tmp_path):
+        store = store_in(tmp_path, 'enemies')
+        store.record({'api.requests': 3}, timestamp=HOUR + 1)
+        store.record({'api.requests': 4}, timestamp=2 * HOUR + 1)
+        (tmp_path / 'state' / 'enemies.hour.json').unlink()
+        assert store.load('hour')['series'] == {'api.requests': [3]}
+
+
+def test_api_sample_from_run_stats():
+    stats = {'requests': 10, 'failures': 1, 'retries': 2, 'latency_seconds': 1.2345}
+    assert api_sample(stats) == {
+        'api.requests': 10,
+        'api.failures': 1,
+        'api.retries': 2,
+        'api.latency_ms': 1234,
+    }
@@ -0,0 +1,26 @@
+"""
+Tests for scripts/utils.py - helpers shared by the job scripts.
+"""
+
+import sys
+import os
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from utils import parse_time  # noqa: E402
+
+
+class TestParseTime:
+    """Test ISO-8601 timestamp parsing."""
+
+    def test_utc_timestamp_to_epoch_seconds(self):
+        assert parse_time('2023-11-14T22:13:20Z') == 1_700_000_000
+
+    def test_offset_is_honoured(self):
+        assert parse_time('2023-11-15T00:13:20+02:00') == 1_700_000_000
+
+    @pytest.mark.parametrize('value', [None, '', 'yesterday', 1_700_000_000])
+    def test_invalid_values_are_none(self, value):
+        assert parse_time(value) is None
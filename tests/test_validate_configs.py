@@ -0,0 +1,97 @@
+"""
+Tests for scripts/validate_configs.py - .configs/ schema validation.
+"""
+
+import json
+import sys
+import os
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from validate_configs import main, name_problem, validate  # noqa: E402
+
+LISTS = {"alerts": ["Anna"], "bastex": [], "block": ["Bert"], "trolls": ["Carl", "Dave"]}
+SNAPSHOT = {"Antica": {"Red Rose": ["Enemy Knight", "Hidofäs"], "Blue Moon": ["O'Neil-Smith"]}}
+
+
+@pytest.fixture
+def configs(tmp_path):
+    """A valid .configs/ directory."""
+    directory = tmp_path / ".configs"
+    directory.mkdir()
+    for name, data in {**LISTS, "world_guilds_data": SNAPSHOT}.items():
+        (directory / f"{name}.json").write_text(json.dumps(data))
+    return directory
+
+
+class TestNameProblem:
+    """Test the character name check."""
+
+    @pytest.mark.parametrize("name", ["Al", "Sleeping Booty", "O'Neil-Smith", "Hidofäs", "A" * 29])
+    def test_well_formed_names(self, name):
+        assert name_problem(name) is None
+
+    @pytest.mark.parametrize("name", [
+        "A", "A" * 30, " Carl", "Carl ", "Carl  Dave", "Carl2", "-Carl", "Carl_Dave", "", None, 42,
+    ])
+    def test_malformed_names(self, name):
+        assert name_problem(name) is not None
+
+
+class TestValidate:
+    """Test validating a config directory."""
+
+    def test_valid_directory_parses_every_file(self, configs):
+        report, data = validate(str(configs))
+        assert report['ok'] is True
+        assert data == {**LISTS, "world_guilds_data": SNAPSHOT}
+        assert report['files']['trolls.json']['entries'] == 2
+        assert report['files']['world_guilds_data.json']['entries'] == 3
+
+    def test_duplicate_names_are_warnings(self, configs):
+        (configs / "trolls.json").write_text(json.dumps(["Carl", "Dave", "carl"]))
+        report, _ = validate(str(configs))
+        assert report['ok'] is True
+        entry = report['files']['trolls.json']
+        assert entry['duplicates'] == [["Carl", "carl"]]
+        assert len(entry['warnings']) == 1
+
+    def test_member_in_two_guilds_is_a_warning(self, configs):
+        snapshot = {"Antica": {"Red Rose": ["Enemy Knight"], "Blue Moon": ["enemy knight"]}}
+        (configs / "world_guilds_data.json").write_text(json.dumps(snapshot))
+        report, _ = validate(str(configs))
+        assert report['ok'] is True
+        assert report['files']['world_guilds_data.json']['duplicates'] == [
+            ["Antica/Red Rose/enemy knight", "Antica/Blue Moon/enemy knight"]]
+
+    def test_schema_errors_fail(self, configs):
+        (configs / "block.json").write_text(json.dumps({"Bert": True}))
+        (configs / "trolls.json").write_text(json.dumps(["Carl", "Dave2"]))
+        (configs / "world_guilds_data.json").write_text(json.dumps({"Antica": {"Red Rose": "Enemy Knight"}}))
+        report, _ = validate(str(configs))
+        assert report['ok'] is False
+        assert "expected a list of names" in report['files']['block.json']['errors'][0]
+        assert "'Dave2'" in report['files']['trolls.json']['errors'][0]
+        assert "Antica/Red Rose" in report['files']['world_guilds_data.json']['errors'][0]
+
+    def test_invalid_json_and_missing_required_files_fail(self, configs):
+        (configs / "alerts.json").write_text('["Anna",')
+        (configs / "bastex.json").unlink()
+        report, data = validate(str(configs))
+        assert report['ok'] is False
+        assert report['files']['alerts.json']['errors'][0].startswith("invalid JSON")
+        assert report['missing'] == ["bastex.json"]
+        assert "alerts" not in data
+
+
+class TestMain:
+    """Test the command line."""
+
+    def test_writes_the_report_and_fails_on_warnings_only_when_strict(self, configs, tmp_path):
+        (configs / "trolls.json").write_text(json.dumps(["Carl", "Carl"]))
+        report_path = tmp_path / "out" / "validation-report.json"
+        assert main(['--dir', str(configs), '--report', str(report_path)]) == 0
+        assert json.loads(report_path.read_text())['files']['trolls.json']['duplicates'] == [["Carl", "Carl"]]
+        assert main(['--dir', str(configs), '--strict']) == 1
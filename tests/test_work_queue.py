@@ -0,0 +1,167 @@
+"""
+Tests for scripts/work_queue.py - Persistent priority queue of fetch tasks.
+"""
+
+import sys
+import os
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from work_queue import RetryableError, WorkQueue, drain  # noqa: E402
+
+
+class FakeClock:
+    """Manually advanced clock; sleeping just moves time forward."""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+class TestWorkQueue:
+    """Test queue ordering, upserts and retry bookkeeping."""
+
+    def test_drains_in_priority_order(self):
+        with WorkQueue(':memory:') as queue:
+            queue.enqueue('guild_refresh', 'Quidera', 10, not_before=0)
+            queue.enqueue('guild_refresh', 'Firmera', 0, not_before=0)
+            assert queue.next_ready(now=1).key == 'Firmera'
+
+    def test_deferred_task_is_not_ready(self):
+        with WorkQueue(':memory:') as queue:
+            queue.enqueue('guild_refresh', 'Firmera', 0, not_before=100)
+            assert queue.next_ready(now=50) is None
+            assert queue.next_due() == 100
+
+    def test_enqueue_existing_task_keeps_single_row_and_raises_priority(self):
+        with WorkQueue(':memory:') as queue:
+            queue.enqueue('guild_refresh', 'Firmera', 10, not_before=0)
+            queue.enqueue('guild_refresh', 'Firmera', 0, not_before=0)
+            queue.enqueue('guild_refresh', 'Firmera', 10, not_before=0)
+            assert queue.pending() == 1
+            assert queue.next_ready(now=1).priority == 0
+
+    def test_payload_round_trips(self):
+        with WorkQueue(':memory:') as queue:
+            queue.enqueue('death_check', 'Player One', 0, payload={'world': 'Firmera'}, not_before=0)
+            assert queue.next_ready(now=1).payload == {'world': 'Firmera'}
+
+    def test_retry_defers_with_exponential_backoff(self):
+        with WorkQueue(':memory:', max_retries=4, initial_backoff=2) as queue:
+            queue.enqueue('guild_refresh', 'Firmera', 0, not_before=0)
+            assert queue.retry(queue.next_ready(now=0), now=0) is True
+            task = queue.next_ready(now=2)
+            assert task.retries == 1
+            assert queue.retry(task, now=2) is True
+            assert queue.next_ready(now=5) is None
+            assert queue.next_due() == 6
+
+    def test_retry_drops_task_after_max_retries(self):
+        with WorkQueue(':memory:', max_retries=2, initial_backoff=1) as queue:
+            queue.enqueue('guild_refresh', 'Firmera', 0, not_before=0)
+            assert queue.retry(queue.next_ready(now=0), now=0) is True
+            assert queue.retry(queue.next_ready(now=10), now=10) is False
+            assert queue.pending() == 0
+
+    def test_pending_tasks_persist_between_runs(self, tmp_path):
+        path = str(tmp_path / 'queue.sqlite3')
+        with WorkQueue(path) as queue:
+            queue.enqueue('guild_refresh', 'Firmera', 0, not_before=0)
+            queue.retry(queue.next_ready(now=0), now=0)
+        with WorkQueue(path) as queue:
+            queue.enqueue('guild_refresh', 'Firmera', 0)
+            assert queue.pending('guild_refresh') == 1
+            assert queue.next_ready(now=10**10).retries == 1
+
+
+class TestDrain:
+    """Test the drain loop."""
+
+    def test_failed_task_does_not_block_others(self):
+        clock = FakeClock()
+        order = []
+        attempts = {'Firmera': 0}
+
+        def handler(task):
+            order.append(task.key)
+            if task.key == 'Firmera' and attempts['Firmera'] == 0:
+                attempts['Firmera'] += 1
+                return False
+            return True
+
+        with WorkQueue(':memory:', initial_backoff=5) as queue:
+            queue.enqueue('guild_refresh', 'Firmera', 0, not_before=clock())
+            queue.enqueue('guild_refresh', 'Quidera', 10, not_before=clock())
+            stats = drain(queue, {'guild_refresh': handler}, clock=clock, sleep=clock.sleep)
+
+        assert order == ['Firmera', 'Quidera', 'Firmera']
+        assert stats == {'completed': 2, 'retried': 1, 'dropped': 0}
+        assert clock.slept == [5]
+
+    def test_deferred_tasks_past_deadline_carry_over(self):
+        clock = FakeClock()
+        with WorkQueue(':memory:', initial_backoff=60) as queue:
+            queue.enqueue('guild_refresh', 'Firmera', 0, not_before=clock())
+            stats = drain(queue, {'guild_refresh': lambda task: False},
+                          deadline=clock() + 30, clock=clock, sleep=clock.sleep)
+            assert queue.pending() == 1
+        assert stats['retried'] == 1
+        assert clock.slept == []
+
+    @pytest.mark.parametrize("error", [RetryableError("rate limited"), TimeoutError("timed out")])
+    def test_retryable_exception_counts_as_failure(self, error):
+        clock = FakeClock()
+
+        def handler(task):
+            raise error
+
+        with WorkQueue(':memory:', max_retries=1) as queue:
+            queue.enqueue('guild_refresh', 'Firmera', 0, not_before=clock())
+            stats = drain(queue, {'guild_refresh': handler}, clock=clock, sleep=clock.sleep)
+        assert stats['dropped'] == 1
+
+    def test_other_exceptions_propagate_and_keep_the_task(self):
+        clock = FakeClock()
+
+        def handler(task):
+            raise KeyError("world")
+
+        with WorkQueue(':memory:') as queue:
+            queue.enqueue('guild_refresh', 'Firmera', 0, not_before=clock())
+            with pytest.raises(KeyError):
+                drain(queue, {'guild_refresh': handler}, clock=clock, sleep=clock.sleep)
+            assert queue.pending() == 1
+
+    def test_ready_backlog_stops_at_the_deadline(self):
+        clock = FakeClock()
+        ran = []
+
+        def handler(task):
+            ran.append(task.key)
+            clock.now += 10
+            return True
+
+        with WorkQueue(':memory:') as queue:
+            for i in range(10):
+                queue.enqueue('guild_refresh', f"World {i}", 0, not_before=clock())
+            stats = drain(queue, {'guild_refresh': handler}, deadline=clock() + 25, clock=clock, sleep=clock.sleep)
+            assert queue.pending() == 7
+        assert stats['completed'] == 3
+        assert ran == ["World 0", "World 1", "World 2"]
+
+    def test_unknown_kind_is_dropped(self):
+        clock = FakeClock()
+        with WorkQueue(':memory:') as queue:
+            queue.enqueue('mystery', 'x', 0, not_before=clock())
+            stats = drain(queue, {}, clock=clock, sleep=clock.sleep)
+            assert queue.pending() == 0
+        assert stats['dropped'] == 1
@@ -0,0 +1,18 @@
+"""
+Tibia Ops Config - single command-line entry point for the job scripts.
+
+    python -m tibia_ops <command> [args...]
+
+The job modules live in scripts/ (the workflows and tests use them from
+there); this package only puts that directory on the import path and
+dispatches to a command's module, importing nothing else until a command
+is chosen.
+"""
+
+import os
+import sys
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts')
+
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
@@ -0,0 +1,112 @@
+"""
+Dispatch `python -m tibia_ops <command>` to a job module's main().
+
+Only the chosen command's module is imported, so `--help` or an index
+rebuild never pays for the API client.
+
+Options before the command record the run's API traffic into a fixture
+archive or replay one instead of calling the API (see http_fixtures):
+
+    python -m tibia_ops --record run.jsonl.gz enemies
+    python -m tibia_ops --replay run.jsonl.gz [--time-scale X] enemies
+"""
+
+import contextlib
+import importlib
+import sys
+
+import tibia_ops  # noqa: F401 - puts scripts/ on the import path
+
+# command -> (module in scripts/, description)
+COMMANDS = {
+    'guilds': ('gen_worlds_guilds', "Refresh guild member lists for all worlds"),
+    'enemies': ('check_online_enemies', "Check online enemies' deaths and update trolls.json"),
+    'alerts': ('check_alerts', "Report which alerts/block list names are online"),
+    'search-index': ('search_index', "Build the Guild Explorer search index"),
+    'members': ('member_index', "Build or query the cross-world member index"),
+    'publish': ('publish_data', "Publish the Guild Explorer data under content-hashed names"),
+    'serve': ('query_service', "Serve the lists and guild data over a local read-only HTTP API"),
+    'metrics': ('collect_metrics', "Update the dashboard metrics"),
+    'deaths': ('death_store', "Query the processed enemy death events"),
+    'validate': ('validate_configs', "Validate the .configs JSON files against their schemas"),
+    'deploy': ('deploy_config', "Package, deploy or verify the combined config in S3"),
+}
+
+
+# option -> (name, type, description); each takes one value
+OPTIONS = {
+    '--record': ('record', str, "Record the run's API traffic into a fixture archive"),
+    '--replay': ('replay', str, "Answer API requests from a fixture archive"),
+    '--time-scale': ('time_scale', float, "Replay latency multiplier (default 1.0, 0 = instant)"),
+}
+
+
+def usage():
+    """Usage text listing every option and command."""
+    width = max(len(name) for name in list(COMMANDS) + [f"{o} X" for o in OPTIONS])
+    lines = ["usage: python -m tibia_ops [options] <command> [args...]", "", "options:"]
+    lines += [f"  {f'{option} X'.ljust(width)}  {description}" for option, (_, _, description) in OPTIONS.items()]
+    lines += ["", "commands:"]
+    lines += [f"  {name.ljust(width)}  {description}" for name, (_, description) in COMMANDS.items()]
+    return "\n".join(lines)
+
+
+def parse_options(argv):
+    """
+    Split leading options from the command line.
+
+    Returns:
+        tuple: (options dict, remaining argv)
+
+    Raises:
+        ValueError: If an option is missing or has an invalid value
+    """
+    options = {'record': None, 'replay': None, 'time_scale': 1.0}
+    while argv and argv[0] in OPTIONS:
+        name, kind, _ = OPTIONS[argv[0]]
+        if len(argv) < 2:
+            raise ValueError(f"{argv[0]} needs a value")
+        options[name] = kind(argv[1])
+        argv = argv[2:]
+    if options['record'] and options['replay']:
+        raise ValueError("--record and --replay can't be combined")
+    return options, argv
+
+
+def traffic(options):
+    """Context for the command run: recording, replaying, or neither."""
+    if not (options['record'] or options['replay']):
+        return contextlib.nullcontext()
+    import http_fixtures
+    if options['record']:
+        return http_fixtures.recording(options['record'])
+    return http_fixtures.replaying(options['replay'], options['time_scale'])
+
+
+def main(argv=None):
+    """Run a command; its own arguments are passed through unchanged."""
+    argv = sys.argv[1:] if argv is None else argv
+    try:
+        options, argv = parse_options(argv)
+    except ValueError as e:
+        print(f"{e}\n\n{usage()}", file=sys.stderr)
+        return 2
+    if not argv or argv[0] in ('-h', '--help'):
+        print(usage())
+        return 0 if argv else 2
+
+    command, args = argv[0], argv[1:]
+    if command not in COMMANDS:
+        print(f"Unknown command: {command}\n\n{usage()}", file=sys.stderr)
+        return 2
+
+    module = importlib.import_module(COMMANDS[command][0])
+    # Commands parse sys.argv themselves (and some take no arguments)
+    sys.argv = [f"tibia_ops {command}"] + args
+    with traffic(options):
+        result = module.main()
+    return result if isinstance(result, int) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())